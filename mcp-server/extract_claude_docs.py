@@ -72,6 +72,10 @@ async def extract_claude_code_docs():
     all_contexts = []
     
     try:
+        # 全URLを並行取得（ホストごとの間隔は fetcher が制御）
+        print("\n⬇️  全ページを並行取得中...")
+        fetched = dict(zip(claude_docs_urls, await fetcher.fetch(claude_docs_urls, timeout=60)))
+        
         for url in claude_docs_urls:
             print(f"\n📄 処理中: {url}")
             print("="*60)
@@ -94,16 +98,16 @@ async def extract_claude_code_docs():
             
             print(f"📁 カテゴリ: {category}")
             
-            # Step 1: コンテンツを取得
-            print("  1️⃣ コンテンツ取得中...")
-            fetch_results = await fetcher.fetch([url], timeout=60)
+            # Step 1: 取得済みコンテンツを確認
+            print("  1️⃣ コンテンツ確認中...")
+            fetch_result = fetched.get(url)
             
-            if not fetch_results or not fetch_results[0].get("success"):
+            if not fetch_result or not fetch_result.get("success"):
                 print(f"  ❌ 取得失敗: {url}")
                 continue
             
-            content = fetch_results[0].get("content", "")
-            title = fetch_results[0].get("title", section_name)
+            content = fetch_result.get("content", "")
+            title = fetch_result.get("title", section_name)
             print(f"  ✅ {len(content)} 文字を取得")
             
             # Step 2: 構造を抽出
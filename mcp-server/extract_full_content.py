@@ -66,22 +66,26 @@ async def extract_full_content():
     extracted_knowledge = []
     
     try:
+        # 全URLを並行取得（ホストごとの間隔は fetcher が制御）
+        print("\n⬇️  全ページを並行取得中...")
+        fetched = dict(zip(priority_urls, await fetcher.fetch(priority_urls, timeout=60)))
+        
         for url in priority_urls:
             print(f"\n{'='*60}")
             print(f"📄 完全抽出中: {url}")
             print('='*60)
             
-            # Step 1: フルコンテンツ取得
-            print("  1️⃣ フルコンテンツ取得中...")
-            fetch_results = await fetcher.fetch([url], timeout=60)
+            # Step 1: 取得済みフルコンテンツを確認
+            print("  1️⃣ フルコンテンツ確認中...")
+            fetch_result = fetched.get(url)
             
-            if not fetch_results or not fetch_results[0].get("success"):
+            if not fetch_result or not fetch_result.get("success"):
                 print(f"  ❌ 取得失敗")
                 continue
             
             # Markdownコンテンツを取得
-            content = fetch_results[0].get("content", "")
-            title = fetch_results[0].get("title", "")
+            content = fetch_result.get("content", "")
+            title = fetch_result.get("title", "")
             
             print(f"  ✅ {len(content)} 文字を取得")
             
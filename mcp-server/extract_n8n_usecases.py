@@ -5,47 +5,102 @@ Extracts complete workflow patterns and node mappings for automatic workflow gen
 Target: L4 depth analysis of all n8n use cases
 """
 
+import argparse
 import asyncio
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from yaml_context_engineering.config import Config
+from yaml_context_engineering.crawler import (
+    CrawlEngine,
+    CrawlStateStore,
+    FrontierEntry,
+    SourceDefinition,
+    apply_global_settings,
+    load_global_settings,
+    load_sources
+)
 from yaml_context_engineering.server import YamlContextServer
 from yaml_context_engineering.utils.logging import console, setup_logging
 
 
+SOURCES_PATH = Path(__file__).parent / "config" / "sources.yaml"
+
+
 class N8nUseCaseExtractor:
     """Deep extractor for n8n use cases and workflow patterns."""
     
-    def __init__(self):
-        self.base_url = "https://n8n.io"
+    def __init__(self, source: SourceDefinition, state: Optional[CrawlStateStore] = None):
+        self.source = source
         self.visited_urls = set()
         self.use_cases = {}
+        self.parents = {}
         self.workflow_patterns = []
         self.node_mappings = {}
-        self.max_depth = 4
-        
-    async def extract_use_case(self, server: YamlContextServer, url: str, depth: int = 1) -> Dict[str, Any]:
-        """Extract use case details and workflow patterns."""
-        
-        if depth > self.max_depth or url in self.visited_urls:
-            return {}
+        self.max_depth = source.max_depth
+        self.state = state
+        
+    async def crawl(self, server: YamlContextServer) -> List[Dict[str, Any]]:
+        """Crawl the source concurrently and return one tree per use case category."""
+        
+        if self.state:
+            # Reuse pages finished by an interrupted run
+            for url in self.state.known():
+                saved = self.state.data(url)
+                if saved:
+                    self.use_cases[url] = saved["use_case"]
+                    self.parents[url] = saved["parent"]
+                    self.visited_urls.add(url)
+        
+        async def on_page(entry: FrontierEntry, result: Dict[str, Any]) -> None:
+            self.visited_urls.add(entry.url)
+            if not result.get("success"):
+                return
             
-        self.visited_urls.add(url)
-        console.info(f"[L{depth}] Extracting use case: {url}")
-        
-        # Fetch content
-        results = await server.web_fetcher.fetch([url])
-        if not results or not results[0]["success"]:
-            return {}
+            console.info(f"[L{entry.depth}] Extracting use case: {entry.url}")
+            use_case = await self.extract_use_case(server, entry.url, entry.depth, result)
             
-        result = results[0]
+            self.use_cases[entry.url] = use_case
+            self.parents[entry.url] = entry.parent
+            if self.state:
+                self.state.mark_done(entry.url, data={"use_case": use_case, "parent": entry.parent})
+        
+        engine = CrawlEngine(server.config, server.web_fetcher, server.url_discovery)
+        await engine.crawl_source(self.source, on_result=on_page, state=self.state)
+        
+        return self._assemble()
+    
+    def _assemble(self) -> List[Dict[str, Any]]:
+        """Link crawled pages to the page they were found on."""
+        
+        for use_case in self.use_cases.values():
+            use_case["children"] = []
+        
+        roots = []
+        for url, use_case in self.use_cases.items():
+            parent = self.parents.get(url)
+            if parent in self.use_cases:
+                self.use_cases[parent]["children"].append(use_case)
+            else:
+                roots.append(use_case)
+        
+        order = {url: i for i, url in enumerate(self.source.primary_urls)}
+        return sorted(roots, key=lambda use_case: order.get(use_case["url"], len(order)))
+        
+    async def extract_use_case(
+        self,
+        server: YamlContextServer,
+        url: str,
+        depth: int,
+        result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Extract use case details and workflow patterns from a fetched page."""
         
         # Extract structure
         structure = await server.structure_extractor.extract(result["content"])
@@ -84,28 +139,6 @@ class N8nUseCaseExtractor:
         content = result.get("content", "")
         use_case["workflow_components"] = self._extract_workflow_components(content)
         
-        # Extract child pages for deeper analysis
-        if depth < self.max_depth:
-            extracted_urls = result.get("extracted_urls", [])
-            
-            # Filter for relevant sub-pages
-            relevant_urls = [
-                u for u in extracted_urls 
-                if u.startswith(self.base_url) and 
-                   any(pattern in u for pattern in [
-                       "/workflows/", "/templates/", "/integrations/",
-                       "/docs/", "/examples/", "/tutorials/"
-                   ])
-            ]
-            
-            # Process child URLs (limit to prevent explosion)
-            for child_url in relevant_urls[:3]:
-                if child_url not in self.visited_urls:
-                    await asyncio.sleep(1)  # Rate limiting
-                    child_data = await self.extract_use_case(server, child_url, depth + 1)
-                    if child_data:
-                        use_case["children"].append(child_data)
-        
         return use_case
     
     def _parse_use_case_type(self, url: str) -> str:
@@ -331,7 +364,7 @@ class N8nUseCaseExtractor:
         return patterns
 
 
-async def main():
+async def main(resume: bool = False):
     """Main extraction function."""
     
     # Setup
@@ -346,36 +379,24 @@ async def main():
     (n8n_dir / "workflows").mkdir(exist_ok=True)
     
     config.output.output_base_directory = n8n_dir
-    config.crawling.max_crawl_depth = 4
+    apply_global_settings(config, load_global_settings(SOURCES_PATH))
     
+    source = load_sources(SOURCES_PATH)["n8n-usecases"]
     server = YamlContextServer(config)
-    extractor = N8nUseCaseExtractor()
+    
+    # Crawl progress survives crashes; --resume continues from it
+    state = CrawlStateStore(n8n_dir / "crawl_state.sqlite")
+    if not resume:
+        state.reset()
+    extractor = N8nUseCaseExtractor(source, state)
     
     try:
-        # Target URLs
-        target_urls = [
-            "https://n8n.io/ai-agents/",
-            "https://n8n.io/itops/",
-            "https://n8n.io/secops/",
-            "https://n8n.io/embed/",
-            "https://n8n.io/automate-lead-management/",
-            "https://n8n.io/supercharge-your-crm/",
-            "https://n8n.io/limitless-integrations/",
-            "https://n8n.io/saas/"
-        ]
-        
         console.info("🚀 Starting deep extraction of n8n use cases...")
-        console.info(f"Target depth: L1-L4")
-        console.info(f"Processing {len(target_urls)} use case categories")
+        console.info(f"Target depth: L1-L{source.max_depth}")
+        console.info(f"Processing {len(source.primary_urls)} use case categories")
         
         # Extract all use cases
-        all_use_cases = []
-        
-        for url in target_urls:
-            console.info(f"\n📊 Processing use case: {url}")
-            use_case = await extractor.extract_use_case(server, url)
-            if use_case:
-                all_use_cases.append(use_case)
+        all_use_cases = await extractor.crawl(server)
         
         console.success(f"✅ Extracted {len(extractor.visited_urls)} unique URLs")
         
@@ -602,8 +623,12 @@ UseCase {
         import traceback
         traceback.print_exc()
     finally:
+        state.close()
         await server.web_fetcher.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract n8n use cases and workflow patterns")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted extraction")
+    args = parser.parse_args()
+    asyncio.run(main(resume=args.resume))
\ No newline at end of file
@@ -4,51 +4,79 @@ Slack API Documentation Deep Extraction Script
 Extracts complete hierarchical structure up to L4 depth
 """
 
+import argparse
 import asyncio
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from yaml_context_engineering.config import Config
+from yaml_context_engineering.crawler import (
+    CrawlEngine,
+    CrawlStateStore,
+    FrontierEntry,
+    SourceDefinition,
+    apply_global_settings,
+    load_global_settings,
+    load_sources
+)
 from yaml_context_engineering.server import YamlContextServer
 from yaml_context_engineering.utils.logging import console, setup_logging
 
 
+SOURCES_PATH = Path(__file__).parent / "config" / "sources.yaml"
+
+
 class SlackAPIExtractor:
     """Deep extractor for Slack API documentation."""
     
-    def __init__(self):
-        self.base_url = "https://api.slack.com"
+    def __init__(self, source: SourceDefinition, state: Optional[CrawlStateStore] = None):
+        self.source = source
         self.visited_urls = set()
-        self.hierarchy = {}
-        self.max_depth = 4
-        
-    async def extract_deep_structure(self, server: YamlContextServer, url: str, depth: int = 1) -> Dict[str, Any]:
-        """Extract deep hierarchical structure from URL."""
-        
-        if depth > self.max_depth or url in self.visited_urls:
-            return {}
+        self.nodes = {}
+        self.parents = {}
+        self.max_depth = source.max_depth
+        self.state = state
+        
+    async def crawl(self, server: YamlContextServer) -> List[Dict[str, Any]]:
+        """Crawl the source concurrently and return one tree per primary URL."""
+        
+        if self.state:
+            # Reuse pages finished by an interrupted run
+            for url in self.state.known():
+                saved = self.state.data(url)
+                if saved:
+                    self.nodes[url] = saved["node"]
+                    self.parents[url] = saved["parent"]
+                    self.visited_urls.add(url)
+        
+        async def on_page(entry: FrontierEntry, result: Dict[str, Any]) -> None:
+            self.visited_urls.add(entry.url)
+            if not result.get("success"):
+                return
             
-        self.visited_urls.add(url)
-        
-        console.info(f"[L{depth}] Extracting: {url}")
-        
-        # Fetch content
-        results = await server.web_fetcher.fetch([url])
-        if not results or not results[0]["success"]:
-            return {}
+            console.info(f"[L{entry.depth}] Extracting: {entry.url}")
+            structure = await server.structure_extractor.extract(result["content"])
+            node = self._build_node(entry.url, entry.depth, result, structure)
             
-        result = results[0]
+            self.nodes[entry.url] = node
+            self.parents[entry.url] = entry.parent
+            if self.state:
+                self.state.mark_done(entry.url, data={"node": node, "parent": entry.parent})
+        
+        engine = CrawlEngine(server.config, server.web_fetcher, server.url_discovery)
+        await engine.crawl_source(self.source, on_result=on_page, state=self.state)
         
-        # Extract structure
-        structure = await server.structure_extractor.extract(result["content"])
+        return self._assemble()
+    
+    def _build_node(self, url: str, depth: int, result: Dict[str, Any], structure: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the hierarchy node of one page."""
         
-        # Build hierarchical data
         node = {
             "url": url,
             "title": result.get("title", ""),
@@ -74,27 +102,24 @@ class SlackAPIExtractor:
             }
             node["headings"].append(heading_data)
         
-        # Extract child URLs if we haven't reached max depth
-        if depth < self.max_depth:
-            # Extract URLs from content
-            extracted_urls = result.get("extracted_urls", [])
-            
-            # Filter for API documentation URLs
-            api_urls = [
-                u for u in extracted_urls 
-                if u.startswith(self.base_url) and 
-                   ("/docs" in u or "/methods" in u or "/reference" in u)
-            ]
-            
-            # Process child URLs (limit to prevent explosion)
-            for child_url in api_urls[:5]:
-                if child_url not in self.visited_urls:
-                    await asyncio.sleep(1)  # Rate limiting
-                    child_node = await self.extract_deep_structure(server, child_url, depth + 1)
-                    if child_node:
-                        node["children"].append(child_node)
-        
         return node
+    
+    def _assemble(self) -> List[Dict[str, Any]]:
+        """Link crawled pages to the page they were found on."""
+        
+        for node in self.nodes.values():
+            node["children"] = []
+        
+        roots = []
+        for url, node in self.nodes.items():
+            parent = self.parents.get(url)
+            if parent in self.nodes:
+                self.nodes[parent]["children"].append(node)
+            else:
+                roots.append(node)
+        
+        order = {url: i for i, url in enumerate(self.source.primary_urls)}
+        return sorted(roots, key=lambda node: order.get(node["url"], len(order)))
         
     def generate_dsl(self, hierarchy: Dict[str, Any], indent: int = 0) -> str:
         """Generate DSL representation of hierarchy."""
@@ -136,51 +161,37 @@ class SlackAPIExtractor:
         return dsl
 
 
-async def main():
+async def main(resume: bool = False):
     """Main extraction function."""
     
     # Setup
     setup_logging("INFO", structured=False)
     config = Config.from_env()
+    apply_global_settings(config, load_global_settings(SOURCES_PATH))
     config.output.output_base_directory = Path("my-project/generated_contexts")
-    config.crawling.max_crawl_depth = 4
     
+    source = load_sources(SOURCES_PATH)["slack-api"]
     server = YamlContextServer(config)
-    extractor = SlackAPIExtractor()
+    
+    # Crawl progress survives crashes; --resume continues from it
+    state = CrawlStateStore(config.output.output_base_directory / "slack_crawl_state.sqlite")
+    if not resume:
+        state.reset()
+    extractor = SlackAPIExtractor(source, state)
     
     try:
-        # Primary documentation URLs
-        primary_urls = [
-            "https://api.slack.com/docs",
-            "https://api.slack.com/methods",
-            "https://api.slack.com/reference",
-            "https://api.slack.com/apis",
-            "https://api.slack.com/events-api",
-            "https://api.slack.com/rtm",
-            "https://api.slack.com/scopes",
-            "https://api.slack.com/authentication",
-            "https://api.slack.com/apps",
-            "https://api.slack.com/tools"
-        ]
-        
         console.info("🚀 Starting deep extraction of Slack API documentation...")
-        console.info(f"Target depth: L1-L4")
-        console.info(f"Processing {len(primary_urls)} primary URLs")
+        console.info(f"Target depth: L1-L{source.max_depth}")
+        console.info(f"Processing {len(source.primary_urls)} primary URLs")
         
         # Extract hierarchy
         full_hierarchy = {
             "root": "Slack API Documentation",
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "max_depth": 4,
-            "sections": []
+            "max_depth": source.max_depth,
+            "sections": await extractor.crawl(server)
         }
         
-        for url in primary_urls:
-            console.info(f"\n📄 Processing section: {url}")
-            section = await extractor.extract_deep_structure(server, url)
-            if section:
-                full_hierarchy["sections"].append(section)
-        
         console.success(f"✅ Extracted {len(extractor.visited_urls)} unique URLs")
         
         # Generate DSL
@@ -346,8 +357,12 @@ Node {
         import traceback
         traceback.print_exc()
     finally:
+        state.close()
         await server.web_fetcher.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract the Slack API documentation structure")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted extraction")
+    args = parser.parse_args()
+    asyncio.run(main(resume=args.resume))
\ No newline at end of file
@@ -2,12 +2,21 @@
 
 import asyncio
 import sys
+import time
 import click
 from pathlib import Path
 from typing import Optional
 
 from .server import YamlContextServer
 from .config import Config
+from .crawler import (
+    CrawlStateStore,
+    FingerprintManifest,
+    SourcePipeline,
+    apply_global_settings,
+    load_global_settings,
+    load_sources
+)
 from .utils.logging import console, setup_logging
 
 
@@ -27,7 +36,10 @@ def cli(ctx: click.Context, verbose: bool) -> None:
 @click.option('--output-dir', '-o', type=Path, help='Output directory')
 @click.option('--depth', '-d', type=int, default=2, help='Crawl depth')
 @click.option('--format', '-f', type=click.Choice(['yaml', 'markdown', 'json']), default='markdown', help='Output format')
-async def extract(sources: tuple, output_dir: Optional[Path], depth: int, format: str) -> None:
+@click.option('--incremental', is_flag=True, help='Skip sources whose content is unchanged since the last run')
+@click.option('--resume', is_flag=True, help='Continue an interrupted run, skipping URLs that were already extracted')
+async def extract(sources: tuple, output_dir: Optional[Path], depth: int, format: str,
+                  incremental: bool, resume: bool) -> None:
     """Extract context from multiple sources (URLs, files, or text)."""
     config = Config.from_env()
     
@@ -51,19 +63,43 @@ async def extract(sources: tuple, output_dir: Optional[Path], depth: int, format
         else:
             texts.append(source)
     
+    manifest = FingerprintManifest(config.output.output_base_directory) if incremental else None
+    
+    # Every run keeps its crawl state, so a crashed run can be continued
+    # with --resume; without it the state of the previous run is discarded
+    state = CrawlStateStore(config.output.output_base_directory)
+    if resume:
+        counts = state.counts()
+        console.info(f"Resuming: {counts['done']} done, {counts['failed']} failed")
+    else:
+        state.reset()
+    
     try:
         all_results = []
         
         # Process URLs
         if urls:
             for url in urls:
+                record = state.get(url)
+                if (record and record.status == "done" and record.output_path
+                        and (config.output.output_base_directory / record.output_path).exists()):
+                    console.info(f"Already extracted, skipping {url}")
+                    if manifest is not None:
+                        manifest.keep(url)
+                    continue
+                
                 console.info(f"Fetching content from {url}...")
+                state.add(url)
+                state.mark_in_progress(url)
                 results = await server.web_fetcher.fetch([url])
                 
                 if results and results[0]["success"]:
                     all_results.append((url, results[0]))
                 else:
                     console.error(f"Failed to fetch {url}")
+                    state.mark_failed(url, results[0].get("error") if results else None)
+                    if manifest is not None:
+                        manifest.keep(url)
         
         # Process files
         if files:
@@ -89,18 +125,13 @@ async def extract(sources: tuple, output_dir: Optional[Path], depth: int, format
                     "language": "unknown"
                 }))
         
+        extensions = {'markdown': 'md', 'yaml': 'yaml', 'json': 'json'}
+        
         # Process all results
         for source_name, result in all_results:
             if not result["success"]:
                 continue
             
-            # Extract structure
-            console.info(f"Extracting hierarchical structure for {source_name}...")
-            structure = await server.structure_extractor.extract(result["content"])
-            
-            # Save to file
-            console.info(f"Generating {format.upper()} documentation...")
-            
             # Generate filename
             if source_name.startswith('http'):
                 filename = Path(source_name).name or "extracted"
@@ -109,6 +140,23 @@ async def extract(sources: tuple, output_dir: Optional[Path], depth: int, format
             else:
                 filename = Path(source_name).stem
             
+            # Skip unchanged content in incremental mode
+            if manifest is not None:
+                status, fingerprint = manifest.classify(source_name, result["content"])
+                if status == "unchanged":
+                    console.info(f"Unchanged, skipping {source_name}")
+                    if source_name in urls:
+                        state.mark_done(source_name, manifest.pages[source_name].get("output_path"))
+                    continue
+                manifest.record(source_name, fingerprint, f"{filename}.{extensions[format]}")
+            
+            # Extract structure
+            console.info(f"Extracting hierarchical structure for {source_name}...")
+            structure = await server.structure_extractor.extract(result["content"])
+            
+            # Save to file
+            console.info(f"Generating {format.upper()} documentation...")
+            
             # Create output based on format
             if format == 'markdown':
                 await server.file_manager.execute(
@@ -176,6 +224,85 @@ async def extract(sources: tuple, output_dir: Optional[Path], depth: int, format
                 output_path.parent.mkdir(parents=True, exist_ok=True)
                 output_path.write_text(json_content, encoding='utf-8')
                 console.success(f"✅ Context extracted to: {output_path}")
+            
+            if source_name in urls:
+                state.mark_done(source_name, f"{filename}.{extensions[format]}")
+        
+        if manifest is not None:
+            report = manifest.finish()
+            manifest.save()
+            summary = report.summary()
+            console.info(
+                f"Added: {summary['added']}, changed: {summary['changed']}, "
+                f"unchanged: {summary['unchanged']}, removed: {summary['removed']}"
+            )
+            for url in report.removed:
+                console.info(f"  Removed: {url}")
+        
+    except Exception as e:
+        console.error(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        state.close()
+        await server.web_fetcher.close()
+
+
+@cli.command()
+@click.argument('source_id')
+@click.option('--sources', '-s', 'sources_path', type=Path, default=Path('config/sources.yaml'), help='Sources configuration file')
+@click.option('--output-dir', '-o', type=Path, help='Output directory')
+@click.option('--max-pages', type=int, help='Maximum number of pages to fetch')
+@click.option('--resume', is_flag=True, help='Continue an interrupted crawl')
+@click.option('--incremental', is_flag=True, help='Skip pages whose content is unchanged since the last run')
+@click.option('--sitemaps/--no-sitemaps', default=None, help='Seed the crawl from robots.txt and sitemap.xml')
+async def crawl(source_id: str, sources_path: Path, output_dir: Optional[Path], max_pages: Optional[int],
+                resume: bool, incremental: bool, sitemaps: Optional[bool]) -> None:
+    """Crawl a source defined in sources.yaml."""
+    if not sources_path.exists():
+        console.error(f"Sources file not found: {sources_path}")
+        sys.exit(1)
+    
+    sources = load_sources(sources_path)
+    if source_id not in sources:
+        console.error(f"Unknown source: {source_id} (available: {', '.join(sorted(sources))})")
+        sys.exit(1)
+    source = sources[source_id]
+    
+    config = Config.from_env()
+    apply_global_settings(config, load_global_settings(sources_path))
+    if output_dir:
+        config.output.output_base_directory = output_dir
+    
+    server = YamlContextServer(config)
+    pipeline = SourcePipeline(
+        config,
+        server.web_fetcher,
+        server.url_discovery,
+        server.structure_extractor,
+        server.file_manager
+    )
+    
+    try:
+        console.info(f"Crawling {source.name} ({len(source.primary_urls)} seed URLs, depth {source.max_depth})...")
+        summary = await pipeline.run(
+            source,
+            max_pages=max_pages,
+            resume=resume,
+            incremental=incremental,
+            sitemaps=sitemaps
+        )
+        
+        console.success(f"✅ {summary['pages_written']} context files written to: {summary['output_directory']}")
+        if summary['changes']:
+            changes = summary['changes']
+            console.info(
+                f"Added: {changes['added']}, changed: {changes['changed']}, "
+                f"unchanged: {changes['unchanged']}, removed: {changes['removed']}"
+            )
+        if summary['pages_duplicate']:
+            console.info(f"{summary['pages_duplicate']} duplicate pages not extracted")
+        if summary['pages_failed']:
+            console.warning(f"{summary['pages_failed']} pages failed, run with --resume to retry them")
         
     except Exception as e:
         console.error(f"Error: {e}")
@@ -232,6 +359,63 @@ async def analyze(file: Path, output_dir: Optional[Path]) -> None:
         sys.exit(1)
 
 
+@cli.command('analyze-many')
+@click.argument('paths', nargs=-1, required=True, type=Path)
+@click.option('--pattern', default='*.md', help='File pattern searched for in directories')
+@click.option('--workers', '-w', type=int, help='Worker processes, 0 uses one per CPU')
+@click.option('--output', type=Path, help='Write per-file results as JSON')
+async def analyze_many(paths: tuple, pattern: str, workers: Optional[int], output: Optional[Path]) -> None:
+    """Analyze the structure of many local files in parallel."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.rglob(pattern)))
+        elif path.exists():
+            files.append(path)
+        else:
+            console.warning(f"File not found: {path}")
+    if not files:
+        console.error("No files to analyze")
+        sys.exit(1)
+    
+    config = Config.from_env()
+    server = YamlContextServer(config)
+    
+    try:
+        console.info(f"Analyzing {len(files)} files...")
+        started = time.perf_counter()
+        summaries = []
+        async for item in server.structure_extractor.extract_many(paths=files, workers=workers):
+            summary = {"file": item["source"], "success": item["success"], "seconds": item["seconds"]}
+            if item["success"]:
+                summary["format_detected"] = item["result"]["format_detected"]
+                summary["total_headings"] = item["result"]["total_headings"]
+            else:
+                summary["error"] = item["error"]
+                console.warning(f"Failed to analyze {item['source']}: {item['error']}")
+            summaries.append(summary)
+        elapsed = time.perf_counter() - started
+        
+        failed = sum(not summary["success"] for summary in summaries)
+        console.success(f"✅ Analyzed {len(summaries) - failed} files in {elapsed:.1f}s ({len(summaries) / elapsed:.1f} files/s)")
+        if failed:
+            console.warning(f"{failed} files failed")
+        for summary in sorted(summaries, key=lambda s: s["seconds"], reverse=True)[:5]:
+            console.info(f"  {summary['seconds']:.3f}s {summary['file']}")
+        
+        if output:
+            import json
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(json.dumps(summaries, indent=2, ensure_ascii=False), encoding="utf-8")
+            console.info(f"Results written to: {output}")
+        
+    except Exception as e:
+        console.error(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        await server.structure_extractor.close()
+
+
 def generate_analysis_report(structure: dict) -> str:
     """Generate markdown report from structure analysis."""
     report = f"""# Structure Analysis Report
@@ -539,7 +723,7 @@ def main() -> None:
     # Check if this is an async command
     is_async_command = False
     if len(sys.argv) > 1:
-        if sys.argv[1] in ['extract', 'analyze']:
+        if sys.argv[1] in ['extract', 'crawl', 'analyze', 'analyze-many']:
             is_async_command = True
         elif sys.argv[1] == 'ldd' and len(sys.argv) > 2:
             # LDD subcommands are also async
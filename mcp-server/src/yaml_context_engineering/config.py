@@ -16,6 +16,26 @@ class CrawlingConfig:
     max_pages_per_domain: int = 100
     timeout_seconds: int = 30
     user_agent: str = "YAML-Context-Engineering-Agent/1.0"
+    max_concurrent_requests: int = 3
+    max_concurrent_per_host: int = 2  # Initial per-host cap, adapted to host responses
+    adaptive_max_per_host: int = 6  # Upper bound for the adaptive per-host cap
+    max_retries: int = 3  # Retries after 429/503, gateway errors and timeouts
+    max_retry_after_seconds: float = 300.0  # Longer Retry-After values are capped
+    cache_directory: Optional[Path] = None  # Response cache is disabled when unset
+    cache_duration_seconds: int = 86400
+    conversion_workers: int = 0  # HTML conversion processes, 0 converts inline
+    conversion_mode: str = "html2text"  # html2text, single_pass
+    http_backend: str = "aiohttp"  # aiohttp, httpx (HTTP/2 when h2 is installed)
+    dns_cache_ttl_seconds: int = 300
+    keepalive_timeout_seconds: float = 30.0
+    max_response_bytes: int = 5 * 1024 * 1024
+    oversized_response_policy: str = "truncate"  # truncate, abort
+    allowed_content_types: List[str] = field(default_factory=lambda: [
+        "text/", "application/xhtml+xml", "application/xml", "application/json"
+    ])
+    respect_robots_txt: bool = True
+    use_sitemaps: bool = False  # Seed source crawls from robots.txt/sitemap.xml
+    max_sitemaps: int = 50  # Sitemap files read per host, including nested indexes
 
 
 @dataclass
@@ -27,6 +47,13 @@ class ExtractionConfig:
     language_detection: bool = True
     extract_metadata: bool = True
     max_content_length: int = 100000
+    duplicate_policy: str = "alias"  # off, skip, alias
+    duplicate_threshold: float = 0.9  # Estimated similarity of near-duplicate pages
+    result_cache_bytes: int = 64 * 1024 * 1024  # In-memory extraction results, 0 disables
+    result_cache_directory: Optional[Path] = None  # On-disk extraction results are disabled when unset
+    result_cache_disk_bytes: int = 1024 * 1024 * 1024  # Size limit of on-disk extraction results, 0 for none
+    extraction_workers: int = 0  # Batch extraction processes, 0 uses one per CPU
+    input_directories: List[Path] = field(default_factory=list)  # Readable by batch extraction besides the output directory
 
 
 @dataclass
@@ -37,6 +64,7 @@ class OutputConfig:
     yaml_template_path: Optional[Path] = None
     create_index_files: bool = True
     prettify_output: bool = True
+    write_concurrency: int = 16  # Context files written at once by batch writes
 
 
 @dataclass
@@ -67,16 +95,50 @@ class Config:
             config.crawling.crawl_delay_seconds = float(delay)
         if max_pages := os.getenv("MCP_MAX_PAGES_PER_DOMAIN"):
             config.crawling.max_pages_per_domain = int(max_pages)
+        if max_concurrent := os.getenv("MCP_MAX_CONCURRENT_REQUESTS"):
+            config.crawling.max_concurrent_requests = int(max_concurrent)
+        if cache_dir := os.getenv("MCP_CACHE_DIRECTORY"):
+            config.crawling.cache_directory = Path(cache_dir)
+        if cache_duration := os.getenv("MCP_CACHE_DURATION"):
+            config.crawling.cache_duration_seconds = int(cache_duration)
+        if workers := os.getenv("MCP_CONVERSION_WORKERS"):
+            config.crawling.conversion_workers = int(workers)
+        if conversion_mode := os.getenv("MCP_CONVERSION_MODE"):
+            config.crawling.conversion_mode = conversion_mode
+        if http_backend := os.getenv("MCP_HTTP_BACKEND"):
+            config.crawling.http_backend = http_backend
+        if max_bytes := os.getenv("MCP_MAX_RESPONSE_BYTES"):
+            config.crawling.max_response_bytes = int(max_bytes)
+        if max_retries := os.getenv("MCP_MAX_RETRIES"):
+            config.crawling.max_retries = int(max_retries)
+        if use_sitemaps := os.getenv("MCP_USE_SITEMAPS"):
+            config.crawling.use_sitemaps = use_sitemaps.lower() in ("1", "true", "yes")
         
         # Extraction settings
         if granularity := os.getenv("MCP_CONTEXT_GRANULARITY"):
             config.extraction.context_granularity = granularity
         if summarization := os.getenv("MCP_CONTENT_SUMMARIZATION"):
             config.extraction.content_summarization = summarization
+        if duplicate_policy := os.getenv("MCP_DUPLICATE_POLICY"):
+            config.extraction.duplicate_policy = duplicate_policy
+        if result_cache_bytes := os.getenv("MCP_EXTRACTION_CACHE_BYTES"):
+            config.extraction.result_cache_bytes = int(result_cache_bytes)
+        if result_cache_dir := os.getenv("MCP_EXTRACTION_CACHE_DIRECTORY"):
+            config.extraction.result_cache_directory = Path(result_cache_dir)
+        if result_cache_disk_bytes := os.getenv("MCP_EXTRACTION_CACHE_DISK_BYTES"):
+            config.extraction.result_cache_disk_bytes = int(result_cache_disk_bytes)
+        if extraction_workers := os.getenv("MCP_EXTRACTION_WORKERS"):
+            config.extraction.extraction_workers = int(extraction_workers)
+        if input_directories := os.getenv("MCP_INPUT_DIRECTORIES"):
+            config.extraction.input_directories = [
+                Path(directory) for directory in input_directories.split(os.pathsep) if directory
+            ]
         
         # Output settings
         if output_dir := os.getenv("MCP_OUTPUT_DIRECTORY"):
             config.output.output_base_directory = Path(output_dir)
+        if write_concurrency := os.getenv("MCP_WRITE_CONCURRENCY"):
+            config.output.write_concurrency = int(write_concurrency)
         
         return config
     
@@ -92,10 +154,50 @@ class Config:
         if self.extraction.content_summarization not in valid_summarizations:
             raise ValueError(f"Invalid content_summarization: {self.extraction.content_summarization}")
         
+        # Validate duplicate page handling
+        valid_duplicate_policies = ["off", "skip", "alias"]
+        if self.extraction.duplicate_policy not in valid_duplicate_policies:
+            raise ValueError(f"Invalid duplicate_policy: {self.extraction.duplicate_policy}")
+        if not 0.0 < self.extraction.duplicate_threshold <= 1.0:
+            raise ValueError(f"duplicate_threshold must be between 0 and 1")
+        if self.extraction.result_cache_bytes < 0:
+            raise ValueError(f"result_cache_bytes must not be negative")
+        if self.extraction.result_cache_disk_bytes < 0:
+            raise ValueError(f"result_cache_disk_bytes must not be negative")
+        if self.extraction.extraction_workers < 0:
+            raise ValueError(f"extraction_workers must not be negative")
+        if self.output.write_concurrency < 1:
+            raise ValueError(f"write_concurrency must be at least 1")
+        
+        # Validate HTML conversion mode
+        valid_conversion_modes = ["html2text", "single_pass"]
+        if self.crawling.conversion_mode not in valid_conversion_modes:
+            raise ValueError(f"Invalid conversion_mode: {self.crawling.conversion_mode}")
+        
+        # Validate HTTP backend
+        valid_http_backends = ["aiohttp", "httpx"]
+        if self.crawling.http_backend not in valid_http_backends:
+            raise ValueError(f"Invalid http_backend: {self.crawling.http_backend}")
+        
+        # Validate oversized response policy
+        valid_oversized_policies = ["truncate", "abort"]
+        if self.crawling.oversized_response_policy not in valid_oversized_policies:
+            raise ValueError(f"Invalid oversized_response_policy: {self.crawling.oversized_response_policy}")
+        
         # Validate crawl depth
         if not 1 <= self.crawling.max_crawl_depth <= 10:
             raise ValueError(f"max_crawl_depth must be between 1 and 10")
         
         # Validate crawl delay
         if self.crawling.crawl_delay_seconds < 0.5:
-            raise ValueError(f"crawl_delay_seconds must be at least 0.5")
\ No newline at end of file
+            raise ValueError(f"crawl_delay_seconds must be at least 0.5")
+        
+        # Validate concurrency limits
+        if self.crawling.max_concurrent_requests < 1:
+            raise ValueError(f"max_concurrent_requests must be at least 1")
+        if self.crawling.max_concurrent_per_host < 1:
+            raise ValueError(f"max_concurrent_per_host must be at least 1")
+        if self.crawling.adaptive_max_per_host < self.crawling.max_concurrent_per_host:
+            raise ValueError(f"adaptive_max_per_host must be at least max_concurrent_per_host")
+        if self.crawling.max_retries < 0:
+            raise ValueError(f"max_retries must not be negative")
\ No newline at end of file
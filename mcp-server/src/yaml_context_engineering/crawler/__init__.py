@@ -0,0 +1,47 @@
+"""Crawl scheduling for YAML Context Engineering.
+
+This package provides the crawl frontier, per-host politeness scheduling and
+the concurrent crawl engine used to extract whole documentation sources.
+"""
+
+from .politeness import HostScheduler, TokenBucket, host_of
+from .frontier import CrawlFrontier, FrontierEntry
+from .canonical import URLCanonicalizer
+from .sources import SourceDefinition, apply_global_settings, load_global_settings, load_sources
+from .cache import CacheEntry, ResponseCache
+from .sitemaps import RobotsPolicy, SitemapDiscovery, SitemapEntry, SitemapParser
+from .engine import CrawlEngine
+from .state import CrawlRecord, CrawlStateStore
+from .incremental import ChangeReport, FingerprintManifest, content_fingerprint
+from .dedup import DuplicateMatch, NearDuplicateIndex, minhash_signature
+from .pipeline import SourcePipeline, page_path
+
+__all__ = [
+    'HostScheduler',
+    'TokenBucket',
+    'host_of',
+    'CrawlFrontier',
+    'FrontierEntry',
+    'URLCanonicalizer',
+    'SourceDefinition',
+    'load_sources',
+    'load_global_settings',
+    'apply_global_settings',
+    'CacheEntry',
+    'ResponseCache',
+    'RobotsPolicy',
+    'SitemapDiscovery',
+    'SitemapEntry',
+    'SitemapParser',
+    'CrawlEngine',
+    'CrawlRecord',
+    'CrawlStateStore',
+    'ChangeReport',
+    'FingerprintManifest',
+    'content_fingerprint',
+    'DuplicateMatch',
+    'NearDuplicateIndex',
+    'minhash_signature',
+    'SourcePipeline',
+    'page_path'
+]
@@ -0,0 +1,204 @@
+"""Persistent HTTP response cache for YAML Context Engineering."""
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+
+import aiofiles
+
+
+@dataclass
+class CacheEntry:
+    """Validators and bookkeeping for one cached URL."""
+    url: str
+    body_hash: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, ttl_seconds: float, now: Optional[float] = None) -> bool:
+        """Check whether the entry can be served without revalidation."""
+        now = time.time() if now is None else now
+        return now - self.fetched_at < ttl_seconds
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for a conditional GET revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """On-disk, content-addressed cache of processed fetch results.
+
+    Each normalized URL maps to a small JSON entry holding its validators
+    and the sha256 of the response body. Processed results are stored per
+    body hash and URL: links in them are resolved against the URL, so
+    identical bodies served under different URLs do not share a result.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float = 86400):
+        """Initialize the cache.
+
+        Args:
+            directory: Cache root directory
+            ttl_seconds: Seconds a cached response is served without revalidation
+        """
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._temp_ids = itertools.count()
+
+        (self.directory / "entries").mkdir(parents=True, exist_ok=True)
+        (self.directory / "blobs").mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Normalize a URL for use as a cache key.
+
+        Lower-cases scheme and host and drops the fragment, which is never
+        sent to the server.
+        """
+        parts = urlsplit(url)
+        return urlunsplit((
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path or "/",
+            parts.query,
+            ""
+        ))
+
+    @staticmethod
+    def hash_body(body: Union[bytes, str]) -> str:
+        """Return the content address of a response body."""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return hashlib.sha256(body).hexdigest()
+
+    def _entry_path(self, url: str) -> Path:
+        key = hashlib.sha256(self.normalize_url(url).encode("utf-8")).hexdigest()
+        return self.directory / "entries" / f"{key}.json"
+
+    def _blob_path(self, entry: CacheEntry) -> Path:
+        key = hashlib.sha256(f"{entry.body_hash}\0{entry.url}".encode("utf-8")).hexdigest()
+        return self.directory / "blobs" / key[:2] / f"{key}.json"
+
+    async def _write_json(self, path: Path, data: Dict[str, Any]) -> None:
+        """Write JSON atomically so readers never see partial files.
+
+        Every write uses its own temporary file, so concurrent writes of
+        one path, such as the shared blob of identical pages, do not
+        interfere; the last rename wins.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{next(self._temp_ids)}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(data, ensure_ascii=False))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    async def _read_json(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                return json.loads(await f.read())
+        except (OSError, ValueError):
+            return None
+
+    async def get(self, url: str) -> Optional[Tuple[CacheEntry, Dict[str, Any]]]:
+        """Look up a cached result.
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            Tuple of (entry, cached result) or None on a miss
+        """
+        data = await self._read_json(self._entry_path(url))
+        if data is None:
+            return None
+
+        try:
+            entry = CacheEntry(**data)
+        except TypeError:
+            return None
+        payload = await self._read_json(self._blob_path(entry))
+        if payload is None:
+            return None
+        return entry, payload
+
+    async def put(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        body: Union[bytes, str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> CacheEntry:
+        """Store a processed result for a URL.
+
+        Args:
+            url: Requested URL
+            payload: Processed fetch result
+            body: Raw response body, used as the content address
+            etag: ETag response header
+            last_modified: Last-Modified response header
+
+        Returns:
+            The stored cache entry
+        """
+        entry = CacheEntry(
+            url=self.normalize_url(url),
+            body_hash=self.hash_body(body),
+            fetched_at=time.time(),
+            etag=etag,
+            last_modified=last_modified
+        )
+
+        blob_path = self._blob_path(entry)
+        if not blob_path.exists():
+            try:
+                await self._write_json(blob_path, payload)
+            except OSError:
+                # Blobs are addressed by body and URL, so a blob written
+                # meanwhile by another writer is just as good
+                if not blob_path.exists():
+                    raise
+        await self._write_json(self._entry_path(url), asdict(entry))
+        return entry
+
+    async def touch(
+        self,
+        entry: CacheEntry,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> CacheEntry:
+        """Mark an entry as revalidated after a 304 response.
+
+        Args:
+            entry: Entry that was revalidated
+            etag: Optional updated ETag
+            last_modified: Optional updated Last-Modified
+
+        Returns:
+            The refreshed entry
+        """
+        entry.fetched_at = time.time()
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        await self._write_json(self._entry_path(entry.url), asdict(entry))
+        return entry
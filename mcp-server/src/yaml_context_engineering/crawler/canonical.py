@@ -0,0 +1,176 @@
+"""URL canonicalization applied before URLs reach the crawl frontier."""
+
+import fnmatch
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+
+# Tracking parameters that never change page content
+DEFAULT_DROP_PARAMS = ["utm_*", "fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl"]
+
+TRAILING_SLASH_MODES = ("keep", "strip", "add")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class URLCanonicalizer:
+    """Maps URLs to the canonical form used as the crawl's visited key.
+
+    Every discovered URL is canonicalized before it is looked up in the
+    visited set or pushed onto the frontier, and the canonical URL is the
+    one fetched. The defaults are safe for any site: fragments and
+    tracking parameters are dropped, scheme and host are lower-cased, the
+    default port is removed and query parameters are sorted. Per-source
+    rules in sources.yaml (``extraction_config.canonicalize``) can also
+    normalize trailing slashes, drop the whole query string, collapse
+    language mirrors such as ``/ja/`` onto ``/en/`` and apply regex
+    rewrites to the path.
+    """
+
+    def __init__(
+        self,
+        drop_fragment: bool = True,
+        drop_params: Optional[Iterable[str]] = None,
+        drop_query: bool = False,
+        sort_query: bool = True,
+        trailing_slash: str = "keep",
+        language_mirrors: Optional[Iterable[str]] = None,
+        default_language: str = "en",
+        rewrites: Optional[Iterable[Tuple[str, str]]] = None,
+        cache_size: int = 65536
+    ):
+        """Initialize the canonicalizer.
+
+        Args:
+            drop_fragment: Remove ``#fragment``
+            drop_params: Glob patterns of query parameters to remove,
+                defaults to ``DEFAULT_DROP_PARAMS``
+            drop_query: Remove the whole query string
+            sort_query: Sort the remaining query parameters
+            trailing_slash: ``keep``, ``strip`` or ``add`` the trailing
+                slash of non-root paths; ``add`` skips paths that look
+                like files
+            language_mirrors: Language codes whose leading path segment is
+                replaced by ``default_language``
+            default_language: Language segment mirrors collapse onto; empty
+                removes the segment
+            rewrites: (regex, replacement) pairs applied to the path in order
+            cache_size: Number of canonicalized URLs kept in memory
+
+        Raises:
+            ValueError: If ``trailing_slash`` is not a known mode
+        """
+        if trailing_slash not in TRAILING_SLASH_MODES:
+            raise ValueError(f"trailing_slash must be one of {', '.join(TRAILING_SLASH_MODES)}")
+
+        self.drop_fragment = drop_fragment
+        self.drop_params = list(DEFAULT_DROP_PARAMS if drop_params is None else drop_params)
+        self.drop_query = drop_query
+        self.sort_query = sort_query
+        self.trailing_slash = trailing_slash
+        self.language_mirrors = {language.lower() for language in language_mirrors or []}
+        self.default_language = default_language
+        self.rewrites = [(re.compile(pattern), replacement) for pattern, replacement in rewrites or []]
+
+        self._drop_param = re.compile(
+            "|".join(fnmatch.translate(pattern) for pattern in self.drop_params)
+        ) if self.drop_params else None
+        # Pages link to the same URLs over and over, so results are cached
+        self.canonicalize = lru_cache(maxsize=cache_size)(self._canonicalize)
+
+    @classmethod
+    def from_dict(cls, spec: Optional[Dict[str, Any]]) -> "URLCanonicalizer":
+        """Create a canonicalizer from a sources.yaml ``canonicalize`` section.
+
+        Args:
+            spec: Rule settings; ``rewrites`` is a list of mappings with
+                ``pattern`` and ``replace`` keys
+
+        Returns:
+            Configured canonicalizer
+
+        Raises:
+            ValueError: On unknown settings
+        """
+        spec = dict(spec or {})
+        known = {
+            "drop_fragment", "drop_params", "drop_query", "sort_query",
+            "trailing_slash", "language_mirrors", "default_language", "rewrites"
+        }
+        unknown = set(spec) - known
+        if unknown:
+            raise ValueError(f"Unknown canonicalization settings: {', '.join(sorted(unknown))}")
+
+        if "rewrites" in spec:
+            spec["rewrites"] = [(rule["pattern"], rule.get("replace", "")) for rule in spec["rewrites"] or []]
+        if spec.get("drop_params") is not None:
+            # Custom parameters extend the tracking parameter defaults
+            spec["drop_params"] = DEFAULT_DROP_PARAMS + list(spec["drop_params"])
+        return cls(**spec)
+
+    def _canonicalize(self, url: str) -> str:
+        """Canonicalize one URL; use the cached ``canonicalize`` instead."""
+        try:
+            parts = urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return url
+        scheme = parts.scheme.lower()
+        if scheme not in _DEFAULT_PORTS:
+            return url
+
+        netloc = (parts.hostname or "").rstrip(".")
+        if ":" in netloc:
+            netloc = f"[{netloc}]"  # IPv6 literal
+        if port is not None and port != _DEFAULT_PORTS[scheme]:
+            netloc = f"{netloc}:{port}"
+        if parts.username or parts.password:
+            netloc = parts.netloc.rsplit("@", 1)[0] + "@" + netloc
+
+        return urlunsplit((
+            scheme,
+            netloc,
+            self._canonical_path(parts.path),
+            self._canonical_query(parts.query),
+            "" if self.drop_fragment else parts.fragment
+        ))
+
+    def _canonical_path(self, path: str) -> str:
+        path = path or "/"
+
+        if self.language_mirrors:
+            segments = path.split("/")
+            if len(segments) > 1 and segments[1].lower() in self.language_mirrors:
+                if self.default_language:
+                    segments[1] = self.default_language
+                else:
+                    del segments[1]
+                path = "/".join(segments) or "/"
+
+        for pattern, replacement in self.rewrites:
+            path = pattern.sub(replacement, path)
+
+        if path != "/":
+            if self.trailing_slash == "strip":
+                path = path.rstrip("/") or "/"
+            elif self.trailing_slash == "add" and not path.endswith("/"):
+                if "." not in path.rsplit("/", 1)[-1]:
+                    path += "/"
+        return path
+
+    def _canonical_query(self, query: str) -> str:
+        if self.drop_query or not query:
+            return ""
+
+        # Work on the raw pairs so the original percent-encoding is kept
+        params = [param for param in query.split("&") if param]
+        if self._drop_param is not None:
+            params = [
+                param for param in params
+                if not self._drop_param.match(unquote_plus(param.split("=", 1)[0]))
+            ]
+        if self.sort_query:
+            params.sort()
+        return "&".join(params)
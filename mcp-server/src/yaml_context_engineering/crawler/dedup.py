@@ -0,0 +1,245 @@
+"""Near-duplicate page detection with MinHash signatures and LSH."""
+
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .incremental import content_fingerprint, normalize_markdown
+
+
+Signature = Tuple[int, ...]
+
+_WORD = re.compile(r"\w+")
+_EMPTY = 0xFFFFFFFF  # Larger than any 32-bit bin value
+
+
+def minhash_signature(content: str, num_perm: int = 128, shingle_size: int = 5) -> Signature:
+    """Compute a MinHash signature of normalized markdown.
+
+    Uses one-permutation hashing: every word shingle is hashed once with
+    CRC32, the hash picks one of ``num_perm`` bins and each bin keeps its
+    minimum. Empty bins borrow the value of the next non-empty bin, so
+    signatures of short pages stay comparable. This is a single pass over
+    the page instead of ``num_perm`` hash functions per shingle.
+
+    Args:
+        content: Page markdown
+        num_perm: Signature length
+        shingle_size: Words per shingle
+
+    Returns:
+        Signature of ``num_perm`` integers
+    """
+    words = _WORD.findall(normalize_markdown(content).lower())
+    shingles = max(1, len(words) - shingle_size + 1)
+
+    bins = [_EMPTY] * num_perm
+    for i in range(shingles):
+        value = zlib.crc32(" ".join(words[i:i + shingle_size]).encode("utf-8"))
+        index = value % num_perm
+        value //= num_perm
+        if value < bins[index]:
+            bins[index] = value
+
+    # Densify: fill empty bins from the next non-empty one, wrapping around
+    if _EMPTY in bins and any(value != _EMPTY for value in bins):
+        for index in range(num_perm):
+            offset = 1
+            while bins[index] == _EMPTY:
+                value = bins[(index + offset) % num_perm]
+                if value != _EMPTY:
+                    bins[index] = value + offset * _EMPTY  # Keep borrowed values distinct
+                offset += 1
+    return tuple(bins)
+
+
+def estimate_similarity(first: Signature, second: Signature) -> float:
+    """Estimate the Jaccard similarity of two pages from their signatures."""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+@dataclass
+class DuplicateMatch:
+    """An earlier page that a new page duplicates."""
+    url: str
+    output_path: Optional[str]
+    similarity: float
+
+
+class NearDuplicateIndex:
+    """LSH index of page signatures for one crawl.
+
+    Signatures are split into bands; pages sharing any band are candidates
+    and are confirmed by their estimated similarity. With the defaults (16
+    bands of 8 rows) pairs above about 0.7 similarity almost always become
+    candidates, and ``threshold`` decides which of them are duplicates.
+    Exact copies are found by fingerprint without computing a signature.
+
+    Pages may be given a rank. A page ranked before the original it
+    duplicates takes its place, so with concurrent fetches the original of
+    a group does not depend on which page finished first.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5
+    ):
+        """Initialize the index.
+
+        Args:
+            threshold: Minimum estimated similarity of a duplicate
+            num_perm: Signature length
+            bands: LSH bands; must divide ``num_perm``
+            shingle_size: Words per shingle
+
+        Raises:
+            ValueError: If ``bands`` does not divide ``num_perm``
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        self._pages: Dict[str, Tuple[Optional[str], Signature]] = {}
+        self._ranks: Dict[str, Any] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._page_fingerprints: Dict[str, str] = {}
+        self._buckets: List[Dict[Signature, List[str]]] = [defaultdict(list) for _ in range(bands)]
+        # Original URL -> duplicate URL -> signature, None if unknown
+        self._duplicates: Dict[str, Dict[str, Optional[Signature]]] = defaultdict(dict)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def signature(self, content: str) -> Signature:
+        """Compute the signature of a page with the index settings."""
+        return minhash_signature(content, self.num_perm, self.shingle_size)
+
+    def _bands(self, signature: Signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def query(self, signature: Signature) -> Optional[DuplicateMatch]:
+        """Find the most similar indexed page at or above the threshold."""
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best = None
+        for url in candidates:
+            output_path, other = self._pages[url]
+            similarity = estimate_similarity(signature, other)
+            if similarity < self.threshold:
+                continue
+            # Ties go to the lowest URL, not to set order
+            if best is None or (similarity, best.url) > (best.similarity, url):
+                best = DuplicateMatch(url, output_path, similarity)
+        return best
+
+    def add(self, url: str, signature: Signature, output_path: Optional[str] = None, rank: Any = None) -> None:
+        """Index a page."""
+        self._pages[url] = (output_path, signature)
+        self._ranks[url] = rank
+        for band, key in self._bands(signature):
+            self._buckets[band][key].append(url)
+
+    def add_duplicate(self, url: str, original: str) -> None:
+        """Record a page already known to duplicate an indexed page."""
+        if original in self._pages:
+            self._duplicates[original].setdefault(url, None)
+
+    def _remove(self, url: str) -> Tuple[Optional[str], Signature]:
+        output_path, signature = self._pages.pop(url)
+        self._ranks.pop(url, None)
+        for band, key in self._bands(signature):
+            self._buckets[band][key].remove(url)
+        return output_path, signature
+
+    def assign(
+        self,
+        url: str,
+        content: str,
+        output_path: Optional[str] = None,
+        rank: Any = None
+    ) -> Tuple[Optional[DuplicateMatch], Dict[str, DuplicateMatch]]:
+        """Find the original of a page, indexing the page if it is one.
+
+        Args:
+            url: Page URL
+            content: Page markdown
+            output_path: File the page is written to, if it is an original
+            rank: Sort key of the page; lower ranks are preferred as originals,
+                pages without a rank never displace an original
+
+        Returns:
+            Tuple of (match of the original, None if the page is one itself;
+            pages that now duplicate this page instead of the original it
+            displaced, with their new match)
+        """
+        fingerprint = content_fingerprint(content)
+        signature = None
+        original = self._fingerprints.get(fingerprint)
+        if original == url:
+            return None, {}
+        if original is not None:
+            match = DuplicateMatch(original, self._pages[original][0], 1.0)
+        else:
+            signature = self.signature(content)
+            match = self.query(signature)
+            if match is not None and match.url == url:
+                return None, {}
+
+        if match is None:
+            self._fingerprints.setdefault(fingerprint, url)
+            self._page_fingerprints[url] = fingerprint
+            self.add(url, signature, output_path, rank)
+            return None, {}
+
+        if signature is None:
+            signature = self._pages[match.url][1]
+        current = self._ranks.get(match.url)
+        if rank is None or current is None or not rank < current:
+            self._duplicates[match.url][url] = signature
+            return match, {}
+
+        # This page takes the place of the original it duplicates
+        _, displaced_signature = self._remove(match.url)
+        self._fingerprints[self._page_fingerprints.pop(match.url)] = url
+        self._fingerprints[fingerprint] = url
+        self._page_fingerprints[url] = fingerprint
+        self.add(url, signature, output_path, rank)
+
+        duplicates = self._duplicates.pop(match.url, {})
+        duplicates[match.url] = displaced_signature
+        moved = {}
+        for duplicate, duplicate_signature in duplicates.items():
+            # Duplicates restored without a signature are compared through
+            # the page they duplicated
+            similarity = estimate_similarity(duplicate_signature or displaced_signature, signature)
+            self._duplicates[url][duplicate] = duplicate_signature
+            moved[duplicate] = DuplicateMatch(url, output_path, similarity)
+        return None, moved
+
+    def check(self, url: str, content: str, output_path: Optional[str] = None) -> Optional[DuplicateMatch]:
+        """Return the page this one duplicates, or index it as an original.
+
+        Args:
+            url: Page URL
+            content: Page markdown
+            output_path: File the page is written to, if it is an original
+
+        Returns:
+            Match of the earlier page, None if the page is new
+        """
+        return self.assign(url, content, output_path)[0]
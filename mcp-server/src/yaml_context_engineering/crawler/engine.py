@@ -0,0 +1,289 @@
+"""Concurrent crawl engine for YAML Context Engineering."""
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from ..config import Config
+from ..utils.logging import get_logger
+from .canonical import URLCanonicalizer
+from .frontier import CrawlFrontier, FrontierEntry
+from .sitemaps import RobotsPolicy, robots_allows
+from .sources import SourceDefinition
+from .state import CrawlStateStore
+
+if TYPE_CHECKING:
+    # The tools import the crawler package, so only import them for typing
+    from ..tools.web_content_fetcher import WebContentFetcher
+    from ..tools.url_discovery_engine import URLDiscoveryEngine
+
+
+ResultCallback = Callable[[FrontierEntry, Dict[str, Any]], Awaitable[None]]
+
+
+class CrawlEngine:
+    """Crawls many hosts in parallel while staying polite to each one.
+
+    Pages are taken from a ``CrawlFrontier`` ordered by the priority scores
+    of ``URLDiscoveryEngine``, up to ``max_concurrent_requests`` at a time,
+    and only when the ``HostScheduler`` of the fetcher allows the host to be
+    contacted. With a response cache, new URLs are first looked up in it:
+    fresh cache hits are served without a host slot or crawl delay, and
+    only misses and stale entries wait for the scheduler.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        fetcher: "WebContentFetcher",
+        discovery: "URLDiscoveryEngine"
+    ):
+        """Initialize the crawl engine.
+
+        Args:
+            config: Server configuration
+            fetcher: Fetcher used for page downloads
+            discovery: Discovery engine used to score child URLs
+        """
+        self.config = config
+        self.fetcher = fetcher
+        self.discovery = discovery
+        self.scheduler = fetcher.scheduler
+        self.canonicalizer = URLCanonicalizer()
+        self.logger = get_logger(__name__)
+
+    async def _fetch_entry(self, entry: FrontierEntry, timeout: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch a frontier entry and release its host slot."""
+        try:
+            return await self.fetcher.fetch_url(entry.url, timeout=timeout)
+        finally:
+            self.scheduler.release(entry.host)
+
+    def _expand(
+        self,
+        frontier: CrawlFrontier,
+        entry: FrontierEntry,
+        result: Dict[str, Any],
+        url_filter: Optional[Callable[[str], bool]],
+        state: Optional[CrawlStateStore] = None,
+        canonicalize: Optional[Callable[[str], str]] = None,
+        push: Optional[Callable[..., bool]] = None
+    ) -> int:
+        """Push the links of a fetched page onto the frontier.
+
+        Returns:
+            Number of URLs added
+        """
+        push = push or frontier.push
+        canonicalize = canonicalize or self.canonicalizer.canonicalize
+        canonical = dict.fromkeys(canonicalize(url) for url in result.get("extracted_urls", []))
+        links = [
+            url for url in canonical
+            if url not in frontier and (url_filter is None or url_filter(url))
+        ]
+        if not links:
+            return 0
+
+        added = []
+        for url_info in self.discovery.prioritize(links, entry.host):
+            if push(
+                url_info["url"],
+                priority=url_info["priority_score"],
+                depth=entry.depth + 1,
+                parent=entry.url
+            ):
+                added.append((url_info["url"], entry.depth + 1, url_info["priority_score"], entry.url))
+
+        if state is not None and added:
+            state.add_many(added)
+        return len(added)
+
+    async def crawl(
+        self,
+        seed_urls: List[str],
+        max_depth: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        url_filter: Optional[Callable[[str], bool]] = None,
+        on_result: Optional[ResultCallback] = None,
+        state: Optional[CrawlStateStore] = None,
+        timeout: Optional[int] = None,
+        canonicalize: Optional[Callable[[str], str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Crawl outwards from seed URLs.
+
+        Args:
+            seed_urls: URLs to start from (depth 1)
+            max_depth: Maximum crawl depth, defaults to config
+            max_pages: Optional cap on the number of fetched pages
+            url_filter: Optional predicate deciding which links to follow
+            on_result: Optional coroutine called for every fetched page
+            state: Optional durable state; a crawl with existing state
+                resumes from its pending URLs and skips finished ones
+            timeout: Optional per-request timeout in seconds
+            canonicalize: Maps URLs to the canonical form used for the
+                visited set and the frontier, defaults to the engine's
+                ``URLCanonicalizer``
+
+        Returns:
+            List of fetch results in completion order
+        """
+        max_depth = max_depth or self.config.crawling.max_crawl_depth
+        limit = self.config.crawling.max_concurrent_requests
+        max_retries = self.config.crawling.max_retries
+        canonicalize = canonicalize or self.canonicalizer.canonicalize
+        seed_urls = list(dict.fromkeys(map(canonicalize, seed_urls)))
+
+        frontier = CrawlFrontier(self.scheduler)
+        # New URLs waiting for a response cache lookup
+        unchecked: Deque[FrontierEntry] = deque()
+
+        def push(url: str, priority: float = 0.5, depth: int = 1, parent: Optional[str] = None) -> bool:
+            entry = frontier.claim(url, priority, depth, parent)
+            if entry is None:
+                return False
+            if self.fetcher.cache is not None:
+                unchecked.append(entry)
+            else:
+                frontier.enqueue(entry)
+            return True
+
+        if state is not None:
+            state.add_many((url, 1, 1.0, None) for url in seed_urls)
+            for record in state.pending():
+                push(record.url, priority=record.priority, depth=record.depth, parent=record.parent)
+            frontier.mark_seen(state.known())
+        else:
+            for url in seed_urls:
+                push(url, priority=1.0, depth=1)
+
+        self.logger.info(f"Starting crawl of {len(frontier) + len(unchecked)} seed URLs",
+                        max_depth=max_depth,
+                        concurrency=limit)
+
+        pending: Dict[asyncio.Task, FrontierEntry] = {}
+        results: List[Dict[str, Any]] = []
+        dispatched = 0
+
+        def can_dispatch() -> bool:
+            return (len(frontier) > 0 or len(unchecked) > 0) and (max_pages is None or dispatched < max_pages)
+
+        try:
+            while pending or can_dispatch():
+                wait = None
+                while len(pending) < limit and can_dispatch():
+                    if unchecked:
+                        # Cache lookups need no host slot
+                        entry = unchecked.popleft()
+                        task = asyncio.ensure_future(self.fetcher.cached_result(entry.url))
+                    else:
+                        entry, wait = frontier.pop_ready()
+                        if entry is None:
+                            break
+                        if state is not None:
+                            state.mark_in_progress(entry.url)
+                        task = asyncio.ensure_future(self._fetch_entry(entry, timeout))
+                    pending[task] = entry
+                    dispatched += 1
+                    wait = None
+
+                # Wake up when a page completes or when a waiting host becomes ready
+                wake_after = wait if wait is not None and wait != float("inf") else None
+                if not pending:
+                    await asyncio.sleep(wake_after if wake_after is not None else 0.05)
+                    continue
+
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=wake_after,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    entry = pending.pop(task)
+                    result = task.result()
+
+                    if result is None:
+                        # Not fresh in the cache; fetch it once its host is ready
+                        frontier.enqueue(entry)
+                        dispatched -= 1
+                        continue
+
+                    if result.get("retryable") and entry.attempts < max_retries:
+                        # The host pushed back; the scheduler delays its next slot
+                        frontier.requeue(entry)
+                        dispatched -= 1
+                        continue
+
+                    result.setdefault("depth", entry.depth)
+                    results.append(result)
+
+                    if on_result is not None:
+                        await on_result(entry, result)
+
+                    if result.get("success") and entry.depth < max_depth:
+                        self._expand(frontier, entry, result, url_filter, state, canonicalize, push)
+
+                    if state is not None:
+                        # Only after on_result, so an interrupted write is redone
+                        if result.get("success"):
+                            state.mark_done(entry.url)
+                        else:
+                            state.mark_failed(entry.url, result.get("error"))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.logger.info(f"Crawl finished: {len(results)} pages fetched",
+                        remaining=len(frontier),
+                        hosts=self.scheduler.metrics())
+        return results
+
+    async def crawl_source(
+        self,
+        source: SourceDefinition,
+        max_pages: Optional[int] = None,
+        on_result: Optional[ResultCallback] = None,
+        state: Optional[CrawlStateStore] = None,
+        seed_urls: Optional[List[str]] = None,
+        robots: Optional[Dict[str, RobotsPolicy]] = None
+    ) -> List[Dict[str, Any]]:
+        """Crawl a source from sources.yaml with its own depth and rate limit.
+
+        Args:
+            source: Source definition
+            max_pages: Optional cap on the number of fetched pages
+            on_result: Optional coroutine called for every fetched page
+            state: Optional durable state for resumable crawls
+            seed_urls: URLs to start from, defaults to the primary URLs
+            robots: Optional robots.txt policies by host; disallowed URLs
+                are skipped and Crawl-delay is honored
+
+        Returns:
+            List of fetch results in completion order
+        """
+        robots = robots or {}
+        for host, delay in source.host_delays().items():
+            policy = robots.get(host)
+            if policy is not None and policy.crawl_delay:
+                delay = max(delay, policy.crawl_delay)
+            self.scheduler.set_host_delay(host, delay)
+
+        def url_filter(url: str) -> bool:
+            return source.accepts(url) and robots_allows(robots, url)
+
+        seed_urls = source.primary_urls if seed_urls is None else seed_urls
+        seeds = [
+            url for url in map(source.canonicalizer.canonicalize, seed_urls)
+            if robots_allows(robots, url)
+        ]
+
+        return await self.crawl(
+            seeds,
+            max_depth=source.max_depth,
+            max_pages=max_pages,
+            url_filter=url_filter,
+            on_result=on_result,
+            state=state,
+            timeout=source.timeout,
+            canonicalize=source.canonicalizer.canonicalize
+        )
@@ -0,0 +1,148 @@
+"""Priority crawl frontier for YAML Context Engineering."""
+
+import heapq
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .politeness import HostScheduler, host_of
+
+
+@dataclass
+class FrontierEntry:
+    """A URL waiting to be crawled."""
+    url: str
+    priority: float = 0.5
+    depth: int = 1
+    parent: Optional[str] = None
+    attempts: int = 0  # Times the URL was requeued after the host pushed back
+
+    @property
+    def host(self) -> str:
+        """Host key of the entry URL."""
+        return host_of(self.url)
+
+
+class CrawlFrontier:
+    """Priority queue of URLs to crawl, partitioned by host.
+
+    URLs are kept in one heap per host so that the highest-priority URL of
+    any host that the scheduler allows to be contacted right now can be
+    picked without starving other hosts behind a slow one.
+    """
+
+    def __init__(self, scheduler: HostScheduler):
+        """Initialize the frontier.
+
+        Args:
+            scheduler: Politeness scheduler deciding which hosts are ready
+        """
+        self.scheduler = scheduler
+        self._queues: Dict[str, List[Tuple[float, int, FrontierEntry]]] = {}
+        self._seen: Set[str] = set()
+        self._counter = itertools.count()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._seen
+
+    @property
+    def seen(self) -> Set[str]:
+        """All URLs that were ever accepted by the frontier."""
+        return self._seen
+
+    def mark_seen(self, urls: Iterable[str]) -> None:
+        """Reject URLs that were crawled before, e.g. in a resumed crawl."""
+        self._seen.update(urls)
+
+    def push(
+        self,
+        url: str,
+        priority: float = 0.5,
+        depth: int = 1,
+        parent: Optional[str] = None
+    ) -> bool:
+        """Add a URL to the frontier unless it was seen before.
+
+        Args:
+            url: URL to crawl
+            priority: Priority score, higher is crawled first
+            depth: Crawl depth of the URL
+            parent: URL of the page the URL was found on
+
+        Returns:
+            True if the URL was added
+        """
+        entry = self.claim(url, priority, depth, parent)
+        if entry is None:
+            return False
+        self.enqueue(entry)
+        return True
+
+    def claim(
+        self,
+        url: str,
+        priority: float = 0.5,
+        depth: int = 1,
+        parent: Optional[str] = None
+    ) -> Optional[FrontierEntry]:
+        """Mark a URL as seen and return its entry without queueing it.
+
+        Lets callers handle the URL another way first, e.g. serve it from
+        a cache, and ``enqueue`` it only if it still has to be fetched.
+
+        Returns:
+            New entry, or None if the URL was seen before
+        """
+        if url in self._seen:
+            return None
+        self._seen.add(url)
+        return FrontierEntry(url=url, priority=priority, depth=depth, parent=parent)
+
+    def requeue(self, entry: FrontierEntry) -> None:
+        """Put a popped entry back to retry it, counting the attempt."""
+        entry.attempts += 1
+        self.enqueue(entry)
+
+    def enqueue(self, entry: FrontierEntry) -> None:
+        """Queue a claimed entry for fetching."""
+        queue = self._queues.setdefault(entry.host, [])
+        heapq.heappush(queue, (-entry.priority, next(self._counter), entry))
+        self._size += 1
+
+    def pop_ready(self) -> Tuple[Optional[FrontierEntry], float]:
+        """Pop the best entry whose host may be contacted now.
+
+        The host slot is acquired on the scheduler before returning; the
+        caller must call ``scheduler.release(entry.host)`` when done.
+
+        Returns:
+            Tuple of (entry, 0.0) or (None, seconds until a host is ready);
+            the wait is ``math.inf`` if every pending host is at its cap
+        """
+        best_host = None
+        best_key = None
+        wait = math.inf
+
+        for host, queue in self._queues.items():
+            ready_in = self.scheduler.ready_in(host)
+            if ready_in > 0:
+                wait = min(wait, ready_in)
+                continue
+            key = queue[0][:2]
+            if best_key is None or key < best_key:
+                best_host, best_key = host, key
+
+        if best_host is None or not self.scheduler.try_acquire(best_host):
+            return None, wait
+
+        queue = self._queues[best_host]
+        _, _, entry = heapq.heappop(queue)
+        if not queue:
+            del self._queues[best_host]
+        self._size -= 1
+        return entry, 0.0
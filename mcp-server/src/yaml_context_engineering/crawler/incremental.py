@@ -0,0 +1,190 @@
+"""Content fingerprints for incremental re-crawls."""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import yaml
+
+
+_TRAILING_WHITESPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_markdown(content: str) -> str:
+    """Normalize markdown so that formatting noise does not change fingerprints.
+
+    Args:
+        content: Markdown content
+
+    Returns:
+        Content with unified newlines, no trailing whitespace and collapsed
+        blank lines
+    """
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+    content = _TRAILING_WHITESPACE.sub("", content)
+    content = _BLANK_LINES.sub("\n\n", content)
+    return content.strip()
+
+
+def content_fingerprint(content: str) -> str:
+    """Return the sha256 fingerprint of normalized markdown."""
+    return hashlib.sha256(normalize_markdown(content).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ChangeReport:
+    """Pages added, changed, unchanged and removed in a re-crawl."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, int]:
+        """Counts per change type."""
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged),
+            "removed": len(self.removed)
+        }
+
+
+class FingerprintManifest:
+    """Per-URL content fingerprints stored next to the generated contexts.
+
+    The manifest is a YAML file like the ``contexts/*/manifest.yaml`` files
+    and maps each source URL to the fingerprint of its normalized markdown
+    and the file generated from it. Pages whose fingerprint is unchanged
+    and whose output file still exists can skip extraction and writing.
+    """
+
+    FILENAME = "fingerprints.yaml"
+
+    def __init__(self, directory: Union[str, Path]):
+        """Load the manifest of an output directory.
+
+        Args:
+            directory: Output directory holding the manifest
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / self.FILENAME
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.report = ChangeReport()
+        self._seen: Set[str] = set()
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+            self.pages = dict(data.get("pages", {}) or {})
+
+    def classify(self, url: str, content: str) -> Tuple[str, str]:
+        """Compare a page against the manifest.
+
+        Args:
+            url: Source URL
+            content: Page markdown
+
+        Returns:
+            Tuple of (status, fingerprint); status is ``added``, ``changed``
+            or ``unchanged``
+        """
+        fingerprint = content_fingerprint(content)
+        self._seen.add(url)
+        previous = self.pages.get(url)
+
+        if previous is None:
+            status = "added"
+        elif previous.get("fingerprint") != fingerprint or not self._output_exists(previous):
+            status = "changed"
+        else:
+            status = "unchanged"
+
+        getattr(self.report, status).append(url)
+        return status, fingerprint
+
+    def _output_exists(self, entry: Dict[str, Any]) -> bool:
+        output_path = entry.get("output_path")
+        return not output_path or (self.directory / output_path).exists()
+
+    def record(self, url: str, fingerprint: str, output_path: Optional[str] = None) -> None:
+        """Record the fingerprint and output file of a processed page.
+
+        Args:
+            url: Source URL
+            fingerprint: Fingerprint returned by ``classify``
+            output_path: Output file relative to the manifest directory
+        """
+        self._seen.add(url)
+        self.pages[url] = {
+            "fingerprint": fingerprint,
+            "output_path": output_path,
+            "last_changed": datetime.utcnow().isoformat() + "Z"
+        }
+
+    def check_lastmod(self, url: str, lastmod: Optional[str]) -> bool:
+        """Report a page as unchanged if its sitemap lastmod is unchanged.
+
+        Args:
+            url: Source URL
+            lastmod: ``<lastmod>`` of the page in the sitemap
+
+        Returns:
+            True if the page can be skipped without fetching it
+        """
+        previous = self.pages.get(url)
+        if not lastmod or previous is None or previous.get("lastmod") != lastmod:
+            return False
+        if not self._output_exists(previous):
+            return False
+
+        self._seen.add(url)
+        self.report.unchanged.append(url)
+        return True
+
+    def set_lastmod(self, url: str, lastmod: Optional[str]) -> None:
+        """Remember the sitemap lastmod of a recorded page."""
+        if url in self.pages and lastmod:
+            self.pages[url]["lastmod"] = lastmod
+
+    def keep(self, url: str) -> None:
+        """Keep a page that could not be fetched in this run.
+
+        Transient failures should not be reported as removed pages.
+        """
+        self._seen.add(url)
+
+    def forget(self, url: str) -> None:
+        """Drop a page that no longer has an output file of its own.
+
+        Pages written as duplicates of another page are classified as added
+        once they stop being duplicates, instead of as unchanged.
+        """
+        if url in self._seen:
+            for urls in (self.report.added, self.report.changed, self.report.unchanged):
+                if url in urls:
+                    urls.remove(url)
+        self._seen.add(url)
+        self.pages.pop(url, None)
+
+    def finish(self) -> ChangeReport:
+        """Drop pages not seen in this run and return the change report."""
+        removed = [url for url in self.pages if url not in self._seen]
+        for url in removed:
+            del self.pages[url]
+        self.report.removed = removed
+        return self.report
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = {
+            "generator": "YAML Context Engineering Agent",
+            "updated": datetime.utcnow().isoformat() + "Z",
+            "pages": self.pages
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(data, f, allow_unicode=True, sort_keys=True)
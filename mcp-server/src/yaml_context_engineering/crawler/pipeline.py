@@ -0,0 +1,412 @@
+"""Config-driven extraction pipeline for sources.yaml sources."""
+
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiofiles
+
+from ..config import Config
+from ..utils.logging import get_logger
+from .dedup import DuplicateMatch, NearDuplicateIndex
+from .engine import CrawlEngine
+from .frontier import FrontierEntry
+from .incremental import FingerprintManifest
+from .politeness import host_of
+from .sitemaps import RobotsPolicy, SitemapDiscovery, SitemapEntry
+from .sources import SourceDefinition
+from .state import DONE, CrawlStateStore
+
+if TYPE_CHECKING:
+    from ..tools.web_content_fetcher import WebContentFetcher
+    from ..tools.url_discovery_engine import URLDiscoveryEngine
+    from ..tools.llm_structure_extractor import LLMStructureExtractor
+    from ..tools.file_system_manager import FileSystemManager
+
+
+_UNSAFE_PATH_CHARS = re.compile(r'[<>:"|?*\x00-\x1f]')
+
+
+def page_path(url: str, include_host: bool = False) -> str:
+    """Map a page URL to a context file path relative to the source directory.
+
+    Args:
+        url: Page URL
+        include_host: Prefix the host, for sources spanning several hosts
+
+    Returns:
+        Relative POSIX path ending in ``.md``
+    """
+    parts = urlsplit(url)
+    segments = [
+        _UNSAFE_PATH_CHARS.sub("_", segment).strip(". ") or "_"
+        for segment in PurePosixPath(parts.path).parts
+        if segment != "/"
+    ]
+    if not segments:
+        segments = ["home"]
+    if include_host:
+        segments.insert(0, parts.netloc.lower())
+    if parts.query:
+        # Keep pages that differ only by query string apart
+        segments[-1] += "_" + hashlib.sha256(parts.query.encode("utf-8")).hexdigest()[:8]
+    return "/".join(segments) + ".md"
+
+
+def _context_body(text: str) -> str:
+    """Return a context file without its YAML frontmatter."""
+    if text.startswith("---"):
+        end = text.find("\n---\n", 3)
+        if end != -1:
+            return text[end + 5:]
+    return text
+
+
+class SourcePipeline:
+    """Crawls a source from sources.yaml and writes one context file per page.
+
+    Every source runs through the same concurrent ``CrawlEngine`` with the
+    fetcher's connection pool, politeness scheduler and response cache. The
+    crawl state is kept in the source's output directory so interrupted runs
+    can be resumed, and an optional fingerprint manifest skips extraction
+    for unchanged pages. Pages whose content nearly duplicates another page
+    of the run are not extracted; depending on
+    ``extraction.duplicate_policy`` they are skipped or written as short
+    alias files pointing at the original, the shallowest page of the group
+    and among those the lowest URL.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        fetcher: "WebContentFetcher",
+        discovery: "URLDiscoveryEngine",
+        extractor: "LLMStructureExtractor",
+        file_manager: "FileSystemManager"
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            config: Server configuration
+            fetcher: Fetcher used for page downloads
+            discovery: Discovery engine used to score child URLs
+            extractor: Structure extractor run on every changed page
+            file_manager: File manager writing the context files
+        """
+        self.config = config
+        self.fetcher = fetcher
+        self.discovery = discovery
+        self.extractor = extractor
+        self.file_manager = file_manager
+        self.logger = get_logger(__name__)
+
+    async def run(
+        self,
+        source: SourceDefinition,
+        max_pages: Optional[int] = None,
+        resume: bool = False,
+        incremental: bool = False,
+        sitemaps: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Crawl a source and write its context files.
+
+        Args:
+            source: Source definition
+            max_pages: Optional cap on the number of fetched pages
+            resume: Continue an interrupted crawl instead of starting over
+            incremental: Skip extraction and writes for unchanged pages;
+                with sitemaps, pages whose lastmod is unchanged are not
+                fetched at all
+            sitemaps: Seed the crawl from the sites' sitemaps, defaults to
+                the source's setting and then to the config
+
+        Returns:
+            Summary of the run
+        """
+        source_dir = self.config.output.output_base_directory / source.source_id
+        include_host = len(source.hosts) > 1
+        formats = source.output.get("format", ["markdown"])
+
+        state = CrawlStateStore(source_dir)
+        if not resume:
+            state.reset()
+
+        manifest = FingerprintManifest(source_dir) if incremental else None
+        if manifest is not None and resume:
+            for url in state.known():
+                if state.status(url) == DONE:
+                    manifest.keep(url)
+
+        counts = {"written": 0, "unchanged": 0, "duplicate": 0, "failed": 0}
+
+        duplicate_policy = self.config.extraction.duplicate_policy
+        duplicates = None
+        if duplicate_policy != "off":
+            duplicates = NearDuplicateIndex(self.config.extraction.duplicate_threshold)
+            if resume:
+                self._restore_duplicates(duplicates, state, source_dir)
+
+        # Summary and language of the pages of this run, counts entry of the
+        # originals, pages being written and duplicates waiting to be written
+        pages: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        outcomes: Dict[str, str] = {}
+        writing: Set[str] = set()
+        demoted: Dict[str, DuplicateMatch] = {}
+
+        if sitemaps is None:
+            sitemaps = source.sitemaps if source.sitemaps is not None else self.config.crawling.use_sitemaps
+        robots, entries = await self._discover(source, sitemaps)
+
+        # Seed with the primary URLs and every sitemap page of the source
+        seed_urls = list(source.primary_urls)
+        lastmods: Dict[str, str] = {}
+        for entry in entries:
+            url = source.canonicalizer.canonicalize(entry.url)
+            if not source.accepts(url) or url in lastmods:
+                continue
+            if entry.lastmod:
+                lastmods[url] = entry.lastmod
+            if manifest is not None and manifest.check_lastmod(url, entry.lastmod):
+                # Unchanged since the previous run, do not even fetch it
+                counts["unchanged"] += 1
+                state.add(url)
+                state.mark_done(url, manifest.pages[url].get("output_path"))
+                continue
+            seed_urls.append(url)
+
+        async def settle(url: str) -> None:
+            """Rewrite a page as a duplicate until it points at its latest original."""
+            writing.add(url)
+            try:
+                while url in demoted:
+                    match = demoted.pop(url)
+                    summary, language = pages.get(url) or (state.data(url) or {"url": url}, "unknown")
+                    summary = dict(summary, duplicate_of=match.url)
+                    path = summary.get("path") or page_path(url, include_host)
+                    if duplicate_policy == "alias":
+                        await self._write_alias(source, url, summary.get("title") or url, language, path, match)
+                    else:
+                        # Remove the file of a page written as an original earlier
+                        (source_dir / path).unlink(missing_ok=True)
+                        path = None
+                    summary["path"] = path
+                    pages[url] = (summary, language)
+                    state.mark_done(url, path, data=summary)
+            finally:
+                writing.discard(url)
+
+        async def demote(url: str, match: DuplicateMatch) -> None:
+            demoted[url] = match
+            if manifest is not None:
+                manifest.forget(url)
+            if url in outcomes:
+                counts[outcomes.pop(url)] -= 1
+                counts["duplicate"] += 1
+            # A page still being written is settled once its write finishes
+            if url not in writing:
+                await settle(url)
+
+        async def on_result(entry: FrontierEntry, result: Dict[str, Any]) -> None:
+            if not result.get("success"):
+                counts["failed"] += 1
+                if manifest is not None:
+                    manifest.keep(entry.url)
+                return
+
+            path = page_path(entry.url, include_host)
+            summary = {
+                "url": entry.url,
+                "title": result.get("title", ""),
+                "depth": entry.depth,
+                "parent": entry.parent,
+                "path": path
+            }
+            pages[entry.url] = (summary, result.get("language", "unknown"))
+
+            moved: Dict[str, DuplicateMatch] = {}
+            if duplicates is not None:
+                # The shallowest, then lowest URL of a group is its original
+                match, moved = duplicates.assign(
+                    entry.url, result.get("content", ""), path, rank=(entry.depth, entry.url)
+                )
+                if match is not None:
+                    counts["duplicate"] += 1
+                    await demote(entry.url, match)
+                    return
+
+            writing.add(entry.url)
+            try:
+                await write_page(entry, result, path, summary)
+            finally:
+                writing.discard(entry.url)
+            if entry.url in demoted:
+                await settle(entry.url)
+            for url, match in moved.items():
+                await demote(url, match)
+
+        async def write_page(entry: FrontierEntry, result: Dict[str, Any], path: str, summary: Dict[str, Any]) -> None:
+            if manifest is not None:
+                status, fingerprint = manifest.classify(entry.url, result.get("content", ""))
+                if status == "unchanged":
+                    counts["unchanged"] += 1
+                    outcomes[entry.url] = "unchanged"
+                    manifest.set_lastmod(entry.url, lastmods.get(entry.url))
+                    state.mark_done(entry.url, path, data=summary)
+                    return
+                manifest.record(entry.url, fingerprint, path)
+                manifest.set_lastmod(entry.url, lastmods.get(entry.url))
+            outcomes[entry.url] = "written"
+
+            # Only heading statistics are used, so skip bodies and entities
+            structure = await self.extractor.extract(
+                result.get("content", ""),
+                extraction_config={"summarization": "none", "include_content": False, "include_entities": False}
+            )
+            summary["hierarchy_levels"] = structure.get("hierarchy_levels", [])
+            summary["total_headings"] = structure.get("total_headings", 0)
+
+            await self.file_manager.execute(
+                "write_file",
+                f"{source.source_id}/{path}",
+                {
+                    "title": result.get("title") or entry.url,
+                    "source_url": entry.url,
+                    "language": result.get("language", "unknown"),
+                    "extraction_confidence": structure.get("confidence_score", 0.0),
+                    "hierarchy_levels": summary["hierarchy_levels"],
+                    "related_sources": [entry.parent] if entry.parent else [],
+                    "tags": [source.source_id],
+                    "body": result.get("content", "")
+                }
+            )
+            counts["written"] += 1
+            state.mark_done(entry.url, path, data=summary)
+
+        try:
+            await CrawlEngine(self.config, self.fetcher, self.discovery).crawl_source(
+                source,
+                max_pages=max_pages,
+                on_result=on_result,
+                state=state,
+                seed_urls=seed_urls,
+                robots=robots
+            )
+
+            report = None
+            if manifest is not None:
+                report = manifest.finish()
+                manifest.save()
+
+            if "json" in formats:
+                await self._write_page_list(state, source_dir / "pages.json")
+            if source.output.get("generate_index"):
+                await self.file_manager.execute("generate_index", source.source_id)
+
+            state_counts = state.counts()
+        finally:
+            state.close()
+
+        self.logger.info(f"Source {source.source_id} extracted", **counts)
+        return {
+            "source_id": source.source_id,
+            "output_directory": str(source_dir),
+            "pages_written": counts["written"],
+            "pages_unchanged": counts["unchanged"],
+            "pages_duplicate": counts["duplicate"],
+            "pages_failed": counts["failed"],
+            "urls_pending": state_counts["pending"] + state_counts["in_progress"],
+            "changes": report.summary() if report is not None else None
+        }
+
+    async def _discover(
+        self,
+        source: SourceDefinition,
+        sitemaps: bool
+    ) -> Tuple[Dict[str, RobotsPolicy], List[SitemapEntry]]:
+        """Read robots.txt and optionally the sitemaps of every source host.
+
+        Returns:
+            Tuple of (robots policies by host, sitemap entries)
+        """
+        crawling = self.config.crawling
+        robots: Dict[str, RobotsPolicy] = {}
+        entries: List[SitemapEntry] = []
+        if not crawling.respect_robots_txt and not sitemaps:
+            return robots, entries
+
+        discovery = SitemapDiscovery(self.fetcher, crawling.max_sitemaps)
+        site_urls = {host_of(url): url for url in reversed(source.primary_urls)}
+        for host, site_url in site_urls.items():
+            if sitemaps:
+                policy, host_entries = await discovery.discover(site_url)
+                entries.extend(host_entries)
+                self.logger.info(f"Found {len(host_entries)} sitemap URLs on {host}")
+            else:
+                policy = await discovery.robots(site_url)
+            if crawling.respect_robots_txt:
+                robots[host] = policy
+
+        return robots, entries
+
+    def _restore_duplicates(self, index: NearDuplicateIndex, state: CrawlStateStore, source_dir: Path) -> None:
+        """Index the originals and duplicates an interrupted run already wrote."""
+        originals = []
+        copies = []
+        for url in sorted(state.known()):
+            data = state.data(url) if state.status(url) == DONE else None
+            if not data:
+                continue
+            if data.get("duplicate_of"):
+                copies.append((url, data["duplicate_of"]))
+            elif data.get("path"):
+                originals.append(((data.get("depth", 0), url), data["path"]))
+
+        # In rank order, so no restored page displaces another
+        for rank, path in sorted(originals):
+            try:
+                text = (source_dir / path).read_text(encoding="utf-8")
+            except OSError:
+                continue
+            index.assign(rank[1], _context_body(text), path, rank)
+        for url, original in copies:
+            index.add_duplicate(url, original)
+
+    async def _write_alias(
+        self,
+        source: SourceDefinition,
+        url: str,
+        title: str,
+        language: str,
+        path: str,
+        match: DuplicateMatch
+    ) -> None:
+        """Write a short context file pointing at the page this one duplicates."""
+        target = match.url
+        if match.output_path:
+            target = posixpath.relpath(match.output_path, posixpath.dirname(path) or ".")
+
+        await self.file_manager.execute(
+            "write_file",
+            f"{source.source_id}/{path}",
+            {
+                "title": title,
+                "source_url": url,
+                "content_type": "duplicate",
+                "language": language,
+                "related_sources": [match.url],
+                "tags": [source.source_id, "duplicate"],
+                "body": f"Duplicate of [{match.url}]({target}) "
+                        f"({match.similarity:.0%} similar).\n"
+            }
+        )
+
+    async def _write_page_list(self, state: CrawlStateStore, path: Path) -> None:
+        """Write url, title, depth and output path of every extracted page."""
+        pages = [data for data in map(state.data, sorted(state.known())) if data]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        async with aiofiles.open(path, "w", encoding="utf-8") as f:
+            await f.write(json.dumps(pages, indent=2, ensure_ascii=False))
@@ -0,0 +1,308 @@
+"""Per-host politeness scheduling for YAML Context Engineering crawls."""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+
+# Adaptive rate limiting
+MAX_DELAY_FACTOR = 32.0  # Largest slowdown applied to a host's delay
+LATENCY_SMOOTHING = 0.2  # Weight of a new sample in the latency average
+LATENCY_SPIKE_FACTOR = 3.0  # Latency above this multiple of the average is congestion
+MIN_LATENCY_SAMPLES = 5
+
+
+def host_of(url: str) -> str:
+    """Return the normalized host key for a URL.
+
+    Args:
+        url: Absolute URL
+
+    Returns:
+        Lower-cased network location
+    """
+    return urlparse(url).netloc.lower()
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate against a single host."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens accumulated since the last update."""
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def time_until_available(self, now: Optional[float] = None) -> float:
+        """Seconds until one token can be consumed.
+
+        Args:
+            now: Optional monotonic timestamp
+
+        Returns:
+            Wait time in seconds (0.0 if a token is available)
+        """
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1.0:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (1.0 - self.tokens) / self.rate
+
+    def consume(self, now: Optional[float] = None) -> bool:
+        """Consume one token if available.
+
+        Args:
+            now: Optional monotonic timestamp
+
+        Returns:
+            True if a token was consumed
+        """
+        if self.time_until_available(now) > 0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+@dataclass
+class HostCongestion:
+    """Adaptive rate limiting state and counters of one host."""
+    window: float  # Allowed concurrent requests, fractional while growing
+    delay_factor: float = 1.0  # Multiplier on the configured delay
+    blocked_until: float = 0.0  # Monotonic time before which no request may start
+    latency: Optional[float] = None  # Smoothed seconds until response headers
+    samples: int = 0
+    responses: int = 0
+    throttled: int = 0
+    timeouts: int = 0
+
+
+class HostScheduler:
+    """Schedules requests so that every host is crawled politely.
+
+    Each host gets its own token bucket refilled at ``1 / delay`` tokens per
+    second and a cap on the number of requests in flight at the same time.
+
+    The cap and the delay adapt to how the host responds (AIMD): every
+    healthy response grows the concurrency window by ``1 / window`` up to
+    ``max_window``, while a 429/503, a timeout or a latency spike halves
+    the window and doubles the delay. ``Retry-After`` blocks the host until
+    the given time. Healthy responses then gradually bring the delay back
+    to the configured value.
+    """
+
+    def __init__(
+        self,
+        default_delay: float = 1.0,
+        max_per_host: int = 2,
+        host_delays: Optional[Dict[str, float]] = None,
+        max_window: Optional[int] = None
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            default_delay: Seconds between requests to hosts without an override
+            max_per_host: Initial maximum concurrent requests per host
+            host_delays: Optional per-host delay overrides
+            max_window: Concurrent requests per host may grow up to this
+                while the host responds well, defaults to ``max_per_host``
+        """
+        self.default_delay = default_delay
+        self.max_per_host = max_per_host
+        self.max_window = max(max_window or max_per_host, max_per_host)
+        self._host_delays: Dict[str, float] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._congestion: Dict[str, HostCongestion] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._poll_interval = 0.05
+
+        for host, delay in (host_delays or {}).items():
+            self.set_host_delay(host, delay)
+
+    def delay_for(self, host: str) -> float:
+        """Return the delay between requests for a host."""
+        return self._host_delays.get(host, self.default_delay)
+
+    def set_host_delay(self, host: str, delay: float) -> None:
+        """Override the delay between requests for a host.
+
+        Args:
+            host: Host key (see ``host_of``)
+            delay: Seconds between requests
+        """
+        host = host.lower()
+        self._host_delays[host] = delay
+        if host in self._buckets:
+            self._update_rate(host)
+
+    def _effective_delay(self, host: str) -> float:
+        """Configured delay of a host times its current slowdown."""
+        return self.delay_for(host) * self.congestion(host).delay_factor
+
+    def _update_rate(self, host: str) -> None:
+        delay = self._effective_delay(host)
+        self._bucket(host).rate = 1.0 / delay if delay > 0 else math.inf
+
+    def _bucket(self, host: str) -> TokenBucket:
+        """Get or create the token bucket for a host."""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            delay = self._effective_delay(host)
+            bucket = TokenBucket(rate=1.0 / delay if delay > 0 else math.inf)
+            self._buckets[host] = bucket
+        return bucket
+
+    def congestion(self, host: str) -> HostCongestion:
+        """Get or create the adaptive state of a host."""
+        state = self._congestion.get(host)
+        if state is None:
+            state = HostCongestion(window=float(self.max_per_host))
+            self._congestion[host] = state
+        return state
+
+    def limit(self, host: str) -> int:
+        """Return the current concurrency cap of a host."""
+        return max(1, int(self.congestion(host).window))
+
+    def _back_off(self, host: str) -> HostCongestion:
+        """Multiplicative decrease after the host pushed back."""
+        state = self.congestion(host)
+        state.window = max(1.0, state.window / 2)
+        state.delay_factor = min(MAX_DELAY_FACTOR, state.delay_factor * 2)
+        self._update_rate(host)
+        return state
+
+    def record_response(self, host: str, latency: float) -> None:
+        """Record a healthy response of a host.
+
+        Args:
+            host: Host key (see ``host_of``)
+            latency: Seconds until the response headers arrived
+        """
+        state = self.congestion(host)
+        state.responses += 1
+
+        spike = (
+            state.samples >= MIN_LATENCY_SAMPLES
+            and latency > state.latency * LATENCY_SPIKE_FACTOR
+        )
+        if state.latency is None:
+            state.latency = latency
+        else:
+            state.latency += LATENCY_SMOOTHING * (latency - state.latency)
+        state.samples += 1
+
+        if spike:
+            self._back_off(host)
+            return
+
+        # Additive increase: about one more request per window of responses
+        state.window = min(float(self.max_window), state.window + 1.0 / state.window)
+        if state.delay_factor > 1.0:
+            state.delay_factor = max(1.0, state.delay_factor * 0.9)
+            self._update_rate(host)
+
+    def record_throttled(self, host: str, retry_after: Optional[float] = None) -> None:
+        """Record a 429 or 503 response.
+
+        Args:
+            host: Host key (see ``host_of``)
+            retry_after: Seconds from the ``Retry-After`` header, if any
+        """
+        state = self._back_off(host)
+        state.throttled += 1
+        if retry_after:
+            state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+
+    def record_timeout(self, host: str) -> None:
+        """Record a request to a host that timed out or hit a gateway error."""
+        self._back_off(host).timeouts += 1
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Adaptive rate limiting state per host, for logs and reports."""
+        now = time.monotonic()
+        return {
+            host: {
+                "concurrency_limit": self.limit(host),
+                "window": round(state.window, 2),
+                "delay_seconds": round(self._effective_delay(host), 3),
+                "blocked_seconds": round(max(0.0, state.blocked_until - now), 3),
+                "latency_ms": round(state.latency * 1000, 1) if state.latency is not None else None,
+                "in_flight": self.in_flight(host),
+                "responses": state.responses,
+                "throttled": state.throttled,
+                "timeouts": state.timeouts
+            }
+            for host, state in self._congestion.items()
+        }
+
+    def in_flight(self, host: str) -> int:
+        """Return the number of requests currently in flight for a host."""
+        return self._in_flight.get(host, 0)
+
+    def ready_in(self, host: str) -> float:
+        """Seconds until a request to the host may start.
+
+        Returns:
+            Wait time in seconds, ``math.inf`` if the host is at its
+            concurrency cap and must wait for a release
+        """
+        if self.in_flight(host) >= self.limit(host):
+            return math.inf
+        blocked = self.congestion(host).blocked_until - time.monotonic()
+        return max(blocked, self._bucket(host).time_until_available())
+
+    def try_acquire(self, host: str) -> bool:
+        """Start a request against a host if it is ready.
+
+        Returns:
+            True if the request may start; ``release`` must be called after
+        """
+        if self.in_flight(host) >= self.limit(host):
+            return False
+        if self.congestion(host).blocked_until > time.monotonic():
+            return False
+        if not self._bucket(host).consume():
+            return False
+        self._in_flight[host] = self.in_flight(host) + 1
+        return True
+
+    def release(self, host: str) -> None:
+        """Mark a request against a host as finished."""
+        count = self.in_flight(host) - 1
+        if count > 0:
+            self._in_flight[host] = count
+        else:
+            self._in_flight.pop(host, None)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Wait until a request to the URL's host may start.
+
+        Args:
+            url: URL about to be requested
+        """
+        host = host_of(url)
+        while not self.try_acquire(host):
+            wait = self.ready_in(host)
+            await asyncio.sleep(self._poll_interval if math.isinf(wait) else max(wait, 0.001))
+        try:
+            yield
+        finally:
+            self.release(host)
@@ -0,0 +1,250 @@
+"""robots.txt and sitemap.xml discovery for seeding crawls."""
+
+import asyncio
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+import lxml.etree
+
+from ..utils.logging import get_logger
+from .politeness import host_of
+
+if TYPE_CHECKING:
+    from ..tools.web_content_fetcher import WebContentFetcher
+
+
+logger = get_logger(__name__)
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass
+class SitemapEntry:
+    """A page listed in a sitemap."""
+    url: str
+    lastmod: Optional[str] = None
+    priority: Optional[float] = None
+
+
+class RobotsPolicy:
+    """Parsed robots.txt rules of one host."""
+
+    def __init__(self, text: str = "", user_agent: str = "*"):
+        """Parse robots.txt content.
+
+        Args:
+            text: robots.txt content; empty allows everything
+            user_agent: User agent the rules are evaluated for
+        """
+        self.user_agent = user_agent
+        self._parser = RobotFileParser()
+        self._parser.parse(text.splitlines())
+
+    def allowed(self, url: str) -> bool:
+        """Check whether the URL may be crawled."""
+        return self._parser.can_fetch(self.user_agent, url)
+
+    @property
+    def crawl_delay(self) -> Optional[float]:
+        """Crawl-delay in seconds, if the host sets one."""
+        delay = self._parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    @property
+    def sitemaps(self) -> List[str]:
+        """Sitemap URLs announced in robots.txt."""
+        return list(self._parser.site_maps() or [])
+
+
+def robots_allows(robots: Dict[str, RobotsPolicy], url: str) -> bool:
+    """Check a URL against the robots policy of its host, if one is known."""
+    policy = robots.get(host_of(url))
+    return policy is None or policy.allowed(url)
+
+
+class SitemapParser:
+    """Incremental parser for sitemaps and sitemap indexes.
+
+    Chunks are fed as they arrive from the network. Gzipped sitemaps are
+    detected by their magic bytes and decompressed on the fly, and parsed
+    elements are discarded right away, so memory use stays flat even for
+    sitemaps with tens of thousands of URLs.
+    """
+
+    def __init__(self):
+        self.entries: List[SitemapEntry] = []
+        self.sitemaps: List[str] = []
+        self._parser = lxml.etree.XMLPullParser(
+            events=("end",),
+            resolve_entities=False,
+            no_network=True
+        )
+        self._decompressor = None
+        self._head = b""
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the next chunk of the (possibly gzipped) document."""
+        if self._head is not None:
+            # Wait for enough bytes to recognize gzip
+            self._head += chunk
+            if len(self._head) < len(_GZIP_MAGIC):
+                return
+            chunk, self._head = self._head, None
+            if chunk.startswith(_GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._decompressor is not None:
+            chunk = self._decompressor.decompress(chunk)
+        if chunk:
+            self._parser.feed(chunk)
+            self._drain()
+
+    def close(self) -> None:
+        """Finish parsing.
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the document is not well-formed
+        """
+        if self._head:
+            head, self._head = self._head, None
+            self._parser.feed(head)
+        if self._decompressor is not None:
+            rest = self._decompressor.flush()
+            if rest:
+                self._parser.feed(rest)
+        self._parser.close()
+        self._drain()
+
+    def _drain(self) -> None:
+        for _, element in self._parser.read_events():
+            tag = lxml.etree.QName(element).localname
+            if tag not in ("url", "sitemap"):
+                continue
+
+            fields = {
+                lxml.etree.QName(child).localname: (child.text or "").strip()
+                for child in element
+                if isinstance(child.tag, str)
+            }
+            loc = fields.get("loc")
+            if loc and tag == "url":
+                self.entries.append(SitemapEntry(
+                    url=loc,
+                    lastmod=fields.get("lastmod") or None,
+                    priority=_parse_priority(fields.get("priority"))
+                ))
+            elif loc:
+                self.sitemaps.append(loc)
+
+            # Drop the parsed element and its processed siblings
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+
+def _parse_priority(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class SitemapDiscovery:
+    """Fetches robots.txt and walks sitemaps to enumerate a site's pages."""
+
+    def __init__(self, fetcher: "WebContentFetcher", max_sitemaps: int = 50):
+        """Initialize discovery.
+
+        Args:
+            fetcher: Fetcher whose session and host scheduler are used
+            max_sitemaps: Maximum sitemap files read per call, including
+                nested sitemap indexes
+        """
+        self.fetcher = fetcher
+        self.max_sitemaps = max_sitemaps
+
+    async def _stream(self, url: str, consume: Callable[[bytes], None]) -> bool:
+        """Stream a URL into a consumer, politely.
+
+        Returns:
+            True if the whole body was read
+        """
+        try:
+            async with self.fetcher.scheduler.slot(url):
+                async for chunk in self.fetcher.iter_raw(url):
+                    consume(chunk)
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError, lxml.etree.XMLSyntaxError, zlib.error) as e:
+            logger.info(f"Could not read {url}", error=str(e))
+            return False
+
+    async def robots(self, site_url: str) -> RobotsPolicy:
+        """Fetch and parse the robots.txt of a site.
+
+        A missing or unreadable robots.txt allows everything.
+
+        Args:
+            site_url: Any URL on the site
+
+        Returns:
+            Robots policy for the configured user agent
+        """
+        chunks: List[bytes] = []
+        ok = await self._stream(urljoin(site_url, "/robots.txt"), chunks.append)
+        text = b"".join(chunks).decode("utf-8", errors="replace") if ok else ""
+        return RobotsPolicy(text, user_agent=self.fetcher.config.crawling.user_agent)
+
+    async def sitemap_entries(self, sitemap_urls: Iterable[str]) -> List[SitemapEntry]:
+        """Read sitemaps, following nested sitemap indexes.
+
+        Args:
+            sitemap_urls: Sitemaps to start from
+
+        Returns:
+            Pages listed in the sitemaps, without duplicates
+        """
+        queue = deque(sitemap_urls)
+        read = set()
+        entries: Dict[str, SitemapEntry] = {}
+
+        while queue and len(read) < self.max_sitemaps:
+            url = queue.popleft()
+            if url in read:
+                continue
+            read.add(url)
+
+            parser = SitemapParser()
+            if not await self._stream(url, parser.feed):
+                continue
+            try:
+                parser.close()
+            except lxml.etree.XMLSyntaxError as e:
+                logger.info(f"Malformed sitemap {url}", error=str(e))
+
+            for entry in parser.entries:
+                entries.setdefault(entry.url, entry)
+            queue.extend(parser.sitemaps)
+
+        return list(entries.values())
+
+    async def discover(self, site_url: str) -> Tuple[RobotsPolicy, List[SitemapEntry]]:
+        """Read robots.txt and every sitemap it announces.
+
+        Falls back to ``/sitemap.xml`` when robots.txt lists no sitemaps.
+
+        Args:
+            site_url: Any URL on the site
+
+        Returns:
+            Tuple of (robots policy, sitemap entries)
+        """
+        policy = await self.robots(site_url)
+        sitemaps = policy.sitemaps or [urljoin(site_url, "/sitemap.xml")]
+        return policy, await self.sitemap_entries(sitemaps)
@@ -0,0 +1,129 @@
+"""Source definitions loaded from config/sources.yaml."""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import yaml
+
+from ..config import Config
+from .canonical import URLCanonicalizer
+from .politeness import host_of
+
+
+@dataclass
+class SourceDefinition:
+    """A documentation source described in sources.yaml."""
+    source_id: str
+    name: str
+    primary_urls: List[str] = field(default_factory=list)
+    max_depth: int = 3
+    rate_limit: float = 1.0  # seconds between requests to the same host
+    timeout: int = 30
+    include_patterns: List[str] = field(default_factory=list)
+    exclude_patterns: List[str] = field(default_factory=list)
+    output: Dict[str, Any] = field(default_factory=dict)
+    sitemaps: Optional[bool] = None  # Seed from sitemaps, None uses the config default
+    canonicalizer: URLCanonicalizer = field(default_factory=URLCanonicalizer)
+
+    @property
+    def hosts(self) -> List[str]:
+        """Hosts of the primary URLs, in order of first appearance."""
+        return list(dict.fromkeys(host_of(url) for url in self.primary_urls))
+
+    def host_delays(self) -> Dict[str, float]:
+        """Per-host delay overrides derived from ``rate_limit``."""
+        return {host: self.rate_limit for host in self.hosts}
+
+    def accepts(self, url: str) -> bool:
+        """Check a discovered URL against the source's host and patterns.
+
+        Args:
+            url: Candidate URL
+
+        Returns:
+            True if the URL belongs to the source and should be crawled
+        """
+        if host_of(url) not in self.hosts:
+            return False
+        if any(pattern in url for pattern in self.exclude_patterns):
+            return False
+        if self.include_patterns:
+            return any(pattern in url for pattern in self.include_patterns)
+        return True
+
+
+def _load_document(path: Union[str, Path]) -> Dict[str, Any]:
+    # sources.yaml is wrapped in document markers, so skip empty documents
+    with open(path, "r", encoding="utf-8") as f:
+        documents = [doc for doc in yaml.safe_load_all(f) if doc]
+    return documents[0] if documents else {}
+
+
+def load_global_settings(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load the ``global`` section of a sources.yaml file.
+
+    Args:
+        path: Path to sources.yaml
+
+    Returns:
+        Global settings, empty if the section is missing
+    """
+    return dict(_load_document(path).get("global", {}) or {})
+
+
+# sources.yaml global keys and the crawling settings they map to
+_GLOBAL_SETTINGS = {
+    "user_agent": ("user_agent", str),
+    "default_rate_limit": ("crawl_delay_seconds", float),
+    "default_timeout": ("timeout_seconds", int),
+    "cache_duration": ("cache_duration_seconds", int),
+    "max_concurrent_requests": ("max_concurrent_requests", int),
+    "retry_attempts": ("max_retries", int),
+}
+
+
+def apply_global_settings(config: Config, settings: Dict[str, Any]) -> None:
+    """Apply sources.yaml global settings to the crawling configuration.
+
+    Args:
+        config: Configuration to update in place
+        settings: Settings returned by ``load_global_settings``
+    """
+    for key, (attribute, convert) in _GLOBAL_SETTINGS.items():
+        if settings.get(key) is not None:
+            setattr(config.crawling, attribute, convert(settings[key]))
+
+
+def load_sources(path: Union[str, Path]) -> Dict[str, SourceDefinition]:
+    """Load source definitions from a sources.yaml file.
+
+    Args:
+        path: Path to sources.yaml
+
+    Returns:
+        Mapping of source id to source definition
+    """
+    data = _load_document(path)
+
+    defaults = data.get("global", {}) or {}
+    sources = {}
+
+    for source_id, spec in (data.get("sources", {}) or {}).items():
+        extraction = spec.get("extraction_config", {}) or {}
+        patterns = extraction.get("patterns", {}) or {}
+        sources[source_id] = SourceDefinition(
+            source_id=source_id,
+            name=spec.get("name", source_id),
+            primary_urls=list(spec.get("primary_urls", [])),
+            max_depth=int(extraction.get("max_depth", defaults.get("default_depth", 3))),
+            rate_limit=float(extraction.get("rate_limit", defaults.get("default_rate_limit", 1.0))),
+            timeout=int(extraction.get("timeout", defaults.get("default_timeout", 30))),
+            include_patterns=list(patterns.get("include", []) or []),
+            exclude_patterns=list(patterns.get("exclude", []) or []),
+            output=dict(spec.get("output", {}) or {}),
+            sitemaps=extraction.get("sitemaps"),
+            canonicalizer=URLCanonicalizer.from_dict(extraction.get("canonicalize"))
+        )
+
+    return sources
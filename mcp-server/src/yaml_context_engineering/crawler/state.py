@@ -0,0 +1,187 @@
+"""Durable crawl state for resumable extraction jobs."""
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    depth INTEGER NOT NULL DEFAULT 1,
+    priority REAL NOT NULL DEFAULT 0.5,
+    parent TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    output_path TEXT,
+    error TEXT,
+    data TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_status ON urls (status);
+"""
+
+
+@dataclass
+class CrawlRecord:
+    """Stored state of one URL."""
+    url: str
+    depth: int
+    priority: float
+    parent: Optional[str]
+    status: str
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+
+
+class CrawlStateStore:
+    """SQLite-backed frontier, visited set and per-URL status of a crawl.
+
+    Every state change is committed immediately, so a crawl interrupted by a
+    crash or Ctrl-C can be resumed: URLs that were pending, in progress or
+    failed are crawled again, finished URLs are skipped.
+    """
+
+    FILENAME = "crawl_state.sqlite"
+
+    def __init__(self, directory: Union[str, Path], filename: str = FILENAME):
+        """Open or create a state store.
+
+        Args:
+            directory: Directory holding the database, created if missing
+            filename: Database file name within ``directory``
+        """
+        path = Path(directory) / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self._db = sqlite3.connect(str(path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def reset(self) -> None:
+        """Forget all stored state, starting a fresh crawl."""
+        self._db.execute("DELETE FROM urls")
+        self._db.commit()
+
+    def add(
+        self,
+        url: str,
+        depth: int = 1,
+        priority: float = 0.5,
+        parent: Optional[str] = None
+    ) -> bool:
+        """Record a URL on the frontier unless it is already known.
+
+        Returns:
+            True if the URL was added
+        """
+        return self.add_many([(url, depth, priority, parent)]) > 0
+
+    def add_many(self, entries: Iterable[Tuple[str, int, float, Optional[str]]]) -> int:
+        """Record several (url, depth, priority, parent) entries in one transaction.
+
+        Returns:
+            Number of URLs added
+        """
+        now = time.time()
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO urls (url, depth, priority, parent, status, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(url, depth, priority, parent, PENDING, now) for url, depth, priority, parent in entries]
+        )
+        self._db.commit()
+        return self._db.total_changes - before
+
+    def _set_status(self, url: str, status: str, **fields: Any) -> None:
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        assignments = f"status = ?, updated_at = ?{', ' + columns if columns else ''}"
+        self._db.execute(
+            "INSERT OR IGNORE INTO urls (url, status, updated_at) VALUES (?, ?, ?)",
+            (url, status, time.time())
+        )
+        self._db.execute(
+            f"UPDATE urls SET {assignments} WHERE url = ?",
+            (status, time.time(), *fields.values(), url)
+        )
+        self._db.commit()
+
+    def mark_in_progress(self, url: str) -> None:
+        """Record that a URL is being fetched."""
+        self._set_status(url, IN_PROGRESS)
+
+    def mark_done(
+        self,
+        url: str,
+        output_path: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record that a URL was processed.
+
+        Args:
+            url: Processed URL
+            output_path: File generated from the URL, if any
+            data: Optional JSON-serializable result kept for resumed runs
+        """
+        fields: Dict[str, Any] = {"error": None}
+        if output_path is not None:
+            fields["output_path"] = output_path
+        if data is not None:
+            fields["data"] = json.dumps(data, ensure_ascii=False)
+        self._set_status(url, DONE, **fields)
+
+    def mark_failed(self, url: str, error: Optional[str] = None) -> None:
+        """Record that a URL could not be processed."""
+        self._set_status(url, FAILED, error=error)
+
+    def get(self, url: str) -> Optional[CrawlRecord]:
+        """Return the stored state of a URL."""
+        row = self._db.execute(
+            "SELECT url, depth, priority, parent, status, output_path, error FROM urls WHERE url = ?",
+            (url,)
+        ).fetchone()
+        return CrawlRecord(*row) if row else None
+
+    def status(self, url: str) -> Optional[str]:
+        """Return the status of a URL, or None if it is unknown."""
+        record = self.get(url)
+        return record.status if record else None
+
+    def data(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the result stored with ``mark_done``."""
+        row = self._db.execute("SELECT data FROM urls WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def pending(self) -> List[CrawlRecord]:
+        """URLs left to crawl, including interrupted and failed ones."""
+        rows = self._db.execute(
+            "SELECT url, depth, priority, parent, status, output_path, error FROM urls "
+            "WHERE status IN (?, ?, ?) ORDER BY priority DESC",
+            (PENDING, IN_PROGRESS, FAILED)
+        ).fetchall()
+        return [CrawlRecord(*row) for row in rows]
+
+    def known(self) -> Set[str]:
+        """All URLs ever added, the visited set of the crawl."""
+        return {row[0] for row in self._db.execute("SELECT url FROM urls")}
+
+    def counts(self) -> Dict[str, int]:
+        """Number of URLs per status."""
+        counts = {PENDING: 0, IN_PROGRESS: 0, DONE: 0, FAILED: 0}
+        for status, count in self._db.execute("SELECT status, COUNT(*) FROM urls GROUP BY status"):
+            counts[status] = count
+        return counts
@@ -2,6 +2,7 @@
 
 import asyncio
 import json
+import time
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
@@ -97,12 +98,39 @@ class YamlContextServer:
                             },
                             "extraction_config": {
                                 "type": "object",
-                                "description": "抽出設定"
+                                "description": "抽出設定 (granularity, summarization, include_content, include_entities, section_summaries)"
                             }
                         },
                         "required": ["content"]
                     }
                 ),
+                Tool(
+                    name="llm_structure_extractor_batch",
+                    description="複数のドキュメントまたはファイルから階層的な見出し構造を並列に抽出",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "documents": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "解析するテキストコンテンツのリスト"
+                            },
+                            "paths": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "解析するファイルパスのリスト (出力ディレクトリまたは input_directories 配下のみ)"
+                            },
+                            "extraction_config": {
+                                "type": "object",
+                                "description": "抽出設定 (granularity, summarization, include_content, include_entities, section_summaries)"
+                            },
+                            "workers": {
+                                "type": "integer",
+                                "description": "並列プロセス数 (0 は CPU 数)"
+                            }
+                        }
+                    }
+                ),
                 Tool(
                     name="url_discovery_engine",
                     description="コンテンツから関連URLを発見し、優先度付きで返す",
@@ -134,7 +162,7 @@ class YamlContextServer:
                         "properties": {
                             "action": {
                                 "type": "string",
-                                "enum": ["create_directory", "write_file", "sanitize_path", "generate_index"],
+                                "enum": ["create_directory", "write_file", "write_files", "sanitize_path", "generate_index"],
                                 "description": "実行するアクション"
                             },
                             "path": {
@@ -142,8 +170,8 @@ class YamlContextServer:
                                 "description": "操作対象のパス"
                             },
                             "content": {
-                                "type": "string",
-                                "description": "書き込む内容（write_fileの場合）"
+                                "type": ["string", "object", "array"],
+                                "description": "書き込む内容（write_fileの場合）、または {path, content} のリスト（write_filesの場合）"
                             }
                         },
                         "required": ["action"]
@@ -174,6 +202,22 @@ class YamlContextServer:
                         target_schema=arguments.get("target_schema", {}),
                         extraction_config=arguments.get("extraction_config", {})
                     )
+                elif name == "llm_structure_extractor_batch":
+                    started = time.perf_counter()
+                    items = [
+                        item async for item in self.structure_extractor.extract_many(
+                            documents=arguments.get("documents", []),
+                            paths=self._check_input_paths(arguments.get("paths", [])),
+                            extraction_config=arguments.get("extraction_config", {}),
+                            workers=arguments.get("workers")
+                        )
+                    ]
+                    result = {
+                        "results": items,
+                        "documents": len(items),
+                        "failed": sum(not item["success"] for item in items),
+                        "total_seconds": round(time.perf_counter() - started, 6)
+                    }
                 elif name == "url_discovery_engine":
                     result = await self.url_discovery.discover(
                         content=arguments["content"],
@@ -201,6 +245,33 @@ class YamlContextServer:
                 self.logger.error(f"Tool execution failed: {name}", error=str(e))
                 raise Exception(f"Tool execution failed: {name} - {str(e)}")
     
+    def _check_input_paths(self, paths: List[str]) -> List[str]:
+        """Resolve file paths given by a client and confine them to the allowed directories.
+        
+        Files may be read from the output directory and from the
+        configured input directories only.
+        
+        Args:
+            paths: File paths from the tool arguments
+            
+        Returns:
+            Resolved paths
+            
+        Raises:
+            ValueError: If a path resolves outside the allowed directories
+        """
+        roots = [
+            Path(directory).resolve()
+            for directory in [self.config.output.output_base_directory, *self.config.extraction.input_directories]
+        ]
+        resolved = []
+        for path in paths:
+            target = Path(path).resolve()
+            if not any(target.is_relative_to(root) for root in roots):
+                raise ValueError(f"Path outside the allowed directories: {path}")
+            resolved.append(str(target))
+        return resolved
+    
     async def run(self, host: str = "localhost", port: int = 3000) -> None:
         """Run the MCP server.
         
@@ -233,4 +304,11 @@ class YamlContextServer:
             console.warning("Server stopped by user")
         except Exception as e:
             console.error(f"Server error: {e}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            await self.close()
+    
+    async def close(self) -> None:
+        """Release the HTTP session and the worker processes of the tools."""
+        await self.web_fetcher.close()
+        await self.structure_extractor.close()
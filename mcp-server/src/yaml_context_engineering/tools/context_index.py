@@ -0,0 +1,179 @@
+"""Sidecar metadata cache used to generate context index files."""
+
+import itertools
+import json
+import os
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+
+# Frontmatter larger than this is not looked for; such files fall back to
+# their file name
+MAX_FRONTMATTER_BYTES = 1024 * 1024
+
+_READ_SIZE = 4096
+
+# Numbers temporary files, so concurrent saves never share one
+_temp_ids = itertools.count()
+
+
+def read_frontmatter(path: Union[str, Path], limit: int = MAX_FRONTMATTER_BYTES) -> Optional[Dict[str, Any]]:
+    """Read the YAML frontmatter of a context file.
+
+    Only the bytes up to the closing ``---`` are read, not the body.
+
+    Args:
+        path: Context file
+        limit: Largest frontmatter looked for
+
+    Returns:
+        Frontmatter mapping, or None if the file has none
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the frontmatter is not valid YAML
+    """
+    with open(path, "rb") as f:
+        data = f.read(_READ_SIZE)
+        if not data.startswith(b"---"):
+            return None
+
+        end = data.find(b"\n---", 3)
+        while end == -1 and len(data) < limit:
+            chunk = f.read(_READ_SIZE)
+            if not chunk:
+                return None
+            # Search from the previous tail so a split delimiter is found
+            start = max(3, len(data) - 3)
+            data += chunk
+            end = data.find(b"\n---", start)
+        if end == -1:
+            return None
+
+    try:
+        metadata = yaml.load(data[3:end].decode("utf-8"), Loader=_SafeLoader)
+    except (UnicodeDecodeError, yaml.YAMLError) as e:
+        raise ValueError(f"Invalid frontmatter: {e}") from e
+    return metadata if isinstance(metadata, dict) else None
+
+
+class ContextMetadataIndex:
+    """Title and tags of every context file under a directory.
+
+    The entries are kept in a JSON file next to the generated ``index.md``
+    together with the size and modification time of each file. On refresh
+    the directory is walked with ``os.scandir`` and only files whose size
+    or modification time changed are opened, and of those only the
+    frontmatter is read, so re-indexing a large unchanged tree costs one
+    stat per file.
+    """
+
+    FILENAME = ".index_metadata.json"
+    VERSION = 1
+
+    def __init__(self, directory: Union[str, Path], index_name: str = "index.md"):
+        """Load the cache of a directory.
+
+        Args:
+            directory: Directory of context files
+            index_name: Name of index files, which are not indexed
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / self.FILENAME
+        self.index_name = index_name
+        self.stats = {"read": 0, "reused": 0, "removed": 0}
+        self.errors: Dict[str, str] = {}
+        # Relative POSIX path -> [mtime_ns, size, title, tags]
+        self.entries: Dict[str, List[Any]] = {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.entries = dict(data.get("files", {}))
+        except (OSError, ValueError, AttributeError):
+            self.entries = {}
+
+    def _scan(self) -> List[Tuple[str, os.stat_result]]:
+        """List the markdown files below the directory with their stats."""
+        files = []
+        pending = [(self.directory, "")]
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append((Path(entry.path), f"{prefix}{entry.name}/"))
+                        elif entry.name.endswith(".md") and entry.name != self.index_name:
+                            try:
+                                files.append((prefix + entry.name, entry.stat()))
+                            except OSError:
+                                continue
+            except OSError:
+                continue
+        return files
+
+    def refresh(self) -> bool:
+        """Bring the entries up to date with the files on disk.
+
+        Returns:
+            True if any entry was added, changed or removed
+        """
+        self.stats = {"read": 0, "reused": 0, "removed": 0}
+        self.errors = {}
+        previous = self.entries
+        self.entries = {}
+
+        for rel_path, stat in self._scan():
+            entry = previous.pop(rel_path, None)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self.entries[rel_path] = entry
+                self.stats["reused"] += 1
+                continue
+
+            title = PurePosixPath(rel_path).stem
+            tags: List[str] = []
+            try:
+                metadata = read_frontmatter(self.directory / rel_path) or {}
+                title = str(metadata.get("title") or title)
+                tags = [str(tag) for tag in metadata.get("tags") or []]
+            except (OSError, ValueError, TypeError) as e:
+                self.errors[rel_path] = str(e)
+            self.entries[rel_path] = [stat.st_mtime_ns, stat.st_size, title, tags]
+            self.stats["read"] += 1
+
+        self.stats["removed"] = len(previous)
+        return bool(self.stats["read"] or self.stats["removed"])
+
+    def titles(self) -> List[Tuple[PurePosixPath, str]]:
+        """Return (relative path, title) pairs sorted by path."""
+        paths = sorted(PurePosixPath(rel_path) for rel_path in self.entries)
+        return [(path, self.entries[str(path)][2]) for path in paths]
+
+    def tags(self, rel_path: str) -> List[str]:
+        """Return the tags of an indexed file."""
+        return list(self.entries[rel_path][3])
+
+    def save(self) -> None:
+        """Write the cache atomically."""
+        data = json.dumps({"version": self.VERSION, "files": self.entries}, ensure_ascii=False)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{next(_temp_ids)}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,192 @@
+"""Content-addressed cache of structure extraction results."""
+
+import hashlib
+import itertools
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import aiofiles
+
+
+def content_digest(content: str) -> str:
+    """Return the sha256 hex digest of a document."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """Two-tier cache of extraction results keyed by content hash.
+
+    Keys combine the sha256 of the content, the normalized extraction
+    config and the extractor version, so a result is reused for the same
+    document under the same settings and dropped when the extractor's
+    output changes. Results are held as UTF-8 JSON in an in-memory LRU
+    bounded by total size, and optionally written to a directory so they
+    survive restarts and are shared by the server, the CLI and scripts.
+    The directory is bounded too: once it grows past its limit the least
+    recently used files are removed. Every lookup hands out a fresh copy,
+    so callers may modify results.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        directory: Optional[Union[str, Path]] = None,
+        version: Union[int, str] = 1,
+        max_disk_bytes: int = 1024 * 1024 * 1024
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Total size in bytes of the encoded results kept in
+                memory; 0 disables the memory tier
+            directory: Directory of the on-disk tier, disabled when unset
+            version: Extractor version included in every key
+            max_disk_bytes: Total size of the on-disk tier; 0 for no limit
+        """
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory else None
+        self.version = str(version)
+        self.size = 0
+        self.disk_size = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._temp_ids = itertools.count()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if self.max_disk_bytes:
+                self.disk_size = sum(size for _, _, size in self._disk_files())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, digest: str, config: Dict[str, Any]) -> str:
+        """Build the cache key of a document digest and extraction config."""
+        settings = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(f"{self.version}\0{digest}\0{settings}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _disk_files(self) -> List[Tuple[float, Path, int]]:
+        """List (mtime, path, size) of the result files on disk."""
+        files = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+        return files
+
+    def _prune_disk(self) -> None:
+        """Remove the least recently used files until the tier is within 90% of its limit."""
+        files = sorted(self._disk_files())
+        self.disk_size = sum(size for _, _, size in files)
+        target = self.max_disk_bytes * 9 // 10
+        for _, path, size in files:
+            if self.disk_size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self.disk_size -= size
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a result.
+
+        Args:
+            key: Key from ``key()``
+
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return json.loads(data)
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                async with aiofiles.open(path, "rb") as f:
+                    data = await f.read()
+                result = json.loads(data)
+            except (OSError, ValueError):
+                result = None
+            if result is not None:
+                self.stats["disk_hits"] += 1
+                if self.max_disk_bytes:
+                    try:
+                        os.utime(path)  # Mark as recently used for pruning
+                    except OSError:
+                        pass
+                self._remember(key, data)
+                return result
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result.
+
+        Args:
+            key: Key from ``key()``
+            result: JSON-serializable extraction result
+        """
+        data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self._remember(key, data)
+
+        if self.directory is not None:
+            # Write atomically so concurrent readers never see partial
+            # files; every write has its own temporary file so concurrent
+            # puts of one key do not collide
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{next(self._temp_ids)}.tmp")
+            try:
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    await f.write(data)
+                try:
+                    replaced = path.stat().st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+            except OSError:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                # Keys are content addressed, so a file another writer
+                # stored meanwhile holds the same result
+                if not path.exists():
+                    raise
+                return
+
+            if self.max_disk_bytes:
+                self.disk_size += len(data) - replaced
+                if self.disk_size > self.max_disk_bytes:
+                    self._prune_disk()
+
+    def clear(self) -> None:
+        """Drop the in-memory results."""
+        self._entries.clear()
+        self.size = 0
@@ -2,17 +2,87 @@
 
 import os
 import re
+import json
 import asyncio
+import itertools
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Set, Tuple
 from datetime import datetime
 
-import aiofiles
 import yaml
-from ruamel.yaml import YAML
 
 from ..config import Config
 from ..utils.logging import get_logger
+from .context_index import ContextMetadataIndex
+
+
+# Strings that YAML reads back unchanged without quotes: they start with a
+# letter, "_" or "/", contain no indicator characters, no ": " and no " #"
+_PLAIN_SCALAR = re.compile(
+    r"[A-Za-z_/]"
+    r"(?:[^\x00-\x1f\x7f-\x9f\u2028\u2029\ufeff\ud800-\udfff\ufffe\uffff:#'\"`{}\[\],|>*&!]"
+    r"|:(?=[^\s])|(?<! )#)*"
+)
+_YAML_RESERVED = {"y", "n", "yes", "no", "on", "off", "true", "false", "null", "~"}
+_NON_PRINTABLE = re.compile("[\x7f-\x9f\u2028\u2029\ufeff\ud800-\udfff\ufffe\uffff]")
+
+
+def _yaml_scalar(value: Any) -> str:
+    """Render a scalar as YAML that loads back as the same value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value != value:
+            return ".nan"
+        if value in (float("inf"), float("-inf")):
+            return ".inf" if value > 0 else "-.inf"
+        text = repr(value)
+        # YAML 1.1 only reads exponents with a decimal point as floats
+        if "e" in text and "." not in text:
+            text = text.replace("e", ".0e", 1)
+        return text
+    
+    value = str(value)
+    if value == value.strip() and value.lower() not in _YAML_RESERVED and _PLAIN_SCALAR.fullmatch(value):
+        return value
+    # A JSON string is a valid YAML double-quoted scalar once characters
+    # YAML does not allow unescaped are escaped too
+    return _NON_PRINTABLE.sub(lambda m: "\\u%04x" % ord(m.group()), json.dumps(value, ensure_ascii=False))
+
+
+def render_frontmatter(fields: Dict[str, Any]) -> str:
+    """Render context file frontmatter as YAML.
+    
+    Context files have a fixed set of keys holding scalars or flat lists,
+    so the YAML is assembled directly instead of going through a general
+    purpose emitter, which is an order of magnitude faster. Other values
+    fall back to PyYAML.
+    
+    Args:
+        fields: Frontmatter keys and values
+        
+    Returns:
+        YAML block without the ``---`` delimiters
+    """
+    lines = []
+    for key, value in fields.items():
+        if isinstance(value, (list, tuple)):
+            if not value:
+                lines.append(f"{key}: []\n")
+            elif all(not isinstance(item, (list, tuple, dict)) for item in value):
+                lines.append(f"{key}:\n")
+                lines.extend(f"- {_yaml_scalar(item)}\n" for item in value)
+            else:
+                lines.append(yaml.safe_dump({key: value}, allow_unicode=True, default_flow_style=False))
+        elif isinstance(value, dict):
+            lines.append(yaml.safe_dump({key: value}, allow_unicode=True, default_flow_style=False))
+        else:
+            lines.append(f"{key}: {_yaml_scalar(value)}\n")
+    return "".join(lines)
 
 
 class FileSystemManager:
@@ -26,9 +96,11 @@ class FileSystemManager:
         """
         self.config = config
         self.logger = get_logger(__name__)
-        self.ruamel_yaml = YAML()
-        self.ruamel_yaml.preserve_quotes = True
-        self.ruamel_yaml.width = 4096  # Prevent line wrapping
+        
+        # Directories created or seen by this manager, so repeated writes
+        # into one directory skip the mkdir calls
+        self._directories: Set[Path] = set()
+        self._temp_ids = itertools.count()
     
     def _sanitize_path_component(self, component: str) -> str:
         """Sanitize a path component for safe file system usage.
@@ -78,109 +150,178 @@ class FileSystemManager:
                 if not file_path.exists():
                     file_path.touch()
     
-    async def _write_context_file(self, file_path: Path, content: Dict[str, Any]) -> None:
-        """Write a context file with YAML frontmatter.
+    def _render_context_file(self, content: Dict[str, Any]) -> str:
+        """Render a context file with YAML frontmatter.
         
         Args:
-            file_path: Path to write to
             content: Content dictionary with metadata and body
+            
+        Returns:
+            File content
         """
-        # Ensure parent directory exists
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        now = datetime.utcnow().isoformat() + "Z"
         
         # Prepare frontmatter - ensure all values are safe for YAML
         frontmatter = {
             "title": str(content.get("title", "Untitled")).replace('\u2122', '(TM)').replace('\u2013', '-').replace('\u2014', '--'),
             "source_url": str(content.get("source_url", "")),
-            "last_updated": str(content.get("last_updated", datetime.utcnow().isoformat() + "Z")),
+            "last_updated": str(content.get("last_updated", now)),
             "content_type": str(content.get("content_type", "documentation")),
             "language": str(content.get("language", "ja")),
             "extraction_confidence": float(content.get("extraction_confidence", 0.0)),
             "agent_version": str(self.config.server_version),
             "extracted_by": "YAML Context Engineering Agent",
-            "extraction_timestamp": datetime.utcnow().isoformat() + "Z",
+            "extraction_timestamp": now,
             "hierarchy_levels": list(content.get("hierarchy_levels", [])),
             "related_sources": list(content.get("related_sources", [])),
             "tags": list(content.get("tags", []))
         }
         
-        # Build file content
-        file_content = "---\n"
+        return "---\n" + render_frontmatter(frontmatter) + "---\n\n" + content.get("body", "")
+    
+    def _ensure_directory(self, directory: Path) -> None:
+        """Create a directory unless this manager already knows it exists."""
+        if directory not in self._directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._directories.add(directory)
+    
+    def _write_atomic(self, file_path: Path, text: str) -> None:
+        """Write a file through a temporary file and a rename.
         
-        # Use ruamel.yaml for better formatting
-        import io
-        stream = io.StringIO()
-        self.ruamel_yaml.dump(frontmatter, stream)
-        file_content += stream.getvalue()
+        Readers see either the old or the new file, never a partial one,
+        even if the process dies mid-write. Blocking; run it in a thread.
         
-        file_content += "---\n\n"
-        file_content += content.get("body", "")
+        Args:
+            file_path: Path to write to
+            text: File content
+        """
+        self._ensure_directory(file_path.parent)
+        tmp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.{next(self._temp_ids)}.tmp")
+        try:
+            try:
+                f = open(tmp_path, "w", encoding="utf-8")
+            except FileNotFoundError:
+                # The directory was removed after it was cached
+                self._directories.discard(file_path.parent)
+                self._ensure_directory(file_path.parent)
+                f = open(tmp_path, "w", encoding="utf-8")
+            with f:
+                f.write(text)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    async def _write_context_file(self, file_path: Path, content: Dict[str, Any]) -> None:
+        """Write a context file with YAML frontmatter.
         
-        # Write file
-        async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-            await f.write(file_content)
+        Args:
+            file_path: Path to write to
+            content: Content dictionary with metadata and body
+        """
+        await asyncio.to_thread(self._write_atomic, file_path, self._render_context_file(content))
         
         self.logger.info(f"Written context file: {file_path}")
     
-    async def _generate_index_file(self, directory: Path) -> None:
-        """Generate an index file for a directory of context files.
+    async def write_context_files(
+        self,
+        files: Iterable[Tuple[str, Dict[str, Any]]],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Write many context files concurrently.
+        
+        Writes to the same path are coalesced, so only the last content
+        given for a path is written. Files are rendered and written by a
+        bounded number of workers, each file atomically.
         
         Args:
-            directory: Directory to index
+            files: (path relative to the output directory, content) pairs;
+                content is a dictionary with metadata and body
+            concurrency: Files written at once, defaults to
+                ``output.write_concurrency``
+            
+        Returns:
+            Written paths and errors by path
         """
-        index_content = f"# Context Index\n\n"
-        index_content += f"Generated: {datetime.utcnow().isoformat()}Z\n\n"
+        pending: Dict[Path, Dict[str, Any]] = {}
+        for path, content in files:
+            pending[self.config.output.output_base_directory / path] = content
         
-        # Collect all .md files
-        md_files = []
-        for file_path in directory.rglob("*.md"):
-            if file_path.name != "index.md":
-                md_files.append(file_path)
+        written: List[str] = []
+        failed: Dict[str, str] = {}
+        jobs = iter(pending.items())
         
-        # Sort by path
-        md_files.sort()
+        def write(file_path: Path, content: Dict[str, Any]) -> None:
+            self._write_atomic(file_path, self._render_context_file(content))
+        
+        async def worker() -> None:
+            # Workers share one iterator, so every file is taken once
+            for file_path, content in jobs:
+                try:
+                    await asyncio.to_thread(write, file_path, content)
+                    written.append(str(file_path))
+                except (OSError, ValueError, TypeError) as e:
+                    failed[str(file_path)] = str(e)
+        
+        concurrency = concurrency or self.config.output.write_concurrency
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(pending)))))
+        
+        self.logger.info(f"Written {len(written)} context files", failed=len(failed))
+        return {"written": written, "failed": failed}
+    
+    def _render_index(self, index: ContextMetadataIndex) -> str:
+        """Render the index file of a directory from its metadata cache."""
+        lines = ["# Context Index\n\n", f"Generated: {datetime.utcnow().isoformat()}Z\n\n"]
         
         # Group by directory
         current_dir = None
-        for file_path in md_files:
-            rel_path = file_path.relative_to(directory)
+        for rel_path, title in index.titles():
             dir_path = rel_path.parent
             
             if dir_path != current_dir:
                 current_dir = dir_path
                 if str(dir_path) != ".":
-                    index_content += f"\n## {dir_path}\n\n"
+                    lines.append(f"\n## {dir_path}\n\n")
             
-            # Read frontmatter to get title
-            try:
-                async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                
-                # Extract title from frontmatter
-                if content.startswith("---"):
-                    yaml_end = content.find("---", 3)
-                    if yaml_end != -1:
-                        yaml_content = content[3:yaml_end]
-                        metadata = yaml.safe_load(yaml_content)
-                        title = metadata.get("title", file_path.stem)
-                    else:
-                        title = file_path.stem
-                else:
-                    title = file_path.stem
-                
-                # Add to index
-                index_content += f"- [{title}]({rel_path.as_posix()})\n"
-                
-            except Exception as e:
-                self.logger.warning(f"Failed to read file for index: {file_path}", error=str(e))
-                index_content += f"- [{file_path.stem}]({rel_path.as_posix()})\n"
+            lines.append(f"- [{title}]({rel_path.as_posix()})\n")
+        
+        return "".join(lines)
+    
+    def _build_index(self, directory: Path) -> Dict[str, Any]:
+        """Refresh the metadata cache of a directory and rewrite its index."""
+        index = ContextMetadataIndex(directory)
+        changed = index.refresh()
+        for rel_path, error in index.errors.items():
+            self.logger.warning(f"Failed to read file for index: {directory / rel_path}", error=error)
         
-        # Write index file
         index_path = directory / "index.md"
-        async with aiofiles.open(index_path, 'w', encoding='utf-8') as f:
-            await f.write(index_content)
+        # An index of unchanged files is left alone
+        if changed or not index_path.exists():
+            self._write_atomic(index_path, self._render_index(index))
+            index.save()
         
-        self.logger.info(f"Generated index file: {index_path}")
+        return {"files": len(index.entries), "changed": changed, **index.stats}
+    
+    async def _generate_index_file(self, directory: Path) -> Dict[str, Any]:
+        """Generate an index file for a directory of context files.
+        
+        Titles come from a sidecar metadata cache, so only files added or
+        modified since the previous run are read, and only their
+        frontmatter.
+        
+        Args:
+            directory: Directory to index
+            
+        Returns:
+            Number of indexed files and how many were read, reused and removed
+        """
+        result = await asyncio.to_thread(self._build_index, directory)
+        
+        self.logger.info(f"Generated index file: {directory / 'index.md'}", **result)
+        return result
     
     async def execute(
         self,
@@ -233,12 +374,11 @@ class FileSystemManager:
                     await self._write_context_file(file_path, content)
                 else:
                     # Simple file write
-                    file_path.parent.mkdir(parents=True, exist_ok=True)
-                    async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                        if isinstance(content, dict):
-                            await f.write(yaml.dump(content, default_flow_style=False))
-                        else:
-                            await f.write(str(content))
+                    if isinstance(content, dict):
+                        text = yaml.dump(content, default_flow_style=False)
+                    else:
+                        text = str(content)
+                    await asyncio.to_thread(self._write_atomic, file_path, text)
                 
                 return {
                     "success": True,
@@ -247,6 +387,22 @@ class FileSystemManager:
                     "message": "File written successfully"
                 }
             
+            elif action == "write_files":
+                if not isinstance(content, list):
+                    raise ValueError("List of {path, content} entries required for write_files")
+                
+                result = await self.write_context_files(
+                    (entry["path"], entry["content"]) for entry in content
+                )
+                
+                return {
+                    "success": not result["failed"],
+                    "action": action,
+                    "written": len(result["written"]),
+                    "failed": result["failed"],
+                    "message": f"{len(result['written'])} files written"
+                }
+            
             elif action == "sanitize_path":
                 if not path:
                     raise ValueError("Path required for sanitize_path")
@@ -270,12 +426,14 @@ class FileSystemManager:
                 if path:
                     index_path = index_path / path
                 
-                await self._generate_index_file(index_path)
+                result = await self._generate_index_file(index_path)
                 
                 return {
                     "success": True,
                     "action": action,
                     "path": str(index_path / "index.md"),
+                    "files_indexed": result["files"],
+                    "files_read": result["read"],
                     "message": "Index generated successfully"
                 }
             
@@ -0,0 +1,369 @@
+"""HTML to markdown conversion for YAML Context Engineering.
+
+The functions in this module are CPU-bound and free of event loop state so
+that ``WebContentFetcher`` can run them in a process pool.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urljoin
+
+from bs4 import BeautifulSoup
+import html2text
+from langdetect import detect
+import lxml.etree
+import lxml.html
+import validators
+
+
+def _new_html_converter() -> html2text.HTML2Text:
+    """Create an html2text converter with the fetcher's settings."""
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    converter.ignore_images = True
+    converter.body_width = 0  # No line wrapping
+    return converter
+
+
+def decode_body(body: bytes, encoding: Optional[str] = None) -> str:
+    """Decode a response body, falling back to UTF-8.
+
+    Args:
+        body: Raw response bytes
+        encoding: Charset from the Content-Type header, if any
+
+    Returns:
+        Decoded text
+    """
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def _is_followable(url: str) -> bool:
+    """Check that a resolved link is an http(s) URL worth validating."""
+    return url.startswith(("http://", "https://"))
+
+
+def extract_links(soup: BeautifulSoup, base_url: str) -> List[str]:
+    """Extract URLs from HTML content.
+
+    Every ``<a href>`` is visited once; links inside ``nav``/``aside`` are
+    part of the same walk. Fragments are removed and duplicates are
+    dropped, keeping document order.
+
+    Args:
+        soup: BeautifulSoup object
+        base_url: Base URL for resolving relative URLs
+
+    Returns:
+        List of extracted URLs
+    """
+    urls: Dict[str, None] = {}
+    rejected = set()
+
+    for link in soup.find_all("a", href=True):
+        absolute_url = urldefrag(urljoin(base_url, link["href"]))[0]
+        if absolute_url in urls or absolute_url in rejected:
+            continue
+
+        # Validate URL
+        if _is_followable(absolute_url) and validators.url(absolute_url):
+            urls[absolute_url] = None
+        else:
+            rejected.add(absolute_url)
+
+    return list(urls)
+
+
+_HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "img", "button", "select"}
+_BLOCK_TAGS = {
+    "html", "body", "head", "p", "div", "section", "article", "main", "header",
+    "footer", "nav", "aside", "figure", "figcaption", "form", "fieldset",
+    "table", "thead", "tbody", "tfoot", "tr", "dl", "dt", "dd", "details", "summary"
+}
+_WHITESPACE = re.compile(r"\s+")
+_INDENT = re.compile(r"\n(?=[^\n])")  # Line breaks before non-empty lines
+
+
+class _SinglePassConverter:
+    """Renders markdown and collects metadata and links in one lxml walk.
+
+    The tree is walked with an explicit stack instead of recursion, so
+    deeply nested documents do not hit the interpreter's recursion limit.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.title = ""
+        self.description = ""
+        self.links: Dict[str, None] = {}
+        self._rejected = set()
+        self._blocks: List[str] = []
+        self._list_blocks: Set[int] = set()  # Indexes of _blocks holding lists
+        self._scopes: List[Tuple[List[str], Set[int]]] = []
+        self._lists: List[List[Any]] = []  # [ordered, rendered items] per open list
+        self._inline: List[List[str]] = [[]]
+
+    # Buffers
+
+    def _push_inline(self) -> None:
+        self._inline.append([])
+
+    def _pop_inline(self) -> str:
+        return _WHITESPACE.sub(" ", "".join(self._inline.pop())).strip()
+
+    def _write(self, text: Optional[str]) -> None:
+        if text:
+            self._inline[-1].append(text)
+
+    def _flush(self) -> None:
+        """Turn pending inline text into a paragraph block."""
+        text = _WHITESPACE.sub(" ", "".join(self._inline[-1])).strip()
+        self._inline[-1] = []
+        if text:
+            self._blocks.append(text)
+
+    def _open_scope(self) -> None:
+        """Collect the following blocks separately, e.g. for a quote or list item."""
+        self._flush()
+        self._scopes.append((self._blocks, self._list_blocks))
+        self._blocks, self._list_blocks = [], set()
+
+    def _close_scope(self) -> Tuple[List[str], Set[int]]:
+        """Return the blocks of the current scope and restore the outer one."""
+        self._flush()
+        scope = (self._blocks, self._list_blocks)
+        self._blocks, self._list_blocks = self._scopes.pop()
+        return scope
+
+    def _add_link(self, href: str) -> None:
+        absolute_url = urldefrag(urljoin(self.base_url, href))[0]
+        if absolute_url in self.links or absolute_url in self._rejected:
+            return
+        if _is_followable(absolute_url) and validators.url(absolute_url):
+            self.links[absolute_url] = None
+        else:
+            self._rejected.add(absolute_url)
+
+    # Walk
+
+    def walk(self, root) -> None:
+        """Render an element, its descendants and its tail."""
+        # (element, leaving, list item) entries
+        stack: List[Tuple[Any, bool, bool]] = [(root, False, False)]
+        while stack:
+            element, leaving, item = stack.pop()
+            tag = element.tag if isinstance(element.tag, str) else None
+
+            if leaving:
+                self._leave(element, tag, item)
+            elif self._enter(element, tag, item):
+                stack.append((element, True, item))
+                if tag in ("ul", "ol"):
+                    # Only the items of a list are rendered
+                    stack.extend((child, False, True) for child in reversed(element) if child.tag == "li")
+                else:
+                    self._write(element.text)
+                    stack.extend((child, False, False) for child in reversed(element))
+            elif not item:
+                self._write(element.tail)
+
+    def _enter(self, element, tag: Optional[str], item: bool) -> bool:
+        """Handle the start of an element; return whether to walk its children."""
+        if item:
+            self._open_scope()
+            self._push_inline()
+        elif tag is None or tag in _SKIPPED_TAGS:
+            # Comments, processing instructions and non-content elements
+            return False
+        elif tag == "title":
+            self.title = self.title or _WHITESPACE.sub(" ", element.text_content()).strip()
+            return False
+        elif tag == "meta":
+            if (element.get("name") or "").lower() == "description":
+                self.description = element.get("content", "")
+            return False
+        elif tag in _HEADING_TAGS or tag == "tr":
+            self._flush()
+            self._push_inline()
+        elif tag in ("a", "strong", "b", "em", "i"):
+            self._push_inline()
+        elif tag == "pre":
+            self._flush()
+            code = element.text_content().strip("\n")
+            self._blocks.append(f"```\n{code}\n```")
+            return False
+        elif tag == "code":
+            self._write(f"`{element.text_content()}`")
+            return False
+        elif tag == "br":
+            self._flush()
+            return False
+        elif tag == "hr":
+            self._flush()
+            self._blocks.append("* * *")
+            return False
+        elif tag in ("ul", "ol"):
+            self._flush()
+            self._lists.append([tag == "ol", []])
+        elif tag == "blockquote":
+            self._open_scope()
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+        return True
+
+    def _leave(self, element, tag: Optional[str], item: bool) -> None:
+        """Handle the end of an element whose children were walked."""
+        if item:
+            # Blocks inside the item, such as paragraphs and nested lists,
+            # stay in the item, indented below its first line
+            blocks, list_blocks = self._close_scope()
+            self._inline.pop()
+            ordered, items = self._lists[-1]
+            parts = [f"{len(items) + 1}. " if ordered else "* "]
+            for index, block in enumerate(blocks):
+                if index in list_blocks:
+                    parts.append("\n" + block)
+                elif index:
+                    parts.append("\n\n" + block)
+                else:
+                    parts.append(block)
+            items.append(_INDENT.sub("\n  ", "".join(parts)))
+            return
+
+        if tag in _HEADING_TAGS:
+            text = self._pop_inline()
+            if text:
+                self._blocks.append(f"{'#' * _HEADING_TAGS[tag]} {text}")
+        elif tag == "a":
+            href = element.get("href")
+            text = self._pop_inline()
+            if href:
+                self._add_link(href)
+                self._write(f"[{text}]({href})" if text else "")
+            else:
+                self._write(text)
+        elif tag in ("strong", "b", "em", "i"):
+            marker = "_" if tag in ("em", "i") else "**"
+            text = self._pop_inline()
+            self._write(f"{marker}{text}{marker}" if text else "")
+        elif tag in ("ul", "ol"):
+            _, items = self._lists.pop()
+            if items:
+                self._list_blocks.add(len(self._blocks))
+                self._blocks.append("\n".join(items))
+        elif tag == "blockquote":
+            quoted, _ = self._close_scope()
+            if quoted:
+                self._blocks.append("\n".join(
+                    f"> {line}" if line else ">"
+                    for line in "\n\n".join(quoted).split("\n")
+                ))
+        elif tag == "tr":
+            row = self._pop_inline().rstrip(" |")
+            if row:
+                self._blocks.append(row)
+        elif tag in ("td", "th"):
+            self._write(" | ")
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+        self._write(element.tail)
+
+    def markdown(self) -> str:
+        self._flush()
+        return "\n\n".join(self._blocks) + "\n"
+
+
+def _html_parser(encoding: Optional[str]) -> lxml.html.HTMLParser:
+    """Create an lxml parser decoding like ``decode_body``."""
+    # Bodies are size-capped by the fetcher; lifting libxml2's limits
+    # keeps deeply nested pages instead of cutting them off at depth 256
+    try:
+        return lxml.html.HTMLParser(encoding=encoding or "utf-8", huge_tree=True)
+    except LookupError:
+        return lxml.html.HTMLParser(encoding="utf-8", huge_tree=True)
+
+
+def _convert_single_pass(body: bytes, url: str, encoding: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Convert HTML with one lxml parse and one tree walk.
+
+    The raw bytes are parsed, so pages with an XML encoding declaration
+    work too; lxml refuses such declarations in decoded strings.
+
+    Returns:
+        Converted page, or None if lxml cannot parse the body
+    """
+    try:
+        root = lxml.html.document_fromstring(body, parser=_html_parser(encoding))
+    except (lxml.etree.ParserError, ValueError):
+        return None
+
+    converter = _SinglePassConverter(url)
+    converter.walk(root)
+    return {
+        "content": converter.markdown(),
+        "title": converter.title,
+        "meta_description": converter.description,
+        "extracted_urls": list(converter.links)
+    }
+
+
+def _convert_html2text(html_content: str, url: str) -> Dict[str, Any]:
+    """Convert HTML with BeautifulSoup for metadata and html2text for markdown."""
+    soup = BeautifulSoup(html_content, "lxml")
+
+    # Extract metadata
+    title = soup.find("title")
+    title_text = str(title.string) if title and title.string else ""
+
+    meta_description = soup.find("meta", attrs={"name": "description"})
+    description = meta_description.get("content", "") if meta_description else ""
+
+    return {
+        "content": _new_html_converter().handle(html_content),
+        "title": title_text,
+        "meta_description": description,
+        "extracted_urls": extract_links(soup, url)
+    }
+
+
+def convert_html(
+    body: bytes,
+    url: str,
+    encoding: Optional[str] = None,
+    detect_language: bool = True,
+    mode: str = "html2text"
+) -> Dict[str, Any]:
+    """Convert a raw HTML page into markdown and metadata.
+
+    Args:
+        body: Raw HTML bytes
+        url: Page URL for resolving relative links
+        encoding: Charset from the Content-Type header, if any
+        detect_language: Whether to run language detection
+        mode: ``html2text`` (BeautifulSoup plus html2text) or
+            ``single_pass`` (one lxml parse and tree walk)
+
+    Returns:
+        Dictionary with content, title, meta_description, language
+        and extracted_urls
+    """
+    page = None
+    if mode == "single_pass":
+        page = _convert_single_pass(body, url, encoding)
+    if page is None:
+        page = _convert_html2text(decode_body(body, encoding), url)
+
+    # Detect language
+    page["language"] = "unknown"
+    if detect_language:
+        try:
+            page["language"] = detect(page["content"][:1000])
+        except Exception:
+            page["language"] = "unknown"
+
+    return page
@@ -0,0 +1,134 @@
+"""HTTP client backends for the web content fetcher."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import aiohttp
+import httpx
+
+from ..config import Config
+from ..utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def create_aiohttp_session(config: Config) -> aiohttp.ClientSession:
+    """Create an aiohttp session with a tuned, shared connection pool.
+
+    The connector keeps connections alive between requests, caches DNS
+    lookups and caps connections per host at the adaptive per-host limit,
+    so a crawl against one docs host reuses a few warm TLS connections.
+
+    Args:
+        config: Server configuration
+
+    Returns:
+        Configured client session
+    """
+    crawling = config.crawling
+    connector = aiohttp.TCPConnector(
+        limit=crawling.max_concurrent_requests,
+        limit_per_host=crawling.adaptive_max_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=crawling.dns_cache_ttl_seconds,
+        keepalive_timeout=crawling.keepalive_timeout_seconds
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=crawling.timeout_seconds),
+        headers={"User-Agent": crawling.user_agent}
+    )
+
+
+class _HttpxStream:
+    """Adapts ``httpx.Response.aiter_bytes`` to aiohttp's ``iter_chunked``."""
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        async for chunk in self._response.aiter_bytes(size):
+            yield chunk
+
+
+class _HttpxResponse:
+    """The subset of ``aiohttp.ClientResponse`` used by the fetcher."""
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+        self.status = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.charset = response.charset_encoding
+        self.content = _HttpxStream(response)
+
+    def raise_for_status(self) -> None:
+        try:
+            self._response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise aiohttp.ClientError(str(e)) from e
+
+
+class HttpxSession:
+    """httpx-based session usable in place of ``aiohttp.ClientSession``.
+
+    Enables HTTP/2 when the ``h2`` package is installed. httpx errors are
+    translated to their aiohttp equivalents so the fetcher's error handling
+    and retry policy apply unchanged.
+    """
+
+    def __init__(self, config: Config):
+        """Initialize the session.
+
+        Args:
+            config: Server configuration
+        """
+        crawling = config.crawling
+        limits = httpx.Limits(
+            max_connections=crawling.max_concurrent_requests,
+            max_keepalive_connections=crawling.max_concurrent_requests,
+            keepalive_expiry=crawling.keepalive_timeout_seconds
+        )
+        options = dict(
+            limits=limits,
+            timeout=crawling.timeout_seconds,
+            headers={"User-Agent": crawling.user_agent},
+            follow_redirects=True
+        )
+        try:
+            self._client = httpx.AsyncClient(http2=True, **options)
+        except ImportError:
+            logger.warning("HTTP/2 support requires the h2 package, falling back to HTTP/1.1")
+            self._client = httpx.AsyncClient(**options)
+
+    @property
+    def closed(self) -> bool:
+        return self._client.is_closed
+
+    @asynccontextmanager
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None
+    ) -> AsyncIterator[_HttpxResponse]:
+        """Stream a GET request.
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers
+            timeout: Per-request timeout (only ``total`` is used)
+        """
+        request_timeout = timeout.total if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        try:
+            async with self._client.stream("GET", url, headers=headers, timeout=request_timeout) as response:
+                yield _HttpxResponse(response)
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise aiohttp.ClientError(str(e)) from e
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -1,12 +1,291 @@
 """LLM-based structure extraction tool for YAML Context Engineering."""
 
+import asyncio
+import os
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from dataclasses import dataclass, field
 import json
 
+import lxml.etree
+import lxml.html
+
 from ..config import Config
 from ..utils.logging import get_logger
+from .extraction_cache import ExtractionCache, content_digest
+
+
+# Matched with pos/endpos against one line of the document at a time
+_MARKDOWN_HEADING = re.compile(r"(#{1,6})[ \t]+(.+)$")
+_CODE_FENCE = re.compile(r" {0,3}(`{3,}|~{3,})(.*)$")
+_RST_ADORNMENT = re.compile(r"([!-/:-@\[-`{-~])\1{2,}\s*$")
+_ASCIIDOC_HEADING = re.compile(r"(={1,6})[ \t]+(\S.*)$")
+_ASCIIDOC_DELIMITER = re.compile(r"(-{4,}|\.{4,}|\+{4,}|/{4,}|={4,}|\*{4,}|_{4,})\s*$")
+
+_HTML_HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+_HTML_TAG = re.compile(r"<[^>]*>")
+
+# Format detection only looks at the start of a document
+FORMAT_SAMPLE_SIZE = 64 * 1024
+
+# Deepest heading level kept per context_granularity setting
+GRANULARITY_LEVELS = {
+    "L1_only": 1,
+    "L1_L2": 2,
+    "L1_L2_L3": 3,
+    "full_hierarchy": 6
+}
+
+# Parsed documents kept for extractions of the same content
+PARSE_CACHE_SIZE = 8
+
+# Part of every result cache key; bump when extraction output changes
+EXTRACTOR_VERSION = 1
+
+_ENTITY_URL = re.compile(r"https?://[^\s<>\"{}|\\^`\[\]]+")
+_ENTITY_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")
+_ENTITY_CODE_BLOCK = re.compile(r"```[\s\S]*?```", re.MULTILINE)
+_ENTITY_KEY_TERM = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b")
+
+# Checked in order on the sample; the first match wins
+_FORMAT_PATTERNS = [
+    ("html", re.compile(r"<h[1-6][\s>]", re.IGNORECASE)),
+    ("markdown", re.compile(r"^#{1,6}[ \t]+\S", re.MULTILINE)),
+    ("asciidoc", re.compile(r"^={1,6}[ \t]+\S", re.MULTILINE)),
+    ("rst", re.compile(r"^[^\s].*\n([!-/:-@\[-`{-~])\1{2,}[ \t]*$", re.MULTILINE))
+]
+
+
+class HeadingSpan(NamedTuple):
+    """A heading with the offsets of its section body in the document.
+
+    The body runs from the line after the heading up to the next heading
+    of any level, so ``content[start:end]`` is the text the heading owns.
+    """
+    level: int
+    text: str
+    line_number: int
+    start: int
+    end: int
+
+
+def _iter_lines(content: str) -> Iterator[Tuple[int, int]]:
+    """Yield the (start, end) offsets of every line, without the newline."""
+    length = len(content)
+    pos = 0
+    while pos < length:
+        newline = content.find("\n", pos)
+        if newline == -1:
+            newline = length
+        yield pos, newline
+        pos = newline + 1
+
+
+def _sections(headings: Iterable[Tuple[int, str, int, int, int]], length: int) -> Iterator[HeadingSpan]:
+    """Turn (level, text, line_number, heading_start, body_start) tuples into spans.
+
+    Each section ends where the next heading starts.
+    """
+    pending = None
+    for level, text, line_number, heading_start, body_start in headings:
+        if pending is not None:
+            yield HeadingSpan(*pending, heading_start)
+        pending = (level, text, line_number, min(body_start, length))
+    if pending is not None:
+        yield HeadingSpan(*pending, length)
+
+
+def scan_markdown_headings(content: str) -> Iterator[HeadingSpan]:
+    """Scan Markdown for ATX headings in a single pass.
+
+    Lines are visited with ``str.find`` and matched in place, so neither
+    a list of lines nor copies of the section bodies are created. Lines
+    inside fenced code blocks are skipped, so ``#`` comments in code are
+    not taken for headings.
+
+    Args:
+        content: Markdown content
+
+    Yields:
+        Headings in document order; each is yielded once its section end
+        is known
+    """
+    def headings():
+        fence = None
+        for line_number, (start, end) in enumerate(_iter_lines(content), 1):
+            first = content[start]
+            if first in "`~ ":
+                match = _CODE_FENCE.match(content, start, end)
+                if match:
+                    marker = match.group(1)
+                    if fence is None:
+                        fence = marker
+                    elif marker[0] == fence[0] and len(marker) >= len(fence) and not match.group(2).strip():
+                        fence = None
+            elif first == "#" and fence is None:
+                match = _MARKDOWN_HEADING.match(content, start, end)
+                if match:
+                    yield len(match.group(1)), match.group(2).strip(), line_number, start, end + 1
+
+    return _sections(headings(), len(content))
+
+
+def scan_rst_headings(content: str) -> Iterator[HeadingSpan]:
+    """Scan reStructuredText for section titles in a single pass.
+
+    A title is a line followed by an underline of one repeated punctuation
+    character, optionally with a matching overline. As in docutils, levels
+    follow the order in which adornment styles first appear.
+
+    Args:
+        content: reStructuredText content
+
+    Yields:
+        Headings in document order, levels capped at 6
+    """
+    def headings():
+        styles: List[Tuple[str, bool]] = []
+        previous = None  # (line_number, start, end, is_adornment) of the last two lines
+        before = None
+        for line_number, (start, end) in enumerate(_iter_lines(content), 1):
+            adornment = _RST_ADORNMENT.match(content, start, end)
+            if adornment and previous is not None and not previous[3]:
+                title = content[previous[1]:previous[2]].strip()
+                overline = (
+                    before is not None and before[3]
+                    and content[before[1]:before[2]].rstrip() == content[start:end].rstrip()
+                )
+                if title and (overline or not content[previous[1]].isspace()):
+                    style = (adornment.group(1), overline)
+                    if style not in styles:
+                        styles.append(style)
+                    heading_start = before[1] if overline else previous[1]
+                    yield min(styles.index(style) + 1, 6), title, previous[0], heading_start, end + 1
+                    # The underline cannot also be the overline of the next title
+                    previous = before = None
+                    continue
+            before, previous = previous, (line_number, start, end, adornment is not None)
+
+    return _sections(headings(), len(content))
+
+
+def scan_asciidoc_headings(content: str) -> Iterator[HeadingSpan]:
+    """Scan AsciiDoc for ``=`` section titles in a single pass.
+
+    Lines inside delimited blocks such as ``----`` listings are skipped.
+    The document title (``= Title``) is level 1.
+
+    Args:
+        content: AsciiDoc content
+
+    Yields:
+        Headings in document order
+    """
+    def headings():
+        block = None
+        for line_number, (start, end) in enumerate(_iter_lines(content), 1):
+            delimiter = _ASCIIDOC_DELIMITER.match(content, start, end)
+            if delimiter:
+                marker = delimiter.group(1)
+                if block is None:
+                    block = marker
+                elif marker == block:
+                    block = None
+            elif block is None and content[start] == "=":
+                match = _ASCIIDOC_HEADING.match(content, start, end)
+                if match:
+                    yield len(match.group(1)), match.group(2).strip(), line_number, start, end + 1
+
+    return _sections(headings(), len(content))
+
+
+_HEADING_SCANNERS = {
+    "markdown": scan_markdown_headings,
+    "rst": scan_rst_headings,
+    "asciidoc": scan_asciidoc_headings
+}
+
+
+def detect_format(content: str, sample_size: int = FORMAT_SAMPLE_SIZE) -> str:
+    """Detect the markup format of a document from its first bytes.
+
+    Args:
+        content: Text content
+        sample_size: Number of leading characters inspected
+
+    Returns:
+        ``html``, ``markdown``, ``asciidoc`` or ``rst``; ``markdown`` if
+        nothing matches
+    """
+    sample = content[:sample_size]
+    for format_type, pattern in _FORMAT_PATTERNS:
+        if pattern.search(sample):
+            return format_type
+    return "markdown"
+
+
+def line_starts(content: str) -> List[int]:
+    """Return the offset at which every line of the content starts."""
+    starts = [0]
+    starts.extend(match.end() for match in re.finditer("\n", content))
+    return starts
+
+
+def summarize_content(content: str, level: str) -> str:
+    """Summarize content based on summarization level.
+
+    Only the leading paragraphs are looked at, so summarizing a large
+    document does not split all of it.
+
+    Args:
+        content: Content to summarize
+        level: Summarization level: ``none``, ``brief``, ``detailed`` or
+            ``full``
+
+    Returns:
+        Summarized content
+    """
+    if level == "none":
+        return ""
+    elif level == "brief":
+        # Return first paragraph or 200 characters
+        end = content.find("\n\n")
+        first = content if end == -1 else content[:end]
+        return first[:200] + "..." if len(first) > 200 else first
+    elif level == "detailed":
+        # Return first 500 characters or 2 paragraphs
+        first = content.find("\n\n")
+        if first != -1:
+            second = content.find("\n\n", first + 2)
+            return content if second == -1 else content[:second]
+        return content[:500] + "..." if len(content) > 500 else content
+    else:  # full
+        return content
+
+
+def extract_entities(content: str) -> Dict[str, List[str]]:
+    """Extract named entities from content.
+
+    Args:
+        content: Text content
+
+    Returns:
+        Dictionary of entity types and values
+    """
+    # Key terms are capitalized multi-word phrases of up to four words
+    terms = set(_ENTITY_KEY_TERM.findall(content))
+    return {
+        "urls": list(set(_ENTITY_URL.findall(content))),
+        "emails": list(set(_ENTITY_EMAIL.findall(content))),
+        "code_blocks": [match.group() for match in _ENTITY_CODE_BLOCK.finditer(content)],
+        "key_terms": [term for term in terms if len(term.split()) <= 4 and term.count(" ") <= 3]
+    }
 
 
 @dataclass
@@ -18,17 +297,286 @@ class HeadingNode:
     children: List["HeadingNode"] = field(default_factory=list)
     line_number: int = 0
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary representation."""
+    def to_dict(self, max_level: int = 6) -> Dict[str, Any]:
+        """Convert to dictionary representation.
+        
+        Args:
+            max_level: Deepest heading level included in the children
+        """
         return {
             "level": self.level,
             "text": self.text,
             "content": self.content,
-            "children": [child.to_dict() for child in self.children],
+            "children": [child.to_dict(max_level) for child in self.children if child.level <= max_level],
             "line_number": self.line_number
         }
 
 
+class HeadingTree:
+    """Heading tree stored as parallel arrays over the source text.
+    
+    Headings are kept in document order, which is a preorder walk of the
+    tree. Per heading the arrays hold its level, parent index (-1 for
+    roots), line number, the [start, end) character offsets of its section
+    body and the index just past its subtree, which makes walking the
+    children of a heading O(1) per child. Section bodies are sliced from
+    the source only when asked for, and ``HeadingNode`` objects are built
+    on demand, so a parsed document costs a few machine words per heading
+    on top of the text it was parsed from.
+    """
+    
+    __slots__ = ("source", "levels", "parents", "line_numbers", "starts", "ends", "subtree_ends", "texts")
+    
+    def __init__(self, source: str, headings: Iterable[HeadingSpan]):
+        """Build the tree.
+        
+        Args:
+            source: Document the headings were found in
+            headings: Headings with section offsets, in document order
+        """
+        self.source = source
+        self.levels = array("b")
+        self.parents = array("i")
+        self.line_numbers = array("i")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.subtree_ends = array("i")
+        self.texts: List[str] = []
+        
+        stack: List[int] = []
+        for index, (level, text, line_number, start, end) in enumerate(headings):
+            while stack and self.levels[stack[-1]] >= level:
+                self.subtree_ends[stack.pop()] = index
+            self.levels.append(level)
+            self.parents.append(stack[-1] if stack else -1)
+            self.line_numbers.append(line_number)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.subtree_ends.append(0)
+            self.texts.append(text)
+            stack.append(index)
+        for index in stack:
+            self.subtree_ends[index] = len(self.texts)
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def content(self, index: int) -> str:
+        """Return the section body of a heading, without the heading line."""
+        return self.source[self.starts[index]:self.ends[index]].strip()
+    
+    def children(self, index: int = -1, max_level: int = 6) -> Iterator[int]:
+        """Yield the child indices of a heading, or the roots for -1.
+        
+        Args:
+            index: Heading index, -1 for the document
+            max_level: Deepest heading level yielded
+        """
+        child = index + 1
+        end = self.subtree_ends[index] if index >= 0 else len(self.texts)
+        while child < end:
+            if self.levels[child] <= max_level:
+                yield child
+            child = self.subtree_ends[child]
+    
+    def node(self, index: int, max_level: int = 6) -> HeadingNode:
+        """Materialize a heading and its subtree down to ``max_level``."""
+        return HeadingNode(
+            level=self.levels[index],
+            text=self.texts[index],
+            content=self.content(index),
+            children=[self.node(child, max_level) for child in self.children(index, max_level)],
+            line_number=self.line_numbers[index]
+        )
+    
+    def to_dict(
+        self,
+        index: int,
+        max_level: int = 6,
+        include_content: bool = True,
+        summary: Optional[Callable[[int], str]] = None
+    ) -> Dict[str, Any]:
+        """Convert a heading subtree to the ``HeadingNode.to_dict`` layout.
+        
+        Args:
+            index: Heading index
+            max_level: Deepest heading level included in the children
+            include_content: Include section bodies; without them the
+                result is an outline
+            summary: Returns the summary of a heading index, added as
+                ``summary`` when given
+        """
+        data = {
+            "level": self.levels[index],
+            "text": self.texts[index]
+        }
+        if include_content:
+            data["content"] = self.content(index)
+        if summary is not None:
+            data["summary"] = summary(index)
+        data["children"] = [
+            self.to_dict(child, max_level, include_content, summary)
+            for child in self.children(index, max_level)
+        ]
+        data["line_number"] = self.line_numbers[index]
+        return data
+
+
+class HeadingView:
+    """Read-only view of one heading of a parsed document.
+    
+    Headings below ``max_level`` are hidden. Children are always deeper
+    than their parent, so this prunes whole subtrees. The section body,
+    summary and entities are computed when first asked for.
+    """
+    
+    __slots__ = ("structure", "index", "max_level")
+    
+    def __init__(self, structure: "DocumentStructure", index: int, max_level: int):
+        self.structure = structure
+        self.index = index
+        self.max_level = max_level
+    
+    @property
+    def tree(self) -> HeadingTree:
+        return self.structure.tree
+    
+    @property
+    def level(self) -> int:
+        return self.tree.levels[self.index]
+    
+    @property
+    def text(self) -> str:
+        return self.tree.texts[self.index]
+    
+    @property
+    def content(self) -> str:
+        return self.tree.content(self.index)
+    
+    @property
+    def line_number(self) -> int:
+        return self.tree.line_numbers[self.index]
+    
+    @property
+    def children(self) -> List["HeadingView"]:
+        return [
+            HeadingView(self.structure, child, self.max_level)
+            for child in self.tree.children(self.index, self.max_level)
+        ]
+    
+    def summary(self, level: str = "brief") -> str:
+        """Summary of the section body."""
+        return self.structure.summary(self.index, level)
+    
+    def entities(self) -> Dict[str, List[str]]:
+        """Entities found in the section body."""
+        return self.structure.entities(self.index)
+    
+    def node(self) -> HeadingNode:
+        """Materialize the visible subtree as ``HeadingNode`` objects."""
+        return self.tree.node(self.index, self.max_level)
+    
+    def to_dict(self, include_content: bool = True, summary_level: Optional[str] = None) -> Dict[str, Any]:
+        """Convert to dictionary representation.
+        
+        Args:
+            include_content: Include section bodies
+            summary_level: Add a ``summary`` of every section at this
+                summarization level
+        """
+        summary = None
+        if summary_level and summary_level != "none":
+            def summary(index: int) -> str:
+                return self.structure.summary(index, summary_level)
+        return self.tree.to_dict(self.index, self.max_level, include_content, summary)
+
+
+@dataclass
+class DocumentStructure:
+    """Headings of one parsed document, shared by every granularity.
+    
+    Summaries and entities are computed on first use and kept per
+    (section, kind). The structure is identified by the sha256 ``digest``
+    of its content, so the caches amount to one entry per document hash
+    and section; section -1 is the whole document.
+    """
+    format_type: str
+    tree: HeadingTree
+    digest: str = ""
+    _projections: Dict[int, List[HeadingView]] = field(default_factory=dict, repr=False)
+    _sections: Dict[Tuple[int, str], Any] = field(default_factory=dict, repr=False)
+    
+    @property
+    def roots(self) -> List[HeadingNode]:
+        """Root headings with their full subtrees, built on demand."""
+        return [self.tree.node(index) for index in self.tree.children()]
+    
+    def project(self, max_level: int) -> List[HeadingView]:
+        """Return the root headings down to ``max_level``, cached per level."""
+        views = self._projections.get(max_level)
+        if views is None:
+            views = self._projections[max_level] = [
+                HeadingView(self, index, max_level) for index in self.tree.children(max_level=max_level)
+            ]
+        return views
+    
+    def content(self, index: int = -1) -> str:
+        """Return a section body, or the whole document for -1."""
+        return self.tree.source if index < 0 else self.tree.content(index)
+    
+    def summary(self, index: int, level: str) -> str:
+        """Return the cached summary of a section at a summarization level."""
+        key = (index, level)
+        if key not in self._sections:
+            self._sections[key] = summarize_content(self.content(index), level)
+        return self._sections[key]
+    
+    def entities(self, index: int) -> Dict[str, List[str]]:
+        """Return the entities of a section, extracted once and copied per call."""
+        key = (index, "entities")
+        if key not in self._sections:
+            self._sections[key] = extract_entities(self.content(index))
+        return {kind: list(values) for kind, values in self._sections[key].items()}
+
+
+async def _extract_item(
+    extractor: "LLMStructureExtractor",
+    content: Optional[str],
+    path: Optional[str],
+    extraction_config: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Extract one document of a batch, reading it from ``path`` if given."""
+    started = time.perf_counter()
+    try:
+        if path is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        result = await extractor.extract(content, extraction_config=extraction_config)
+        item = {"success": True, "result": result}
+    except (OSError, UnicodeDecodeError) as e:
+        item = {"success": False, "error": str(e)}
+    item["seconds"] = round(time.perf_counter() - started, 6)
+    return item
+
+
+# Extractor of a batch worker process, kept across documents so its parse
+# and result caches are reused
+_worker_extractor: Optional["LLMStructureExtractor"] = None
+
+
+def _extract_in_worker(
+    config: Config,
+    content: Optional[str],
+    path: Optional[str],
+    extraction_config: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Process pool entry point of ``LLMStructureExtractor.extract_many``."""
+    global _worker_extractor
+    if _worker_extractor is None or _worker_extractor.config != config:
+        _worker_extractor = LLMStructureExtractor(config)
+    return asyncio.run(_extract_item(_worker_extractor, content, path, extraction_config))
+
+
 class LLMStructureExtractor:
     """Tool for extracting hierarchical structure from text content."""
     
@@ -48,6 +596,23 @@ class LLMStructureExtractor:
             "rst": re.compile(r"^(.+)\n([=\-~`#\"^+*]{3,})$", re.MULTILINE),
             "asciidoc": re.compile(r"^(={1,6})\s+(.+)$", re.MULTILINE)
         }
+        
+        # Repeated extractions of a document, e.g. at several granularities,
+        # share one parse
+        self._parse = lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse_structure)
+        
+        # Results of earlier extractions, keyed by content hash and settings
+        self.cache = ExtractionCache(
+            max_bytes=config.extraction.result_cache_bytes,
+            directory=config.extraction.result_cache_directory,
+            version=EXTRACTOR_VERSION,
+            max_disk_bytes=config.extraction.result_cache_disk_bytes
+        )
+        
+        # Process pool for extract_many, created on first use and
+        # recreated when a batch asks for a different number of workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
     
     def _detect_format(self, content: str) -> str:
         """Detect the format of the content.
@@ -58,24 +623,7 @@ class LLMStructureExtractor:
         Returns:
             Detected format type
         """
-        # Check for HTML tags
-        if re.search(r"<h[1-6].*?>", content, re.IGNORECASE):
-            return "html"
-        
-        # Check for Markdown headers
-        if re.search(r"^#{1,6}\s+", content, re.MULTILINE):
-            return "markdown"
-        
-        # Check for reStructuredText
-        if re.search(r"^.+\n[=\-~`#\"^+*]{3,}$", content, re.MULTILINE):
-            return "rst"
-        
-        # Check for AsciiDoc
-        if re.search(r"^={1,6}\s+", content, re.MULTILINE):
-            return "asciidoc"
-        
-        # Default to markdown
-        return "markdown"
+        return detect_format(content)
     
     def _extract_markdown_headings(self, content: str) -> List[Tuple[int, str, int]]:
         """Extract headings from Markdown content.
@@ -86,118 +634,103 @@ class LLMStructureExtractor:
         Returns:
             List of (level, text, line_number) tuples
         """
-        headings = []
-        lines = content.split("\n")
+        return [span[:3] for span in scan_markdown_headings(content)]
+    
+    def _heading_spans(self, headings: List[Tuple[int, str, int]], content: str) -> List[HeadingSpan]:
+        """Attach section offsets to headings found by line number.
         
-        for i, line in enumerate(lines):
-            match = self.heading_patterns["markdown"].match(line)
-            if match:
-                level = len(match.group(1))
-                text = match.group(2).strip()
-                headings.append((level, text, i + 1))
+        A section runs from the line after its heading to the line of the
+        next heading.
         
-        return headings
+        Args:
+            headings: List of (level, text, line_number) tuples
+            content: Original content
+            
+        Returns:
+            Headings with section offsets
+        """
+        starts = line_starts(content)
+        length = len(content)
+        
+        def offset(line_index: int) -> int:
+            return starts[line_index] if line_index < len(starts) else length
+        
+        spans = []
+        for i, (level, text, line_num) in enumerate(headings):
+            start = offset(line_num)
+            end = offset(headings[i + 1][2] - 1) if i + 1 < len(headings) else length
+            spans.append(HeadingSpan(level, text, line_num, start, max(start, end)))
+        return spans
     
     def _extract_html_headings(self, content: str) -> List[Tuple[int, str, int]]:
         """Extract headings from HTML content.
         
+        The document is parsed once with lxml and line numbers come from
+        the parser, so the cost is linear in the page size no matter how
+        many headings it has. Markup lxml cannot parse falls back to a
+        regex scan.
+        
+        Args:
+            content: HTML content
+            
+        Returns:
+            List of (level, text, line_number) tuples
+        """
+        try:
+            root = lxml.html.document_fromstring(content)
+        except (lxml.etree.ParserError, ValueError):
+            return self._scan_html_headings(content)
+        
+        return [
+            (int(element.tag[1]), element.text_content().strip(), element.sourceline or 1)
+            for element in root.iter(*_HTML_HEADING_TAGS)
+        ]
+    
+    def _scan_html_headings(self, content: str) -> List[Tuple[int, str, int]]:
+        """Extract headings from HTML with a regex scan.
+        
+        Line numbers are looked up by bisecting a line start index built
+        once per document.
+        
         Args:
             content: HTML content
             
         Returns:
             List of (level, text, line_number) tuples
         """
+        starts = line_starts(content)
         headings = []
         
         for match in self.heading_patterns["html"].finditer(content):
             level = int(match.group(1))
-            text = re.sub(r"<.*?>", "", match.group(2)).strip()
-            # Approximate line number
-            line_number = content[:match.start()].count("\n") + 1
-            headings.append((level, text, line_number))
+            text = _HTML_TAG.sub("", match.group(2)).strip()
+            headings.append((level, text, bisect_right(starts, match.start())))
         
         return headings
     
-    def _build_hierarchy(self, headings: List[Tuple[int, str, int]], content_lines: List[str]) -> List[HeadingNode]:
+    def _build_hierarchy(self, headings: Iterable[HeadingSpan], content: str) -> List[HeadingNode]:
         """Build hierarchical structure from flat heading list.
         
         Args:
-            headings: List of (level, text, line_number) tuples
-            content_lines: Original content lines
+            headings: Headings with section offsets, in document order
+            content: Original content
             
         Returns:
             List of root heading nodes
         """
-        if not headings:
-            return []
-        
-        root_nodes = []
-        stack = []  # Stack of (level, node) tuples
-        
-        for i, (level, text, line_num) in enumerate(headings):
-            # Extract content between this heading and the next
-            start_line = line_num
-            if i + 1 < len(headings):
-                end_line = headings[i + 1][2] - 1
-            else:
-                end_line = len(content_lines)
-            
-            # Get content, excluding the heading line itself
-            content = "\n".join(content_lines[start_line:end_line]).strip()
-            
-            node = HeadingNode(level=level, text=text, content=content, line_number=line_num)
-            
-            # Find parent node
-            while stack and stack[-1][0] >= level:
-                stack.pop()
-            
-            if stack:
-                # Add as child to parent
-                stack[-1][1].children.append(node)
-            else:
-                # Add as root node
-                root_nodes.append(node)
-            
-            stack.append((level, node))
-        
-        return root_nodes
+        return DocumentStructure("", HeadingTree(content, headings)).roots
     
-    def _filter_by_granularity(self, nodes: List[HeadingNode], granularity: str) -> List[HeadingNode]:
+    def _filter_by_granularity(self, structure: DocumentStructure, granularity: str) -> List[HeadingView]:
         """Filter nodes based on granularity setting.
         
         Args:
-            nodes: List of heading nodes
+            structure: Parsed document
             granularity: Granularity level
             
         Returns:
-            Filtered list of nodes
+            Views of the root headings, hiding levels below the granularity
         """
-        max_level = {
-            "L1_only": 1,
-            "L1_L2": 2,
-            "L1_L2_L3": 3,
-            "full_hierarchy": 6
-        }.get(granularity, 6)
-        
-        def filter_node(node: HeadingNode) -> Optional[HeadingNode]:
-            if node.level > max_level:
-                return None
-            
-            filtered_children = []
-            for child in node.children:
-                filtered_child = filter_node(child)
-                if filtered_child:
-                    filtered_children.append(filtered_child)
-            
-            return HeadingNode(
-                level=node.level,
-                text=node.text,
-                content=node.content,
-                children=filtered_children,
-                line_number=node.line_number
-            )
-        
-        return [filter_node(node) for node in nodes if filter_node(node)]
+        return structure.project(GRANULARITY_LEVELS.get(granularity, 6))
     
     def _summarize_content(self, content: str, level: str) -> str:
         """Summarize content based on summarization level.
@@ -209,22 +742,30 @@ class LLMStructureExtractor:
         Returns:
             Summarized content
         """
-        if level == "none":
-            return ""
-        elif level == "brief":
-            # Return first paragraph or 200 characters
-            paragraphs = content.split("\n\n")
-            if paragraphs:
-                return paragraphs[0][:200] + "..." if len(paragraphs[0]) > 200 else paragraphs[0]
-            return content[:200] + "..." if len(content) > 200 else content
-        elif level == "detailed":
-            # Return first 500 characters or 2 paragraphs
-            paragraphs = content.split("\n\n")
-            if len(paragraphs) >= 2:
-                return "\n\n".join(paragraphs[:2])
-            return content[:500] + "..." if len(content) > 500 else content
-        else:  # full
-            return content
+        return summarize_content(content, level)
+    
+    def _parse_structure(self, content: str, digest: Optional[str] = None) -> DocumentStructure:
+        """Detect the format and build the full heading tree of a document.
+        
+        Use the cached ``_parse`` instead.
+        
+        Args:
+            content: Text content
+            digest: ``content_digest`` of the content, if already computed
+            
+        Returns:
+            Parsed document
+        """
+        format_type = self._detect_format(content)
+        self.logger.debug(f"Detected format: {format_type}")
+        
+        # Extract headings based on format
+        if format_type == "html":
+            headings = self._heading_spans(self._extract_html_headings(content), content)
+        else:
+            headings = _HEADING_SCANNERS[format_type](content)
+        
+        return DocumentStructure(format_type, HeadingTree(content, headings), digest or content_digest(content))
     
     async def extract(
         self,
@@ -234,6 +775,16 @@ class LLMStructureExtractor:
     ) -> Dict[str, Any]:
         """Extract hierarchical structure from content.
         
+        Besides ``granularity`` and ``summarization`` the extraction config
+        accepts ``include_content`` (section bodies, default true),
+        ``include_entities`` (default true) and ``section_summaries``
+        (a summary per section at the summarization level, default
+        false). Clients that only need the outline can turn the first two
+        off, and nothing but the headings is computed.
+        
+        Results are cached by the hash of the content and the merged
+        config, in memory and optionally on disk.
+        
         Args:
             content: Text content to analyze
             target_schema: Optional target structure schema
@@ -249,52 +800,131 @@ class LLMStructureExtractor:
         config = {
             "granularity": self.config.extraction.context_granularity,
             "summarization": self.config.extraction.content_summarization,
+            "include_content": True,
+            "include_entities": True,
+            "section_summaries": False,
             **(extraction_config or {})
         }
         
-        # Detect content format
-        format_type = self._detect_format(content)
-        self.logger.debug(f"Detected format: {format_type}")
-        
-        # Extract headings based on format
-        if format_type == "markdown":
-            headings = self._extract_markdown_headings(content)
-        elif format_type == "html":
-            headings = self._extract_html_headings(content)
-        else:
-            # Fallback to markdown
-            headings = self._extract_markdown_headings(content)
+        digest = content_digest(content)
+        cache_key = self.cache.key(digest, config)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            self.logger.info("Structure extraction served from cache",
+                            total_headings=cached["total_headings"])
+            return cached
         
-        # Build hierarchy
-        content_lines = content.split("\n")
-        hierarchy = self._build_hierarchy(headings, content_lines)
+        # Parse once; other granularities of the same content reuse it
+        structure = self._parse(content, digest)
+        tree = structure.tree
         
         # Filter by granularity
-        filtered_hierarchy = self._filter_by_granularity(hierarchy, config["granularity"])
+        filtered_hierarchy = self._filter_by_granularity(structure, config["granularity"])
         
         # Calculate extraction confidence
-        total_headings = len(headings)
+        total_headings = len(tree)
         confidence = min(1.0, total_headings / 10.0) if total_headings > 0 else 0.0
         
-        # Extract entities (simplified version)
-        entities = self._extract_entities(content)
+        summary_level = config["summarization"] if config["section_summaries"] else None
         
         result = {
-            "structured_headings": [node.to_dict() for node in filtered_hierarchy],
-            "content_summary": self._summarize_content(content, config["summarization"]),
-            "extracted_entities": entities,
+            "structured_headings": [
+                node.to_dict(config["include_content"], summary_level)
+                for node in filtered_hierarchy
+            ],
+            "content_summary": structure.summary(-1, config["summarization"]),
             "confidence_score": confidence,
-            "format_detected": format_type,
+            "format_detected": structure.format_type,
             "total_headings": total_headings,
-            "hierarchy_levels": list(set(h[0] for h in headings)) if headings else []
+            "hierarchy_levels": list(set(tree.levels))
         }
         
+        if config["include_entities"]:
+            # Extract entities (simplified version)
+            result["extracted_entities"] = structure.entities(-1)
+        
+        await self.cache.put(cache_key, result)
+        
         self.logger.info("Structure extraction completed", 
                         total_headings=total_headings,
                         confidence=confidence)
         
         return result
     
+    async def extract_many(
+        self,
+        documents: Iterable[str] = (),
+        paths: Iterable[Union[str, Path]] = (),
+        extraction_config: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Extract the structure of many documents in parallel.
+        
+        Documents are fanned out to a process pool; files are read by the
+        workers, so their text is never copied through this process.
+        Every worker keeps its own extractor, so the on-disk result cache
+        is shared with the pool while the in-memory caches are per worker.
+        
+        Args:
+            documents: Document texts
+            paths: Files to read as UTF-8 documents
+            extraction_config: Extraction configuration for every document
+            workers: Worker processes, defaults to
+                ``extraction.extraction_workers``; 0 uses one per CPU and 1
+                extracts in this process
+            
+        Yields:
+            One item per document, in the order extractions finish, with
+            ``index`` (documents first, then paths), ``source`` (the path or
+            None), ``success``, ``result`` or ``error`` and ``seconds``
+        """
+        jobs = [(content, None) for content in documents]
+        jobs.extend((None, str(path)) for path in paths)
+        
+        if workers is None:
+            workers = self.config.extraction.extraction_workers
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(jobs))
+        
+        self.logger.info("Extracting structure from documents", documents=len(jobs), workers=workers)
+        
+        if workers <= 1:
+            for index, (content, path) in enumerate(jobs):
+                item = await _extract_item(self, content, path, extraction_config)
+                yield {"index": index, "source": path, **item}
+            return
+        
+        if self._executor is None or self._executor_workers != workers:
+            if self._executor is not None:
+                # Batches still running on the old pool finish their work
+                self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+            self._executor_workers = workers
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        
+        async def run(index: int, content: Optional[str], path: Optional[str]) -> Dict[str, Any]:
+            item = await loop.run_in_executor(
+                executor, _extract_in_worker, self.config, content, path, extraction_config
+            )
+            return {"index": index, "source": path, **item}
+        
+        tasks = [asyncio.ensure_future(run(index, content, path)) for index, (content, path) in enumerate(jobs)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def close(self) -> None:
+        """Shut down the batch extraction pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_workers = 0
+    
     def _extract_entities(self, content: str) -> Dict[str, List[str]]:
         """Extract named entities from content.
         
@@ -304,30 +934,4 @@ class LLMStructureExtractor:
         Returns:
             Dictionary of entity types and values
         """
-        entities = {
-            "urls": [],
-            "emails": [],
-            "code_blocks": [],
-            "key_terms": []
-        }
-        
-        # Extract URLs
-        url_pattern = re.compile(r"https?://[^\s<>\"{}|\\^`\[\]]+")
-        entities["urls"] = list(set(url_pattern.findall(content)))
-        
-        # Extract emails
-        email_pattern = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")
-        entities["emails"] = list(set(email_pattern.findall(content)))
-        
-        # Extract code blocks (markdown style)
-        code_pattern = re.compile(r"```[\s\S]*?```", re.MULTILINE)
-        entities["code_blocks"] = [match.group() for match in code_pattern.finditer(content)]
-        
-        # Extract key terms (simplified - look for capitalized multi-word phrases)
-        term_pattern = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b")
-        potential_terms = term_pattern.findall(content)
-        # Filter common phrases
-        entities["key_terms"] = [term for term in set(potential_terms) 
-                               if len(term.split()) <= 4 and term.count(" ") <= 3]
-        
-        return entities
\ No newline at end of file
+        return extract_entities(content)
@@ -1,16 +1,133 @@
 """URL discovery engine for YAML Context Engineering."""
 
 import re
-from typing import List, Dict, Any, Set
-from urllib.parse import urlparse, urljoin
+from functools import lru_cache
+from typing import List, Dict, Any, Set, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlparse, urlsplit
 from collections import defaultdict
 
-import validators
-
 from ..config import Config
+from ..crawler.canonical import URLCanonicalizer
 from ..utils.logging import get_logger
 
 
+# One alternation for every kind of link, tried left to right at each
+# position, so the content is scanned once and a URL that was matched as a
+# markdown or HTML link is not matched again as a bare URL or domain.
+_LINK_PATTERN = re.compile(
+    r"""
+    \[[^\]\n]+\]\((?P<markdown>https?://[^)\s]+)\)
+    | <a\s[^>]*?href=["']?(?P<html>https?://[^"'>\s]+)["']?[^>]*>
+    | (?P<url>https?://[^\s<>"'{}|\\^`\[\]]+)
+    | (?<![\w@./:-])(?P<domain>(?:www\.)?[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)*\.[a-zA-Z]{2,63})
+      (?P<path>/[^\s<>"'{}|\\^`\[\]]*)?
+    """,
+    re.VERBOSE
+)
+
+_HOST_PATTERN = re.compile(
+    r"(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}"
+    r"|localhost"
+    r"|(?:\d{1,3}\.){3}\d{1,3}"
+)
+
+_TRAILING_PUNCTUATION = ".,;:!?'\""
+
+# Priority score weights per matched keyword class
+_KEYWORD_WEIGHTS = {"high": 0.3, "medium": 0.2, "low": -0.1}
+
+_CONTEXT_KEYWORDS = ["important", "required", "must", "essential"]
+_PENALIZED_PATTERNS = ["#", "?page=", "login", "signin", "register"]
+_DOCUMENTATION_PATHS = ["/docs/", "/api/", "/reference/", "/guide/"]
+
+# URL patterns per content value class, checked in this order
+_CONTENT_VALUE_PATTERNS = {
+    "high": [
+        "/api", "/docs", "/documentation", "/reference", "/spec",
+        "/tutorial", "/guide", "/manual", "/quickstart"
+    ],
+    "medium": [
+        "/example", "/sample", "/demo", "/overview", "/about",
+        "/introduction", "/features", "/faq"
+    ],
+    "low": [
+        "/blog", "/news", "/press", "/contact", "/privacy",
+        "/terms", "/legal", "/careers", "/jobs"
+    ]
+}
+
+
+class URLMatch(NamedTuple):
+    """A link found in content, with the offsets of its matched text."""
+    url: str
+    start: int
+    end: int
+
+
+@lru_cache(maxsize=65536)
+def is_valid_url(url: str) -> bool:
+    """Check that a URL is an absolute http(s) URL with a plausible host.
+
+    A cheaper stand-in for ``validators.url`` on the discovery hot path;
+    pages repeat the same links many times, so results are cached.
+
+    Args:
+        url: URL to check
+
+    Returns:
+        True if the URL can be crawled
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return False
+    if parts.scheme not in ("http", "https") or parts.username or parts.password:
+        return False
+    host = parts.hostname or ""
+    if port is not None and not 0 < port < 65536:
+        return False
+    return _HOST_PATTERN.fullmatch(host) is not None
+
+
+def _trim_url(url: str) -> str:
+    """Drop sentence punctuation and unbalanced closing parentheses."""
+    while url:
+        if url[-1] in _TRAILING_PUNCTUATION:
+            url = url[:-1]
+        elif url[-1] == ")" and url.count(")") > url.count("("):
+            url = url[:-1]
+        else:
+            break
+    return url
+
+
+def iter_url_matches(content: str) -> Iterator[URLMatch]:
+    """Find link candidates in one pass over the content.
+
+    Markdown links, HTML anchors, bare URLs and plain domain references
+    (``www.example.com/docs``) are recognized; domains are turned into
+    https URLs. Candidates are not validated.
+
+    Args:
+        content: Text, markdown or HTML content
+
+    Yields:
+        Matches in the order they appear in the content
+    """
+    for match in _LINK_PATTERN.finditer(content):
+        kind = match.lastgroup
+        if kind == "path":
+            kind = "domain"
+        if kind == "domain":
+            url = "https://" + match.group("domain") + _trim_url(match.group("path") or "")
+        elif kind == "url":
+            url = _trim_url(match.group("url"))
+        else:
+            url = match.group(kind)
+        yield URLMatch(url, match.start(), match.end())
+
+
 class URLDiscoveryEngine:
     """Tool for discovering and prioritizing URLs from content."""
     
@@ -22,18 +139,7 @@ class URLDiscoveryEngine:
         """
         self.config = config
         self.logger = get_logger(__name__)
-        
-        # URL extraction patterns
-        self.url_patterns = [
-            # Standard URLs
-            re.compile(r'https?://[^\s<>"\'{}\|\\^`\[\]]+'),
-            # Markdown links
-            re.compile(r'\[([^\]]+)\]\((https?://[^)]+)\)'),
-            # HTML links
-            re.compile(r'<a[^>]+href=["\']?(https?://[^"\'>\s]+)["\']?[^>]*>'),
-            # Plain domain references
-            re.compile(r'\b(?:www\.)?([a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)+)(?:/[^\s]*)?')
-        ]
+        self.canonicalizer = URLCanonicalizer()
         
         # Priority keywords for URL scoring
         self.priority_keywords = {
@@ -41,85 +147,129 @@ class URLDiscoveryEngine:
             "medium": ["example", "sample", "demo", "overview", "introduction", "getting-started"],
             "low": ["blog", "news", "about", "contact", "privacy", "terms"]
         }
+        # Keyword weights in scoring order; anything but high and medium
+        # counts against a URL
+        self._keyword_weights = [
+            (keyword, _KEYWORD_WEIGHTS.get(priority, _KEYWORD_WEIGHTS["low"]))
+            for priority, keywords in self.priority_keywords.items()
+            for keyword in keywords
+        ]
+        # Frontier URLs are re-scored on every expansion, so the URL-only
+        # part of the score is cached
+        self._url_features = lru_cache(maxsize=65536)(self._compute_url_features)
+    
+    def _tokenize_urls(self, content: str) -> Iterator[URLMatch]:
+        """Yield valid, canonicalized link candidates with their offsets.
+        
+        Args:
+            content: Text content
+            
+        Returns:
+            Iterator of URL matches, duplicates included
+        """
+        canonicalize = self.canonicalizer.canonicalize
+        return (
+            match._replace(url=canonicalize(match.url))
+            for match in iter_url_matches(content)
+            if is_valid_url(match.url)
+        )
     
     def _extract_urls(self, content: str, base_domain: str) -> Set[str]:
         """Extract all URLs from content.
         
         Args:
             content: Text content
-            base_domain: Base domain for resolving relative URLs
+            base_domain: Base domain of the content
             
         Returns:
             Set of unique URLs
         """
-        urls = set()
-        base_url = f"https://{base_domain}" if not base_domain.startswith("http") else base_domain
-        
-        # Extract with different patterns
-        for pattern in self.url_patterns:
-            matches = pattern.findall(content)
-            for match in matches:
-                if isinstance(match, tuple):
-                    # For patterns that capture groups
-                    url = match[1] if len(match) > 1 else match[0]
-                else:
-                    url = match
-                
-                # Handle plain domain references
-                if not url.startswith(("http://", "https://")):
-                    if validators.domain(url.split("/")[0]):
-                        url = f"https://{url}"
-                    else:
-                        # Might be a relative path
-                        url = urljoin(base_url, url)
-                
-                # Validate and add
-                if validators.url(url):
-                    urls.add(url)
-        
-        return urls
+        return {match.url for match in self._tokenize_urls(content)}
     
-    def _calculate_priority_score(self, url: str, context: str = "") -> float:
-        """Calculate priority score for a URL.
+    def _compute_url_features(self, url: str) -> Tuple[float, bool, bool, str]:
+        """Score the keywords of one URL.
         
         Args:
-            url: URL to score
-            context: Optional context where URL was found
+            url: URL to evaluate
             
         Returns:
-            Priority score (0.0 to 1.0)
+            Tuple of (base score plus keyword weights, penalized,
+            documentation path, estimated content value)
         """
-        score = 0.5  # Base score
         url_lower = url.lower()
-        context_lower = context.lower() if context else ""
-        
-        # Check URL path for keywords
-        for priority, keywords in self.priority_keywords.items():
-            for keyword in keywords:
-                if keyword in url_lower:
-                    if priority == "high":
-                        score += 0.3
-                    elif priority == "medium":
-                        score += 0.2
-                    else:
-                        score -= 0.1
-        
-        # Check context for relevance
-        if context:
+        
+        score = 0.5  # Base score
+        for keyword, weight in self._keyword_weights:
+            if keyword in url_lower:
+                score += weight
+        
+        penalized = any(pattern in url_lower for pattern in _PENALIZED_PATTERNS)
+        documentation = any(path in url_lower for path in _DOCUMENTATION_PATHS)
+        
+        value = "unknown"
+        for candidate, patterns in _CONTENT_VALUE_PATTERNS.items():
+            if any(pattern in url_lower for pattern in patterns):
+                value = candidate
+                break
+        
+        return score, penalized, documentation, value
+    
+    def score_batch(
+        self,
+        urls: Sequence[str],
+        contexts: Optional[Dict[str, str]] = None
+    ) -> Tuple[List[float], List[str]]:
+        """Score many URLs at once.
+        
+        The URL-dependent part of each score is cached, so re-scoring a
+        frontier only evaluates the contexts of URLs seen before.
+        
+        Args:
+            urls: URLs to score
+            contexts: Optional mapping of URL to surrounding text
+            
+        Returns:
+            Tuple of (priority scores, estimated content values), aligned
+            with ``urls``
+        """
+        contexts = contexts or {}
+        scores = []
+        values = []
+        for url in urls:
+            score, penalized, documentation, value = self._url_features(url)
+            
             # URLs in headings or near important keywords get higher scores
-            if any(keyword in context_lower for keyword in ["important", "required", "must", "essential"]):
+            context = contexts.get(url)
+            if context:
+                context_lower = context.lower()
+                if any(keyword in context_lower for keyword in _CONTEXT_KEYWORDS):
+                    score += 0.2
+            
+            # Penalize certain URL patterns
+            if penalized:
+                score -= 0.2
+            
+            # Prefer documentation subdirectories
+            if documentation:
                 score += 0.2
+            
+            scores.append(max(0.0, min(1.0, score)))
+            values.append(value)
         
-        # Penalize certain URL patterns
-        if any(pattern in url_lower for pattern in ["#", "?page=", "login", "signin", "register"]):
-            score -= 0.2
-        
-        # Prefer documentation subdirectories
-        if any(path in url_lower for path in ["/docs/", "/api/", "/reference/", "/guide/"]):
-            score += 0.2
+        return scores, values
+    
+    def _calculate_priority_score(self, url: str, context: str = "") -> float:
+        """Calculate priority score for a URL.
         
-        # Normalize score
-        return max(0.0, min(1.0, score))
+        Args:
+            url: URL to score
+            context: Optional context where URL was found
+            
+        Returns:
+            Priority score (0.0 to 1.0)
+        """
+        scores, _ = self.score_batch([url], {url: context} if context else None)
+        return scores[0]
     
     def _determine_relation_type(self, url: str, base_domain: str) -> str:
         """Determine the relation type of URL to base domain.
@@ -152,30 +302,43 @@ class URLDiscoveryEngine:
         Returns:
             Estimated content value category
         """
-        url_lower = url.lower()
+        _, values = self.score_batch([url])
+        return values[0]
+    
+    def prioritize(
+        self,
+        urls: Iterable[str],
+        base_domain: str,
+        contexts: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Score and sort already known URLs.
+        
+        Args:
+            urls: URLs to score
+            base_domain: Base domain for relation detection
+            contexts: Optional mapping of URL to surrounding text
+            
+        Returns:
+            List of URLs with metadata, highest priority first
+        """
+        urls = list(urls)
+        contexts = contexts or {}
+        scores, values = self.score_batch(urls, contexts)
         
-        # High value patterns
-        if any(pattern in url_lower for pattern in [
-            "/api", "/docs", "/documentation", "/reference", "/spec",
-            "/tutorial", "/guide", "/manual", "/quickstart"
-        ]):
-            return "high"
-        
-        # Medium value patterns
-        if any(pattern in url_lower for pattern in [
-            "/example", "/sample", "/demo", "/overview", "/about",
-            "/introduction", "/features", "/faq"
-        ]):
-            return "medium"
-        
-        # Low value patterns
-        if any(pattern in url_lower for pattern in [
-            "/blog", "/news", "/press", "/contact", "/privacy",
-            "/terms", "/legal", "/careers", "/jobs"
-        ]):
-            return "low"
-        
-        return "unknown"
+        url_data = []
+        for url, score, value in zip(urls, scores, values):
+            context = contexts.get(url, "")
+            url_data.append({
+                "url": url,
+                "priority_score": score,
+                "relation_type": self._determine_relation_type(url, base_domain),
+                "estimated_content_value": value,
+                "context_snippet": context.strip() if context else ""
+            })
+        
+        # Sort by priority score
+        url_data.sort(key=lambda x: x["priority_score"], reverse=True)
+        return url_data
     
     async def discover(
         self,
@@ -197,48 +360,31 @@ class URLDiscoveryEngine:
                         content_length=len(content),
                         base_domain=base_domain)
         
-        # Extract all URLs
-        urls = self._extract_urls(content, base_domain)
+        # Extract all canonical URLs, keeping the first occurrence of each
+        first_seen: Dict[str, URLMatch] = {}
+        for match in self._tokenize_urls(content):
+            first_seen.setdefault(match.url, match)
+        urls = set(first_seen)
         
         # Apply filters if provided
         if filters:
-            filtered_urls = set()
-            for url in urls:
-                if any(re.search(pattern, url) for pattern in filters):
-                    filtered_urls.add(url)
-            urls = filtered_urls
+            filter_patterns = [re.compile(pattern) for pattern in filters]
+            urls = {url for url in urls if any(p.search(url) for p in filter_patterns)}
         
         # Apply domain pattern restrictions from config
         if self.config.crawling.target_domain_patterns:
-            domain_filtered = set()
-            for url in urls:
-                if any(re.search(pattern, url) for pattern in self.config.crawling.target_domain_patterns):
-                    domain_filtered.add(url)
-            urls = domain_filtered
+            domain_patterns = [re.compile(p) for p in self.config.crawling.target_domain_patterns]
+            urls = {url for url in urls if any(p.search(url) for p in domain_patterns)}
         
-        # Score and analyze each URL
-        url_data = []
+        # Context around each URL, from the offsets of its first occurrence
+        contexts = {}
         for url in urls:
-            # Find context around URL in content
-            context = ""
-            url_index = content.find(url)
-            if url_index != -1:
-                # Get 100 characters before and after
-                start = max(0, url_index - 100)
-                end = min(len(content), url_index + len(url) + 100)
-                context = content[start:end]
-            
-            url_info = {
-                "url": url,
-                "priority_score": self._calculate_priority_score(url, context),
-                "relation_type": self._determine_relation_type(url, base_domain),
-                "estimated_content_value": self._estimate_content_value(url),
-                "context_snippet": context.strip() if context else ""
-            }
-            url_data.append(url_info)
+            match = first_seen[url]
+            # Get 100 characters before and after
+            contexts[url] = content[max(0, match.start - 100):match.end + 100]
         
-        # Sort by priority score
-        url_data.sort(key=lambda x: x["priority_score"], reverse=True)
+        # Score and sort by priority
+        url_data = self.prioritize(urls, base_domain, contexts)
         
         # Group by relation type for reporting
         by_relation = defaultdict(int)
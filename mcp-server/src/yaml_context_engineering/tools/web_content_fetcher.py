@@ -1,19 +1,61 @@
 """Web content fetching tool for YAML Context Engineering."""
 
 import asyncio
+import codecs
 import re
-from typing import List, Dict, Any, Optional
-from urllib.parse import urljoin, urlparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
+from urllib.parse import urlparse
 
 import aiohttp
 from bs4 import BeautifulSoup
-import html2text
-from langdetect import detect
 import validators
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..config import Config
+from ..crawler.cache import ResponseCache
+from ..crawler.politeness import HostScheduler, host_of
 from ..utils.logging import get_logger
+from .html_conversion import convert_html, extract_links
+from .http_client import HttpxSession, create_aiohttp_session
+
+
+# Size of the chunks read from the network when streaming a response body
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Statuses telling the client to slow down, and gateway errors that signal
+# an overloaded host; both are retried after backing off
+THROTTLE_STATUSES = {429, 503}
+GATEWAY_STATUSES = {502, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date.
+    
+    Args:
+        value: Header value
+        
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response exceeds the configured size limit."""
 
 
 class WebContentFetcher:
@@ -27,96 +69,273 @@ class WebContentFetcher:
         """
         self.config = config
         self.logger = get_logger(__name__)
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = True
-        self.html_converter.body_width = 0  # No line wrapping
         
         # Session for connection pooling
-        self._session: Optional[aiohttp.ClientSession] = None
+        self._session: Optional[Union[aiohttp.ClientSession, HttpxSession]] = None
+        
+        # Process pool for HTML conversion, created on first use
+        self._executor: Optional[ProcessPoolExecutor] = None
+        
+        # Per-host politeness shared by fetch() and the crawl engine
+        self.scheduler = HostScheduler(
+            default_delay=config.crawling.crawl_delay_seconds,
+            max_per_host=config.crawling.max_concurrent_per_host,
+            max_window=config.crawling.adaptive_max_per_host
+        )
+        
+        # Optional on-disk response cache
+        self.cache: Optional[ResponseCache] = None
+        if config.crawling.cache_directory:
+            self.cache = ResponseCache(
+                config.crawling.cache_directory,
+                ttl_seconds=config.crawling.cache_duration_seconds
+            )
     
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
+    async def _get_session(self) -> Union[aiohttp.ClientSession, HttpxSession]:
+        """Get or create the shared HTTP session for the configured backend."""
         if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.config.crawling.timeout_seconds)
-            headers = {"User-Agent": self.config.crawling.user_agent}
-            self._session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers=headers
-            )
+            if self.config.crawling.http_backend == "httpx":
+                self._session = HttpxSession(self.config)
+            else:
+                self._session = create_aiohttp_session(self.config)
         return self._session
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
-    async def _fetch_single_url(self, url: str) -> Dict[str, Any]:
-        """Fetch content from a single URL with retry logic.
+    async def _convert_html(self, body: bytes, url: str, encoding: Optional[str]) -> Dict[str, Any]:
+        """Convert an HTML body, in the process pool if one is configured.
+        
+        Args:
+            body: Raw HTML bytes
+            url: Page URL for resolving relative links
+            encoding: Charset from the Content-Type header, if any
+            
+        Returns:
+            Dictionary with content, title, meta_description, language
+            and extracted_urls
+        """
+        detect_language = self.config.extraction.language_detection
+        mode = self.config.crawling.conversion_mode
+        workers = self.config.crawling.conversion_workers
+        if workers <= 0:
+            return convert_html(body, url, encoding, detect_language, mode)
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, convert_html, body, url, encoding, detect_language, mode
+        )
+    
+    def _is_allowed_content_type(self, content_type: str) -> bool:
+        """Check a Content-Type against the configured allow list."""
+        if not content_type:
+            return True
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        return any(media_type.startswith(allowed) for allowed in self.config.crawling.allowed_content_types)
+    
+    def _check_content_length(self, response: aiohttp.ClientResponse) -> None:
+        """Reject oversized bodies before downloading when the policy is abort."""
+        limit = self.config.crawling.max_response_bytes
+        length = response.headers.get("Content-Length")
+        if (
+            self.config.crawling.oversized_response_policy == "abort"
+            and length and length.isdigit() and int(length) > limit
+        ):
+            raise ResponseTooLarge(f"Content-Length {length} exceeds limit of {limit} bytes")
+    
+    async def _read_body(self, response: aiohttp.ClientResponse) -> Tuple[bytes, bool]:
+        """Stream the response body up to the configured byte limit.
+        
+        Args:
+            response: Open response
+            
+        Returns:
+            Tuple of (body bytes, truncated flag)
+        """
+        limit = self.config.crawling.max_response_bytes
+        self._check_content_length(response)
+        
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            if size + len(chunk) > limit:
+                if self.config.crawling.oversized_response_policy == "abort":
+                    raise ResponseTooLarge(f"Response body exceeds limit of {limit} bytes")
+                chunks.append(chunk[:limit - size])
+                return b"".join(chunks), True
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks), False
+    
+    async def _read_text(self, response: aiohttp.ClientResponse) -> Tuple[str, bool]:
+        """Stream and incrementally decode a text body.
+        
+        Reading stops as soon as ``max_content_length`` characters have been
+        decoded or the byte limit is reached, so large text bodies are never
+        held in memory in full.
+        
+        Args:
+            response: Open response
+            
+        Returns:
+            Tuple of (decoded text, truncated flag)
+        """
+        byte_limit = self.config.crawling.max_response_bytes
+        char_limit = self.config.extraction.max_content_length
+        self._check_content_length(response)
+        
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        
+        parts = []
+        chars = 0
+        size = 0
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            over_limit = size > byte_limit
+            if over_limit:
+                if self.config.crawling.oversized_response_policy == "abort":
+                    raise ResponseTooLarge(f"Response body exceeds limit of {byte_limit} bytes")
+                chunk = chunk[:len(chunk) - (size - byte_limit)]
+            
+            text = decoder.decode(chunk)
+            parts.append(text)
+            chars += len(text)
+            if chars > char_limit or over_limit:
+                return "".join(parts)[:char_limit], True
+        
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts), False
+    
+    def _backoff_result(self, url: str, status: int, error: str, retry_after: Optional[float] = None) -> Dict[str, Any]:
+        """Build the result of a request the host pushed back on."""
+        self.logger.warning(f"Host is pushing back: {url}", status_code=status, retry_after=retry_after)
+        return {
+            "url": url,
+            "status_code": status,
+            "content": "",
+            "error": error,
+            "retryable": True,
+            "retry_after": retry_after,
+            "success": False
+        }
+    
+    async def _fetch_single_url(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Fetch content from a single URL, once.
+        
+        Cached responses are served directly while fresh and revalidated
+        with a conditional GET once the cache TTL has expired. Response
+        latency, throttling and timeouts are reported to the host scheduler,
+        and results the host pushed back on are marked ``retryable``.
         
         Args:
             url: URL to fetch
+            timeout: Optional per-request timeout in seconds
             
         Returns:
             Dictionary with fetched content and metadata
         """
         session = await self._get_session()
+        host = host_of(url)
+        
+        # Consult the response cache
+        cached = await self.cache.get(url) if self.cache else None
+        request_headers = {}
+        if cached:
+            entry, cached_result = cached
+            if entry.is_fresh(self.cache.ttl_seconds):
+                self.cache.stats["hits"] += 1
+                return {**cached_result, "url": url, "cache_status": "hit"}
+            request_headers = entry.conditional_headers()
         
         try:
-            async with session.get(url) as response:
+            request_timeout = aiohttp.ClientTimeout(total=timeout or self.config.crawling.timeout_seconds)
+            started = time.monotonic()
+            async with session.get(url, headers=request_headers, timeout=request_timeout) as response:
+                if response.status in THROTTLE_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        retry_after = min(retry_after, self.config.crawling.max_retry_after_seconds)
+                    self.scheduler.record_throttled(host, retry_after)
+                    return self._backoff_result(url, response.status, f"HTTP {response.status}", retry_after)
+                if response.status in GATEWAY_STATUSES:
+                    self.scheduler.record_timeout(host)
+                    return self._backoff_result(url, response.status, f"HTTP {response.status}")
+                self.scheduler.record_response(host, time.monotonic() - started)
+                
+                if response.status == 304 and cached:
+                    # Not modified: the cached result is still valid
+                    self.cache.stats["revalidated"] += 1
+                    await self.cache.touch(
+                        entry,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified")
+                    )
+                    return {**cached_result, "url": url, "cache_status": "revalidated"}
+                
                 response.raise_for_status()
                 
-                # Get content
+                # Check the content type before downloading anything
                 content_type = response.headers.get("Content-Type", "")
-                if "text/html" in content_type:
-                    html_content = await response.text()
-                    soup = BeautifulSoup(html_content, "lxml")
-                    
-                    # Extract metadata
-                    title = soup.find("title")
-                    title_text = title.string if title else ""
-                    
-                    meta_description = soup.find("meta", attrs={"name": "description"})
-                    description = meta_description.get("content", "") if meta_description else ""
-                    
-                    # Convert to markdown
-                    markdown_content = self.html_converter.handle(html_content)
-                    
-                    # Detect language
-                    try:
-                        language = detect(markdown_content[:1000])
-                    except:
-                        language = "unknown"
-                    
-                    # Extract URLs
-                    extracted_urls = self._extract_urls(soup, url)
-                    
+                if not self._is_allowed_content_type(content_type):
+                    self.logger.info(f"Skipping unsupported content type: {url}",
+                                    content_type=content_type)
                     return {
                         "url": str(response.url),
                         "status_code": response.status,
-                        "content": markdown_content,
-                        "title": title_text,
-                        "meta_description": description,
-                        "language": language,
-                        "extracted_urls": extracted_urls,
+                        "content": "",
                         "content_type": content_type,
-                        "success": True
+                        "error": f"Unsupported content type: {content_type}",
+                        "success": False
                     }
+                
+                if "text/html" in content_type:
+                    body, truncated = await self._read_body(response)
+                    page = await self._convert_html(body, url, response.charset)
                 else:
                     # Non-HTML content
-                    text_content = await response.text()
-                    return {
-                        "url": str(response.url),
-                        "status_code": response.status,
-                        "content": text_content,
+                    body, truncated = await self._read_text(response)
+                    page = {
+                        "content": body,
                         "title": "",
                         "meta_description": "",
                         "language": "unknown",
-                        "extracted_urls": [],
-                        "content_type": content_type,
-                        "success": True
+                        "extracted_urls": []
                     }
+                
+                # Enforce the extracted content limit
+                max_length = self.config.extraction.max_content_length
+                if len(page["content"]) > max_length:
+                    page["content"] = page["content"][:max_length]
+                    truncated = True
+                
+                result = {
+                    "url": str(response.url),
+                    "status_code": response.status,
+                    **page,
+                    "content_type": content_type,
+                    "truncated": truncated,
+                    "success": True
+                }
+                
+                if self.cache:
+                    self.cache.stats["misses"] += 1
+                    await self.cache.put(
+                        url,
+                        result,
+                        body,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified")
+                    )
+                    result["cache_status"] = "miss"
+                
+                return result
                     
-        except aiohttp.ClientError as e:
+        except asyncio.TimeoutError:
+            self.scheduler.record_timeout(host)
+            return self._backoff_result(url, 0, "Request timed out")
+        except (aiohttp.ClientError, ResponseTooLarge) as e:
             self.logger.error(f"Failed to fetch URL: {url}", error=str(e))
             return {
                 "url": url,
@@ -136,76 +355,154 @@ class WebContentFetcher:
         Returns:
             List of extracted URLs
         """
-        urls = []
+        return extract_links(soup, base_url)
+    
+    async def iter_raw(self, url: str, timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        """Stream the raw body of a URL, such as robots.txt or a sitemap.
+        
+        No conversion, caching or content type filtering is applied, and
+        callers are responsible for politeness scheduling.
+        
+        Args:
+            url: URL to fetch
+            timeout: Optional per-request timeout in seconds
+            
+        Yields:
+            Body chunks as received
+            
+        Raises:
+            aiohttp.ClientError: On connection errors and HTTP error statuses
+        """
+        session = await self._get_session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.config.crawling.timeout_seconds)
+        async with session.get(url, timeout=request_timeout) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                yield chunk
+    
+    async def cached_result(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result of a URL while it is fresh.
+        
+        Needs no request, so callers check it before waiting for a host
+        slot; stale entries and misses return None.
+        
+        Args:
+            url: URL to look up
+            
+        Returns:
+            Result dictionary with ``cache_status: hit``, or None
+        """
+        cached = await self.cache.get(url) if self.cache else None
+        if not cached:
+            return None
+        entry, cached_result = cached
+        if not entry.is_fresh(self.cache.ttl_seconds):
+            return None
+        self.cache.stats["hits"] += 1
+        return {**cached_result, "url": url, "cache_status": "hit"}
+    
+    async def fetch_url(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Fetch a single URL once, without politeness scheduling.
         
-        # Extract from links
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            absolute_url = urljoin(base_url, href)
+        Callers are responsible for acquiring a host slot first and for
+        retrying results marked ``retryable`` once the host is ready again.
+        
+        Args:
+            url: URL to fetch
+            timeout: Optional per-request timeout in seconds
             
-            # Validate URL
-            if validators.url(absolute_url):
-                urls.append(absolute_url)
+        Returns:
+            Result dictionary; failures are reported with ``success: False``
+        """
+        try:
+            return await self._fetch_single_url(url, timeout)
+        except Exception as e:
+            self.logger.error(f"Failed to fetch URL: {url}", error=str(e))
+            return {
+                "url": url,
+                "status_code": 0,
+                "content": "",
+                "error": str(e),
+                "success": False
+            }
+    
+    async def _fetch_scheduled(
+        self,
+        url: str,
+        semaphore: asyncio.Semaphore,
+        timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        """Fetch a URL within the global and per-host concurrency limits.
         
-        # Extract from navigation elements
-        for nav in soup.find_all(["nav", "aside"]):
-            for link in nav.find_all("a", href=True):
-                href = link["href"]
-                absolute_url = urljoin(base_url, href)
-                if validators.url(absolute_url) and absolute_url not in urls:
-                    urls.append(absolute_url)
+        Fresh cache hits are returned right away. Requests the host pushed
+        back on are retried up to ``max_retries`` times. Each retry waits
+        for a new host slot, which honors ``Retry-After`` and the host's
+        reduced rate.
+        """
+        # Fresh cache hits take neither a concurrency nor a host slot
+        cached = await self.cached_result(url)
+        if cached is not None:
+            return cached
         
-        return urls
+        max_retries = self.config.crawling.max_retries
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                async with self.scheduler.slot(url):
+                    result = await self._fetch_single_url(url, timeout)
+                if not result.get("retryable") or attempt == max_retries:
+                    return result
+                self.logger.info(f"Retrying {url}", attempt=attempt + 1, error=result.get("error"))
     
-    async def fetch(self, urls: List[str], timeout: int = 30) -> List[Dict[str, Any]]:
+    async def fetch(self, urls: List[str], timeout: Optional[int] = None) -> List[Dict[str, Any]]:
         """Fetch content from multiple URLs.
         
         Args:
             urls: List of URLs to fetch
-            timeout: Timeout in seconds
+            timeout: Per-request timeout in seconds, defaults to config
             
         Returns:
-            List of results for each URL
+            List of results for each URL, in the order of ``urls``
         """
         self.logger.info(f"Fetching {len(urls)} URLs", urls=urls)
         
-        # Update timeout if different from config
-        if timeout != self.config.crawling.timeout_seconds:
-            self.config.crawling.timeout_seconds = timeout
-        
         # Validate URLs
         valid_urls = []
-        results = []
+        results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
         
-        for url in urls:
+        for i, url in enumerate(urls):
             if validators.url(url):
-                valid_urls.append(url)
+                valid_urls.append((i, url))
             else:
                 self.logger.warning(f"Invalid URL: {url}")
-                results.append({
+                results[i] = {
                     "url": url,
                     "error": "Invalid URL format",
                     "success": False
-                })
+                }
         
-        # Fetch valid URLs concurrently
+        # Fetch valid URLs concurrently, bounded globally and per host
         if valid_urls:
-            tasks = [self._fetch_single_url(url) for url in valid_urls]
+            semaphore = asyncio.Semaphore(self.config.crawling.max_concurrent_requests)
+            tasks = [self._fetch_scheduled(url, semaphore, timeout) for _, url in valid_urls]
             fetch_results = await asyncio.gather(*tasks, return_exceptions=True)
             
-            for result in fetch_results:
+            for (i, url), result in zip(valid_urls, fetch_results):
                 if isinstance(result, Exception):
-                    results.append({
+                    results[i] = {
+                        "url": url,
                         "error": str(result),
                         "success": False
-                    })
+                    }
                 else:
-                    results.append(result)
+                    results[i] = result
         
         self.logger.info(f"Fetched {len(results)} URLs successfully")
         return results
     
     async def close(self) -> None:
-        """Close the session."""
+        """Close the session and the conversion pool."""
         if self._session and not self._session.closed:
-            await self._session.close()
\ No newline at end of file
+            await self._session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
\ No newline at end of file
@@ -33,6 +33,7 @@ class TestConfig:
         # Test output defaults
         assert config.output.output_base_directory == Path("generated_contexts")
         assert config.output.create_index_files is True
+        assert config.output.write_concurrency == 16
     
     def test_config_from_env(self, monkeypatch):
         """Test configuration from environment variables."""
@@ -45,6 +46,9 @@ class TestConfig:
         monkeypatch.setenv("MCP_CONTEXT_GRANULARITY", "full_hierarchy")
         monkeypatch.setenv("MCP_CONTENT_SUMMARIZATION", "brief")
         monkeypatch.setenv("MCP_OUTPUT_DIRECTORY", "/tmp/test_output")
+        monkeypatch.setenv("MCP_EXTRACTION_CACHE_DIRECTORY", "/tmp/test_cache")
+        monkeypatch.setenv("MCP_WRITE_CONCURRENCY", "32")
+        monkeypatch.setenv("MCP_INPUT_DIRECTORIES", os.pathsep.join(["/tmp/docs", "/tmp/notes"]))
         
         config = Config.from_env()
         
@@ -56,6 +60,9 @@ class TestConfig:
         assert config.extraction.context_granularity == "full_hierarchy"
         assert config.extraction.content_summarization == "brief"
         assert config.output.output_base_directory == Path("/tmp/test_output")
+        assert config.extraction.result_cache_directory == Path("/tmp/test_cache")
+        assert config.output.write_concurrency == 32
+        assert config.extraction.input_directories == [Path("/tmp/docs"), Path("/tmp/notes")]
     
     def test_config_validation_valid(self):
         """Test configuration validation with valid values."""
@@ -85,6 +92,27 @@ class TestConfig:
         with pytest.raises(ValueError, match="Invalid content_summarization"):
             config.validate()
     
+    def test_config_validation_invalid_conversion_mode(self):
+        """Test configuration validation with invalid conversion mode."""
+        config = Config()
+        config.crawling.conversion_mode = "invalid"
+        
+        with pytest.raises(ValueError, match="Invalid conversion_mode"):
+            config.validate()
+    
+    def test_config_validation_invalid_duplicate_policy(self):
+        """Test configuration validation with invalid duplicate handling."""
+        config = Config()
+        config.extraction.duplicate_policy = "merge"
+        
+        with pytest.raises(ValueError, match="Invalid duplicate_policy"):
+            config.validate()
+        
+        config.extraction.duplicate_policy = "skip"
+        config.extraction.duplicate_threshold = 1.5
+        with pytest.raises(ValueError, match="duplicate_threshold"):
+            config.validate()
+    
     def test_config_validation_invalid_crawl_depth(self):
         """Test configuration validation with invalid crawl depth."""
         config = Config()
@@ -135,6 +163,8 @@ class TestExtractionConfig:
         assert config.language_detection is True
         assert config.extract_metadata is True
         assert config.max_content_length == 100000
+        assert config.result_cache_directory is None
+        assert config.result_cache_disk_bytes == 1024 * 1024 * 1024
 
 
 class TestOutputConfig:
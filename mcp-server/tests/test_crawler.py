@@ -0,0 +1,891 @@
+"""Tests for crawl scheduling."""
+
+import asyncio
+import gzip
+import json
+import math
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from yaml_context_engineering.crawler import (
+    CrawlEngine,
+    CrawlFrontier,
+    CrawlStateStore,
+    FingerprintManifest,
+    HostScheduler,
+    NearDuplicateIndex,
+    ResponseCache,
+    RobotsPolicy,
+    SitemapParser,
+    SourceDefinition,
+    SourcePipeline,
+    TokenBucket,
+    URLCanonicalizer,
+    apply_global_settings,
+    content_fingerprint,
+    load_global_settings,
+    load_sources,
+    minhash_signature,
+    page_path
+)
+from yaml_context_engineering.tools import (
+    FileSystemManager,
+    LLMStructureExtractor,
+    URLDiscoveryEngine,
+    WebContentFetcher
+)
+
+
+SOURCES_PATH = Path(__file__).parent.parent / "config" / "sources.yaml"
+
+
+def make_response(status=200, body="", headers=None, url="https://example.com/"):
+    """Create a mock aiohttp response usable as an async context manager."""
+    response = MagicMock()
+    response.status = status
+    response.url = url
+    response.headers = headers or {}
+    response.text = AsyncMock(return_value=body)
+    response.raise_for_status = MagicMock()
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=False)
+    return response
+
+
+class TestHostScheduler:
+    """Test per-host politeness scheduling."""
+
+    def test_token_bucket_rate(self):
+        """Test token bucket refills at the configured rate."""
+        bucket = TokenBucket(rate=2.0)
+        assert bucket.consume(now=bucket.updated)
+        assert not bucket.consume(now=bucket.updated)
+        assert bucket.time_until_available(now=bucket.updated) == pytest.approx(0.5)
+        assert bucket.consume(now=bucket.updated + 0.5)
+
+    def test_host_delay_override(self):
+        """Test per-host delay overrides."""
+        scheduler = HostScheduler(default_delay=1.0, host_delays={"API.slack.com": 2.0})
+        assert scheduler.delay_for("api.slack.com") == 2.0
+        assert scheduler.delay_for("example.com") == 1.0
+
+    def test_per_host_cap(self):
+        """Test concurrency cap per host."""
+        scheduler = HostScheduler(default_delay=0.001, max_per_host=1)
+        assert scheduler.try_acquire("example.com")
+        assert scheduler.ready_in("example.com") == math.inf
+        assert not scheduler.try_acquire("example.com")
+
+        # Other hosts are not affected
+        assert scheduler.try_acquire("other.com")
+
+        scheduler.release("example.com")
+        assert scheduler.in_flight("example.com") == 0
+
+
+    def test_adaptive_window(self):
+        """Test AIMD: healthy responses grow the cap, pushback shrinks it."""
+        scheduler = HostScheduler(default_delay=1.0, max_per_host=2, max_window=4)
+        assert scheduler.limit("example.com") == 2
+
+        for _ in range(20):
+            scheduler.record_response("example.com", 0.1)
+        assert scheduler.limit("example.com") == 4
+
+        scheduler.record_throttled("example.com")
+        assert scheduler.limit("example.com") == 2
+        assert scheduler.metrics()["example.com"]["delay_seconds"] == 2.0
+
+        # A latency spike also counts as congestion
+        scheduler.record_response("example.com", 5.0)
+        assert scheduler.limit("example.com") == 1
+        assert scheduler.metrics()["example.com"]["throttled"] == 1
+
+    def test_retry_after_blocks_host(self):
+        """Test Retry-After keeps the host closed but not other hosts."""
+        scheduler = HostScheduler(default_delay=0.001)
+        scheduler.record_throttled("example.com", retry_after=60)
+
+        assert scheduler.ready_in("example.com") > 59
+        assert not scheduler.try_acquire("example.com")
+        assert scheduler.try_acquire("other.com")
+
+
+class TestCrawlFrontier:
+    """Test crawl frontier."""
+
+    def test_priority_order_and_dedup(self):
+        """Test entries are popped by priority and seen URLs are rejected."""
+        frontier = CrawlFrontier(HostScheduler(default_delay=0.5, max_per_host=10))
+        assert frontier.push("https://example.com/blog", priority=0.2)
+        assert frontier.push("https://example.com/docs", priority=0.9)
+        assert not frontier.push("https://example.com/docs", priority=1.0)
+        assert len(frontier) == 2
+
+        entry, wait = frontier.pop_ready()
+        assert entry.url == "https://example.com/docs"
+        assert wait == 0.0
+
+    def test_busy_host_does_not_block_others(self):
+        """Test a rate-limited host yields to a ready one."""
+        frontier = CrawlFrontier(HostScheduler(default_delay=10.0))
+        frontier.push("https://a.com/1", priority=0.9)
+        frontier.push("https://a.com/2", priority=0.8)
+        frontier.push("https://b.com/1", priority=0.1)
+
+        first, _ = frontier.pop_ready()
+        second, _ = frontier.pop_ready()
+        third, wait = frontier.pop_ready()
+
+        assert first.url == "https://a.com/1"
+        assert second.url == "https://b.com/1"
+        assert third is None
+        assert 0 < wait <= 10.0
+
+
+class TestCrawlEngine:
+    """Test concurrent crawl engine."""
+
+    @pytest.fixture
+    def engine(self, test_config):
+        """Create crawl engine with a fast scheduler."""
+        test_config.crawling.crawl_delay_seconds = 0.001
+        fetcher = WebContentFetcher(test_config)
+        return CrawlEngine(test_config, fetcher, URLDiscoveryEngine(test_config))
+
+    @pytest.mark.asyncio
+    async def test_crawl_follows_links_to_max_depth(self, engine):
+        """Test links are followed breadth-wise up to max depth."""
+        links = {
+            "https://example.com/": ["https://example.com/docs", "https://example.com/blog"],
+            "https://example.com/docs": ["https://example.com/docs/api"],
+            "https://example.com/blog": [],
+            "https://example.com/docs/api": ["https://example.com/too-deep"],
+        }
+
+        async def fake_fetch(url, timeout=None):
+            return {"url": url, "success": True, "extracted_urls": links.get(url, [])}
+
+        engine.fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        results = await engine.crawl(["https://example.com/"], max_depth=3)
+
+        fetched = {r["url"] for r in results}
+        assert fetched == set(links)
+        assert engine.scheduler.in_flight("example.com") == 0
+
+    @pytest.mark.asyncio
+    async def test_crawl_respects_filter_and_max_pages(self, engine):
+        """Test URL filter and page cap."""
+        async def fake_fetch(url, timeout=None):
+            return {
+                "url": url,
+                "success": True,
+                "extracted_urls": [f"https://example.com/docs/{i}" for i in range(10)]
+                                  + ["https://example.com/blog/post"]
+            }
+
+        engine.fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        results = await engine.crawl(
+            ["https://example.com/docs"],
+            max_pages=4,
+            url_filter=lambda url: "/blog" not in url
+        )
+
+        assert len(results) == 4
+        assert all("/blog" not in r["url"] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_crawl_resumes_from_state(self, engine, temp_output_dir):
+        """Test an interrupted crawl continues without refetching finished pages."""
+        state = CrawlStateStore(temp_output_dir)
+        state.add("https://example.com/", depth=1, priority=1.0)
+        state.mark_done("https://example.com/")
+        state.add("https://example.com/docs", depth=2, parent="https://example.com/")
+        state.mark_in_progress("https://example.com/docs")
+        state.add("https://example.com/blog", depth=2, parent="https://example.com/")
+
+        async def fake_fetch(url, timeout=None):
+            return {"url": url, "success": True, "extracted_urls": ["https://example.com/"]}
+
+        engine.fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        results = await engine.crawl(["https://example.com/"], max_depth=3, state=state)
+
+        assert {r["url"] for r in results} == {"https://example.com/docs", "https://example.com/blog"}
+        assert state.counts() == {"pending": 0, "in_progress": 0, "done": 3, "failed": 0}
+        state.close()
+
+
+    @pytest.mark.asyncio
+    async def test_crawl_collapses_duplicate_urls(self, engine):
+        """Test URLs differing by fragment, tracking params or host case are fetched once."""
+        async def fake_fetch(url, timeout=None):
+            return {
+                "url": url,
+                "success": True,
+                "extracted_urls": [
+                    "https://example.com/docs#intro",
+                    "https://EXAMPLE.com/docs?utm_source=nav",
+                    "https://example.com:443/docs",
+                    "https://example.com/docs?b=2&a=1",
+                    "https://example.com/docs?a=1&b=2#top"
+                ]
+            }
+
+        engine.fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        results = await engine.crawl(["https://Example.com/#top"], max_depth=2)
+
+        assert sorted(r["url"] for r in results) == [
+            "https://example.com/",
+            "https://example.com/docs",
+            "https://example.com/docs?a=1&b=2"
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_crawl_requeues_throttled_pages(self, engine):
+        """Test pages the host pushed back on are retried, not reported as failed."""
+        attempts = {}
+
+        async def fake_fetch(url, timeout=None):
+            attempts[url] = attempts.get(url, 0) + 1
+            if attempts[url] == 1:
+                engine.scheduler.record_throttled("example.com")
+                return {"url": url, "success": False, "retryable": True, "error": "HTTP 429"}
+            return {"url": url, "success": True, "extracted_urls": []}
+
+        engine.fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        engine.scheduler.default_delay = 0.001
+        results = await engine.crawl(["https://example.com/"], max_depth=1)
+
+        assert [r["success"] for r in results] == [True]
+        assert attempts == {"https://example.com/": 2}
+
+    @pytest.mark.asyncio
+    async def test_crawl_source_passes_source_timeout(self, engine):
+        """Test every page is fetched with the source timeout, not a scheduling delay."""
+        source = SourceDefinition(
+            source_id="example",
+            name="Example",
+            primary_urls=["https://example.com/docs"],
+            max_depth=2,
+            rate_limit=0.05,
+            timeout=17,
+            include_patterns=["/docs"]
+        )
+
+        async def fake_fetch(url, timeout=None):
+            return {
+                "url": url,
+                "success": True,
+                "extracted_urls": [f"https://example.com/docs/{i}" for i in range(5)]
+            }
+
+        engine.fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        with patch.object(engine, "_fetch_entry", wraps=engine._fetch_entry) as fetch_entry:
+            results = await engine.crawl_source(source)
+
+        assert len(results) == 6
+        assert [call.args[1] for call in fetch_entry.call_args_list] == [17] * 6
+
+
+class TestURLCanonicalizer:
+    """Test URL canonicalization."""
+
+    def test_default_rules(self):
+        """Test the rules applied to every crawl."""
+        canonicalizer = URLCanonicalizer()
+
+        assert canonicalizer.canonicalize(
+            "HTTPS://Docs.Example.com:443/Guide/?utm_medium=x&q=a%20b&fbclid=1#part"
+        ) == "https://docs.example.com/Guide/?q=a%20b"
+        assert canonicalizer.canonicalize("http://example.com:8080") == "http://example.com:8080/"
+        assert canonicalizer.canonicalize("mailto:docs@example.com") == "mailto:docs@example.com"
+
+    def test_source_rules(self):
+        """Test per-source rules from sources.yaml."""
+        claude = load_sources(SOURCES_PATH)["anthropic-claude"].canonicalizer
+
+        assert claude.canonicalize("https://docs.anthropic.com/ja/docs/intro/") == \
+            "https://docs.anthropic.com/en/docs/intro"
+        assert claude.canonicalize("https://docs.anthropic.com/zh-CN/api") == \
+            "https://docs.anthropic.com/en/api"
+
+        canonicalizer = URLCanonicalizer.from_dict({
+            "drop_query": True,
+            "trailing_slash": "add",
+            "rewrites": [{"pattern": r"^/v\d+/", "replace": "/latest/"}]
+        })
+        assert canonicalizer.canonicalize("https://example.com/v2/guide?page=2") == \
+            "https://example.com/latest/guide/"
+        assert canonicalizer.canonicalize("https://example.com/v2/spec.json") == \
+            "https://example.com/latest/spec.json"
+
+    def test_unknown_setting(self):
+        """Test misspelled rules are reported."""
+        with pytest.raises(ValueError):
+            URLCanonicalizer.from_dict({"trailing_slashes": "strip"})
+
+
+class TestCrawlStateStore:
+    """Test durable crawl state."""
+
+    def test_status_and_resume_queue(self, temp_output_dir):
+        """Test per-URL status, output paths and the queue left for a resume."""
+        state = CrawlStateStore(temp_output_dir)
+        assert state.add("https://example.com/a", priority=0.9)
+        assert not state.add("https://example.com/a")
+        state.add_many([
+            ("https://example.com/b", 2, 0.5, "https://example.com/a"),
+            ("https://example.com/c", 2, 0.1, "https://example.com/a")
+        ])
+        state.mark_done("https://example.com/a", output_path="a.md", data={"child_urls": []})
+        state.mark_failed("https://example.com/c", "timeout")
+        state.close()
+
+        state = CrawlStateStore(temp_output_dir, CrawlStateStore.FILENAME)
+        assert state.get("https://example.com/a").output_path == "a.md"
+        assert state.data("https://example.com/a") == {"child_urls": []}
+        assert state.get("https://example.com/c").error == "timeout"
+        assert [r.url for r in state.pending()] == ["https://example.com/b", "https://example.com/c"]
+        assert len(state.known()) == 3
+
+        state.reset()
+        assert state.known() == set()
+        state.close()
+
+    def test_dotted_directory(self, temp_output_dir):
+        """Test a directory name with a dot is not taken for the database file."""
+        state = CrawlStateStore(temp_output_dir / "docs.v2")
+        state.add("https://example.com/a")
+        state.close()
+
+        assert (temp_output_dir / "docs.v2" / CrawlStateStore.FILENAME).is_file()
+
+
+class TestSources:
+    """Test sources.yaml loading."""
+
+    def test_load_sources(self):
+        """Test loading the bundled sources configuration."""
+        sources = load_sources(SOURCES_PATH)
+        slack = sources["slack-api"]
+
+        assert slack.max_depth == 4
+        assert slack.rate_limit == 1.0
+        assert slack.host_delays() == {"api.slack.com": 1.0}
+        assert slack.accepts("https://api.slack.com/methods/chat.postMessage")
+        assert not slack.accepts("https://api.slack.com/changelog/docs")
+        assert not slack.accepts("https://example.com/docs")
+
+    def test_apply_global_settings(self, test_config):
+        """Test global settings override the crawling defaults."""
+        apply_global_settings(test_config, load_global_settings(SOURCES_PATH))
+
+        assert test_config.crawling.user_agent == "YAML-Context-Engineering-Agent/1.0"
+        assert test_config.crawling.max_concurrent_requests == 3
+        assert test_config.crawling.cache_duration_seconds == 86400
+        assert test_config.crawling.timeout_seconds == 30
+
+
+class TestSourcePipeline:
+    """Test the config-driven source pipeline."""
+
+    def test_page_path(self):
+        """Test URLs map to stable relative context file paths."""
+        assert page_path("https://api.slack.com/methods/chat.postMessage") == "methods/chat.postMessage.md"
+        assert page_path("https://api.slack.com/docs/") == "docs.md"
+        assert page_path("https://api.slack.com/") == "home.md"
+        assert page_path("https://Docs.example.com/a", include_host=True) == "docs.example.com/a.md"
+        assert page_path("https://example.com/a?x=1") != page_path("https://example.com/a?x=2")
+
+    @pytest.mark.asyncio
+    async def test_run_writes_context_files(self, test_config, temp_output_dir):
+        """Test a source is crawled into one context file per page."""
+        test_config.crawling.crawl_delay_seconds = 0.001
+        test_config.crawling.respect_robots_txt = False
+        test_config.output.output_base_directory = temp_output_dir
+        fetcher = WebContentFetcher(test_config)
+        pipeline = SourcePipeline(
+            test_config,
+            fetcher,
+            URLDiscoveryEngine(test_config),
+            LLMStructureExtractor(test_config),
+            FileSystemManager(test_config)
+        )
+        source = SourceDefinition(
+            source_id="example",
+            name="Example",
+            primary_urls=["https://example.com/docs"],
+            max_depth=2,
+            rate_limit=0.001,
+            include_patterns=["/docs"],
+            output={"format": ["markdown", "json"], "generate_index": True}
+        )
+
+        async def fake_fetch(url, timeout=None):
+            return {
+                "url": url,
+                "success": True,
+                "title": url,
+                "content": f"# {url}\n\nBody",
+                "extracted_urls": ["https://example.com/docs/api", "https://example.com/blog"]
+            }
+
+        fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        summary = await pipeline.run(source)
+
+        source_dir = temp_output_dir / "example"
+        assert summary["pages_written"] == 2
+        assert (source_dir / "docs.md").exists()
+        assert (source_dir / "docs" / "api.md").exists()
+        assert (source_dir / "index.md").exists()
+        assert {"docs.md", "docs/api.md"} == {p["path"] for p in json.loads((source_dir / "pages.json").read_text())}
+
+        summary = await pipeline.run(source, incremental=True)
+        summary = await pipeline.run(source, incremental=True)
+        assert summary["pages_written"] == 0
+        assert summary["changes"]["unchanged"] == 2
+        await fetcher.close()
+
+
+    @pytest.mark.asyncio
+    async def test_run_aliases_duplicate_pages(self, test_config, temp_output_dir):
+        """Test pages duplicating an earlier page are aliased instead of extracted."""
+        test_config.crawling.crawl_delay_seconds = 0.001
+        test_config.crawling.respect_robots_txt = False
+        test_config.output.output_base_directory = temp_output_dir
+        fetcher = WebContentFetcher(test_config)
+        extractor = LLMStructureExtractor(test_config)
+        pipeline = SourcePipeline(
+            test_config,
+            fetcher,
+            URLDiscoveryEngine(test_config),
+            extractor,
+            FileSystemManager(test_config)
+        )
+        source = SourceDefinition(
+            source_id="example",
+            name="Example",
+            primary_urls=["https://example.com/docs/latest/guide"],
+            max_depth=2,
+            rate_limit=0.001
+        )
+        body = "\n\n".join(f"## Step {i}\n\nConfigure option {i} before deploying the service." for i in range(40))
+
+        async def fake_fetch(url, timeout=None):
+            return {
+                "url": url,
+                "success": True,
+                "title": url,
+                "content": f"# Guide\n\n{body}\n\nPrinted from {url}",
+                "extracted_urls": ["https://example.com/docs/v2/guide"]
+            }
+
+        fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        extractor.extract = AsyncMock(wraps=extractor.extract)
+        summary = await pipeline.run(source)
+
+        assert summary["pages_written"] == 1
+        assert summary["pages_duplicate"] == 1
+        assert extractor.extract.await_count == 1
+        alias = (temp_output_dir / "example" / "docs" / "v2" / "guide.md").read_text()
+        assert "content_type: duplicate" in alias
+        assert "(../latest/guide.md)" in alias
+        await fetcher.close()
+
+
+    def _duplicate_pipeline(self, test_config, temp_output_dir):
+        test_config.crawling.crawl_delay_seconds = 0.001
+        test_config.crawling.respect_robots_txt = False
+        test_config.output.output_base_directory = temp_output_dir
+        fetcher = WebContentFetcher(test_config)
+        pipeline = SourcePipeline(
+            test_config,
+            fetcher,
+            URLDiscoveryEngine(test_config),
+            LLMStructureExtractor(test_config),
+            FileSystemManager(test_config)
+        )
+        return fetcher, pipeline
+
+    GUIDE = "\n\n".join(f"## Step {i}\n\nConfigure option {i} before deploying the service." for i in range(40))
+
+    @pytest.mark.asyncio
+    async def test_run_picks_duplicate_original_by_rank(self, test_config, temp_output_dir):
+        """Test the lowest URL stays the original even when it finishes last."""
+        fetcher, pipeline = self._duplicate_pipeline(test_config, temp_output_dir)
+        source = SourceDefinition(
+            source_id="example",
+            name="Example",
+            primary_urls=["https://example.com/b", "https://example.com/a", "https://example.com/c"],
+            max_depth=0,
+            rate_limit=0.001
+        )
+
+        async def fake_fetch(url, timeout=None):
+            if url.endswith("/a"):
+                await asyncio.sleep(0.05)
+            return {"url": url, "success": True, "title": url, "content": f"# Guide\n\n{self.GUIDE}"}
+
+        fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        summary = await pipeline.run(source)
+
+        source_dir = temp_output_dir / "example"
+        assert summary["pages_written"] == 1
+        assert summary["pages_duplicate"] == 2
+        assert "content_type: duplicate" not in (source_dir / "a.md").read_text()
+        for name in ("b.md", "c.md"):
+            alias = (source_dir / name).read_text()
+            assert "content_type: duplicate" in alias
+            assert "(a.md)" in alias
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_incremental_run_rewrites_former_duplicates(self, test_config, temp_output_dir):
+        """Test a page that stops duplicating another is written again, not kept as an alias."""
+        fetcher, pipeline = self._duplicate_pipeline(test_config, temp_output_dir)
+        source = SourceDefinition(
+            source_id="example",
+            name="Example",
+            primary_urls=["https://example.com/a", "https://example.com/b"],
+            max_depth=0,
+            rate_limit=0.001
+        )
+        bodies = {"https://example.com/a": f"# Guide\n\n{self.GUIDE}"}
+
+        async def fake_fetch(url, timeout=None):
+            return {"url": url, "success": True, "title": url, "content": bodies[url]}
+
+        fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        alias_path = temp_output_dir / "example" / "b.md"
+
+        bodies["https://example.com/b"] = "# Other\n\nA page of its own."
+        await pipeline.run(source, incremental=True)
+        bodies["https://example.com/b"] = bodies["https://example.com/a"]
+        await pipeline.run(source, incremental=True)
+        assert "content_type: duplicate" in alias_path.read_text()
+
+        bodies["https://example.com/b"] = "# Other\n\nA page of its own."
+        summary = await pipeline.run(source, incremental=True)
+        assert summary["pages_written"] == 1
+        assert "A page of its own." in alias_path.read_text()
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_resume_restores_duplicate_index(self, test_config, temp_output_dir):
+        """Test duplicates of pages written before an interruption are still found."""
+        fetcher, pipeline = self._duplicate_pipeline(test_config, temp_output_dir)
+        source = SourceDefinition(
+            source_id="example",
+            name="Example",
+            primary_urls=["https://example.com/a"],
+            max_depth=1,
+            rate_limit=0.001
+        )
+
+        async def fake_fetch(url, timeout=None):
+            return {
+                "url": url,
+                "success": True,
+                "title": url,
+                "content": f"# Guide\n\n{self.GUIDE}",
+                "extracted_urls": ["https://example.com/b"]
+            }
+
+        fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        await pipeline.run(source, max_pages=1)
+        # Interrupted before the discovered page was fetched
+        state = CrawlStateStore(temp_output_dir / "example")
+        state.add("https://example.com/b", depth=1, parent="https://example.com/a")
+        state.close()
+
+        summary = await pipeline.run(source, resume=True)
+        assert summary["pages_written"] == 0
+        assert summary["pages_duplicate"] == 1
+        assert "(a.md)" in (temp_output_dir / "example" / "b.md").read_text()
+        await fetcher.close()
+
+
+class TestSitemaps:
+    """Test robots.txt and sitemap discovery."""
+
+    ROBOTS = (
+        "User-agent: *\n"
+        "Disallow: /private/\n"
+        "Crawl-delay: 2\n"
+        "Sitemap: https://example.com/sitemap_index.xml\n"
+    )
+    INDEX = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        '<sitemap><loc>https://example.com/docs.xml.gz</loc></sitemap>'
+        '</sitemapindex>'
+    )
+    URLSET = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        '<url><loc>https://example.com/docs/a</loc><lastmod>2025-01-01</lastmod></url>'
+        '<url><loc>https://example.com/docs/b</loc><lastmod>2025-02-01</lastmod><priority>0.8</priority></url>'
+        '<url><loc>https://example.com/private/c</loc></url>'
+        '</urlset>'
+    )
+
+    def test_robots_policy(self):
+        """Test disallow rules, Crawl-delay and announced sitemaps."""
+        policy = RobotsPolicy(self.ROBOTS, user_agent="YAML-Context-Engineering-Agent/1.0")
+        assert policy.allowed("https://example.com/docs/a")
+        assert not policy.allowed("https://example.com/private/c")
+        assert policy.crawl_delay == 2.0
+        assert policy.sitemaps == ["https://example.com/sitemap_index.xml"]
+        assert RobotsPolicy("").allowed("https://example.com/anything")
+
+    def test_parser_streams_gzipped_chunks(self):
+        """Test gzipped sitemaps are parsed from small chunks."""
+        data = gzip.compress(self.URLSET.encode("utf-8"))
+        parser = SitemapParser()
+        for i in range(0, len(data), 7):
+            parser.feed(data[i:i + 7])
+        parser.close()
+
+        assert [e.url for e in parser.entries] == [
+            "https://example.com/docs/a", "https://example.com/docs/b", "https://example.com/private/c"
+        ]
+        assert parser.entries[1].lastmod == "2025-02-01"
+        assert parser.entries[1].priority == 0.8
+
+    @pytest.mark.asyncio
+    async def test_pipeline_seeds_from_sitemaps(self, test_config, temp_output_dir):
+        """Test sitemap seeding, robots rules and lastmod skipping."""
+        test_config.crawling.crawl_delay_seconds = 0.001
+        test_config.output.output_base_directory = temp_output_dir
+        fetcher = WebContentFetcher(test_config)
+        files = {
+            "https://example.com/robots.txt": self.ROBOTS.replace("Crawl-delay: 2\n", "").encode("utf-8"),
+            "https://example.com/sitemap_index.xml": self.INDEX.encode("utf-8"),
+            "https://example.com/docs.xml.gz": gzip.compress(self.URLSET.encode("utf-8"))
+        }
+
+        async def fake_iter_raw(url, timeout=None):
+            yield files[url]
+
+        async def fake_fetch(url, timeout=None):
+            return {"url": url, "success": True, "content": f"# {url}", "extracted_urls": []}
+
+        fetcher.iter_raw = fake_iter_raw
+        fetcher.fetch_url = AsyncMock(side_effect=fake_fetch)
+        pipeline = SourcePipeline(
+            test_config,
+            fetcher,
+            URLDiscoveryEngine(test_config),
+            LLMStructureExtractor(test_config),
+            FileSystemManager(test_config)
+        )
+        source = SourceDefinition(
+            source_id="example",
+            name="Example",
+            primary_urls=["https://example.com/docs"],
+            rate_limit=0.001,
+            sitemaps=True
+        )
+
+        summary = await pipeline.run(source, incremental=True)
+        fetched = {call.args[0] for call in fetcher.fetch_url.call_args_list}
+        assert fetched == {"https://example.com/docs", "https://example.com/docs/a", "https://example.com/docs/b"}
+        assert summary["pages_written"] == 3
+
+        fetcher.fetch_url.reset_mock()
+        summary = await pipeline.run(source, incremental=True)
+        fetched = {call.args[0] for call in fetcher.fetch_url.call_args_list}
+        assert fetched == {"https://example.com/docs"}
+        assert summary["changes"]["unchanged"] == 3
+        assert summary["changes"]["removed"] == 0
+        await fetcher.close()
+
+
+class TestNearDuplicateIndex:
+    """Test near-duplicate page detection."""
+
+    PAGE = "\n\n".join(
+        f"## Section {i}\n\nThe client retries request {i} with exponential backoff."
+        for i in range(50)
+    )
+
+    def test_signature_similarity(self):
+        """Test small edits keep signatures close and different pages apart."""
+        edited = self.PAGE.replace("Section 7", "Section seven") + "\n\nPrint view"
+        other = "\n\n".join(f"## Topic {i}\n\nWebhooks deliver event {i} as JSON." for i in range(50))
+        index = NearDuplicateIndex()
+
+        original = minhash_signature(self.PAGE)
+        index.add("https://example.com/a", original)
+
+        assert len(original) == 128
+        assert index.query(minhash_signature(edited)).url == "https://example.com/a"
+        assert index.query(minhash_signature(other)) is None
+
+    def test_check(self):
+        """Test originals are indexed and copies report the original."""
+        index = NearDuplicateIndex()
+
+        assert index.check("https://example.com/a", self.PAGE, "a.md") is None
+        exact = index.check("https://example.com/b", self.PAGE + "\n\n")
+        assert (exact.url, exact.output_path, exact.similarity) == ("https://example.com/a", "a.md", 1.0)
+        assert index.check("https://example.com/a", self.PAGE) is None
+        assert len(index) == 1
+
+    def test_assign_prefers_lower_rank(self):
+        """Test a page ranked before its original takes its place."""
+        index = NearDuplicateIndex()
+
+        assert index.assign("https://example.com/c", self.PAGE, "c.md", rank=(1, "https://example.com/c")) == (None, {})
+        match, moved = index.assign("https://example.com/b", self.PAGE, "b.md", rank=(1, "https://example.com/b"))
+        assert match is None
+        assert [(url, m.url, m.output_path) for url, m in moved.items()] == [("https://example.com/c", "https://example.com/b", "b.md")]
+        match, moved = index.assign("https://example.com/d", self.PAGE, "d.md", rank=(2, "https://example.com/d"))
+
+        assert (match.url, match.output_path) == ("https://example.com/b", "b.md")
+        assert moved == {}
+        assert index.check("https://example.com/e", self.PAGE + "\n\nPrint view").url == "https://example.com/b"
+        assert len(index) == 1
+
+
+class TestResponseCache:
+    """Test persistent response cache."""
+
+    @pytest.fixture
+    def cache(self, temp_output_dir):
+        """Create cache instance."""
+        return ResponseCache(temp_output_dir / "cache", ttl_seconds=60)
+
+    @pytest.mark.asyncio
+    async def test_put_and_get(self, cache):
+        """Test results are stored by normalized URL and body hash."""
+        await cache.put("https://EXAMPLE.com/docs#intro", {"content": "A"}, "<p>A</p>", etag='"v1"')
+        await cache.put("https://example.com/docs", {"content": "A"}, "<p>A</p>", etag='"v1"')
+
+        entry, payload = await cache.get("https://example.com/docs")
+        assert payload == {"content": "A"}
+        assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+        assert len(list((cache.directory / "blobs").rglob("*.json"))) == 1
+        assert await cache.get("https://example.com/missing") is None
+
+    @pytest.mark.asyncio
+    async def test_identical_bodies_keep_their_links(self, cache):
+        """Test identical bodies under different URLs keep their own resolved links."""
+        body = '<a href="page">Page</a>'
+        await cache.put("https://example.com/a/", {"extracted_urls": ["https://example.com/a/page"]}, body)
+        await cache.put("https://example.com/b/", {"extracted_urls": ["https://example.com/b/page"]}, body)
+
+        _, payload = await cache.get("https://example.com/b/")
+        assert payload["extracted_urls"] == ["https://example.com/b/page"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_puts(self, cache):
+        """Test concurrent puts of one URL and of identical bodies all succeed."""
+        urls = [f"https://example.com/page{i % 4}" for i in range(8)]
+        await asyncio.gather(*(cache.put(url, {"content": "A"}, "<p>A</p>") for url in urls))
+
+        for url in urls:
+            _, payload = await cache.get(url)
+            assert payload == {"content": "A"}
+        assert not list(cache.directory.rglob("*.tmp"))
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_skips_network(self, test_config, temp_output_dir):
+        """Test a fresh cache entry is served without a request."""
+        test_config.crawling.cache_directory = temp_output_dir / "cache"
+        fetcher = WebContentFetcher(test_config)
+        await fetcher.cache.put("https://example.com/", {"content": "cached", "success": True}, "body")
+
+        with patch("aiohttp.ClientSession.get") as mock_get:
+            result = await fetcher.fetch_url("https://example.com/")
+
+        mock_get.assert_not_called()
+        assert result["content"] == "cached"
+        assert result["cache_status"] == "hit"
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_fresh_entries_skip_scheduling(self, test_config, temp_output_dir):
+        """Test fresh cache hits take no host slot in fetch() and in crawls."""
+        test_config.crawling.cache_directory = temp_output_dir / "cache"
+        fetcher = WebContentFetcher(test_config)
+        for url, links in (("https://example.com/", ["https://example.com/docs"]), ("https://example.com/docs", [])):
+            await fetcher.cache.put(url, {"content": url, "success": True, "extracted_urls": links}, url)
+
+        with patch.object(fetcher.scheduler, "try_acquire", side_effect=AssertionError("scheduled")):
+            results = await fetcher.fetch(["https://example.com/"])
+            crawled = await CrawlEngine(test_config, fetcher, URLDiscoveryEngine(test_config)).crawl(
+                ["https://example.com/"], max_depth=2
+            )
+
+        assert results[0]["cache_status"] == "hit"
+        assert sorted(r["url"] for r in crawled) == ["https://example.com/", "https://example.com/docs"]
+        assert all(r["cache_status"] == "hit" for r in crawled)
+        await fetcher.close()
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_revalidates(self, test_config, temp_output_dir):
+        """Test a stale entry sends a conditional GET and accepts a 304."""
+        test_config.crawling.cache_directory = temp_output_dir / "cache"
+        test_config.crawling.cache_duration_seconds = 0
+        fetcher = WebContentFetcher(test_config)
+        await fetcher.cache.put(
+            "https://example.com/",
+            {"content": "cached", "success": True},
+            "body",
+            etag='"abc"',
+            last_modified="Wed, 01 Jan 2025 00:00:00 GMT"
+        )
+
+        response = make_response(status=304)
+        with patch("aiohttp.ClientSession.get", return_value=response) as mock_get:
+            result = await fetcher.fetch_url("https://example.com/")
+
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+        assert result["content"] == "cached"
+        assert result["cache_status"] == "revalidated"
+        assert fetcher.cache.stats["revalidated"] == 1
+        await fetcher.close()
+
+
+class TestFingerprintManifest:
+    """Test incremental re-crawl fingerprints."""
+
+    def test_fingerprint_ignores_formatting_noise(self):
+        """Test trailing whitespace and blank lines do not change fingerprints."""
+        assert content_fingerprint("# Title\n\n\n\nBody  \r\n") == content_fingerprint("# Title\n\nBody")
+        assert content_fingerprint("# Title\n\nBody") != content_fingerprint("# Title\n\nOther")
+
+    def test_change_report(self, temp_output_dir):
+        """Test pages are reported as added, changed, unchanged and removed."""
+        manifest = FingerprintManifest(temp_output_dir)
+        for url in ("https://example.com/a", "https://example.com/b", "https://example.com/c"):
+            status, fingerprint = manifest.classify(url, f"content of {url}")
+            assert status == "added"
+            manifest.record(url, fingerprint)
+        manifest.finish()
+        manifest.save()
+
+        manifest = FingerprintManifest(temp_output_dir)
+        assert manifest.classify("https://example.com/a", "content of https://example.com/a")[0] == "unchanged"
+        assert manifest.classify("https://example.com/b", "new content")[0] == "changed"
+        assert manifest.classify("https://example.com/d", "new page")[0] == "added"
+        report = manifest.finish()
+
+        assert report.summary() == {"added": 1, "changed": 1, "unchanged": 1, "removed": 1}
+        assert report.removed == ["https://example.com/c"]
+        assert "https://example.com/c" not in manifest.pages
+
+    def test_missing_output_is_changed(self, temp_output_dir):
+        """Test a page whose output file was deleted is regenerated."""
+        manifest = FingerprintManifest(temp_output_dir)
+        _, fingerprint = manifest.classify("https://example.com/a", "content")
+        manifest.record("https://example.com/a", fingerprint, "a.md")
+        manifest.save()
+
+        manifest = FingerprintManifest(temp_output_dir)
+        assert manifest.classify("https://example.com/a", "content")[0] == "changed"
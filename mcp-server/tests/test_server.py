@@ -43,10 +43,11 @@ class TestYamlContextServer:
         # Call the handler
         tools = await list_tools_handler()
         
-        assert len(tools) == 5  # 5 tools including ldd_manager
+        assert len(tools) == 6  # 6 tools including ldd_manager
         tool_names = [tool.name for tool in tools]
         assert "web_content_fetcher" in tool_names
         assert "llm_structure_extractor" in tool_names
+        assert "llm_structure_extractor_batch" in tool_names
         assert "url_discovery_engine" in tool_names
         assert "file_system_manager" in tool_names
         assert "ldd_manager" in tool_names
@@ -253,6 +254,44 @@ class TestYamlContextServer:
             
             assert "Unknown tool" in str(exc_info.value)
     
+    @pytest.mark.asyncio
+    async def test_close_shuts_down_worker_pools(self, server):
+        """Test closing the server releases the batch extraction pool."""
+        items = [
+            item async for item in server.structure_extractor.extract_many(["# A\n", "# B\n"], workers=2)
+        ]
+        assert server.structure_extractor._executor is not None
+        
+        await server.close()
+        
+        assert all(item["success"] for item in items)
+        assert server.structure_extractor._executor is None
+    
+    def test_input_paths_confined_to_allowed_directories(self, server, tmp_path):
+        """Test batch extraction refuses files outside the allowed directories."""
+        output_dir = tmp_path / "out"
+        docs_dir = tmp_path / "docs"
+        server.config.output.output_base_directory = output_dir
+        server.config.extraction.input_directories = [docs_dir]
+        
+        allowed = server._check_input_paths([str(output_dir / "a.md"), str(docs_dir / "b.md")])
+        assert allowed == [str((output_dir / "a.md").resolve()), str((docs_dir / "b.md").resolve())]
+        
+        for path in [str(tmp_path / "secret.md"), str(output_dir / ".." / "secret.md"), "/etc/passwd"]:
+            with pytest.raises(ValueError, match="outside the allowed directories"):
+                server._check_input_paths([path])
+    
+    def test_input_paths_symlink_escape_refused(self, server, tmp_path):
+        """Test a symlink inside the output directory cannot point outside it."""
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        (tmp_path / "secret.md").write_text("# Secret\n")
+        (output_dir / "link.md").symlink_to(tmp_path / "secret.md")
+        server.config.output.output_base_directory = output_dir
+        
+        with pytest.raises(ValueError):
+            server._check_input_paths([str(output_dir / "link.md")])
+    
     @pytest.mark.asyncio
     async def test_output_directory_creation(self, server, temp_output_dir):
         """Test that output directory is created on run."""
@@ -2,19 +2,55 @@
 
 import pytest
 import asyncio
+import hashlib
 import json
+import os
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from pathlib import Path
 
+import yaml
+
 from yaml_context_engineering.tools import (
     WebContentFetcher,
     LLMStructureExtractor,
     URLDiscoveryEngine,
     FileSystemManager
 )
+from yaml_context_engineering.tools.extraction_cache import ExtractionCache, content_digest
+from yaml_context_engineering.tools.context_index import ContextMetadataIndex, read_frontmatter
+from yaml_context_engineering.tools.file_system_manager import render_frontmatter
+from yaml_context_engineering.tools.llm_structure_extractor import (
+    HeadingTree, detect_format, extract_entities, scan_markdown_headings
+)
+from yaml_context_engineering.tools.url_discovery_engine import iter_url_matches, is_valid_url
+from yaml_context_engineering.tools.web_content_fetcher import parse_retry_after
 from yaml_context_engineering.config import Config
 
 
+def make_stream(chunks):
+    """Create a mock aiohttp StreamReader yielding the given chunks."""
+    async def iter_chunked(size):
+        for chunk in chunks:
+            yield chunk
+    
+    stream = MagicMock()
+    stream.iter_chunked = iter_chunked
+    return stream
+
+
+def make_response(chunks, content_type="text/html; charset=utf-8", headers=None):
+    """Create a mock aiohttp response usable as an async context manager."""
+    response = MagicMock()
+    response.status = 200
+    response.url = "https://example.com"
+    response.charset = "utf-8"
+    response.headers = {"Content-Type": content_type, **(headers or {})}
+    response.content = make_stream(chunks)
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=False)
+    return response
+
+
 class TestWebContentFetcher:
     """Test web content fetcher tool."""
     
@@ -90,6 +126,224 @@ class TestWebContentFetcher:
         assert "https://example.com/page2" in urls
         assert "https://example.com" in urls
     
+    def test_convert_html(self, sample_html_content):
+        """Test HTML conversion to markdown and metadata."""
+        from yaml_context_engineering.tools.html_conversion import convert_html
+        
+        page = convert_html(sample_html_content.encode("utf-8"), "https://example.com", "utf-8")
+        
+        assert page["title"] == "Test Page"
+        assert page["meta_description"] == "This is a test page"
+        assert "# Main Title" in page["content"]
+        assert "https://example.com/page1" in page["extracted_urls"]
+    
+    def test_convert_html_single_pass(self, sample_html_content):
+        """Test single-pass lxml conversion matches the metadata of html2text mode."""
+        from yaml_context_engineering.tools.html_conversion import convert_html
+        
+        body = sample_html_content.encode("utf-8")
+        page = convert_html(body, "https://example.com", "utf-8", mode="single_pass")
+        reference = convert_html(body, "https://example.com", "utf-8")
+        
+        assert page["title"] == reference["title"]
+        assert page["meta_description"] == reference["meta_description"]
+        assert page["extracted_urls"] == reference["extracted_urls"]
+        assert "# Main Title" in page["content"]
+        assert "### Subsection 1.1" in page["content"]
+        assert "[Page 1](/page1)" in page["content"]
+    
+    def test_convert_html_single_pass_xml_declaration(self):
+        """Test XHTML pages with an XML encoding declaration are converted."""
+        from yaml_context_engineering.tools.html_conversion import convert_html
+        
+        body = (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Café</title></head>'
+            '<body><h1>Überblick</h1><p>Text</p></body></html>'
+        ).encode("utf-8")
+        page = convert_html(body, "https://example.com", "utf-8", mode="single_pass")
+        
+        assert page["title"] == "Café"
+        assert page["content"] == "# Überblick\n\nText\n"
+    
+    def test_convert_html_single_pass_deep_nesting(self):
+        """Test deeply nested pages convert without hitting the recursion limit."""
+        from yaml_context_engineering.tools.html_conversion import convert_html
+        
+        html = "<html><body>" + "<div><span>" * 1000 + '<a href="/deep">Deep</a>' + "</span></div>" * 1000 + "</body></html>"
+        page = convert_html(html.encode("utf-8"), "https://example.com", "utf-8", mode="single_pass")
+        
+        assert page["content"] == "[Deep](/deep)\n"
+        assert page["extracted_urls"] == ["https://example.com/deep"]
+    
+    def test_convert_html_single_pass_list_blocks(self):
+        """Test paragraphs and nested lists stay inside their list item."""
+        from yaml_context_engineering.tools.html_conversion import convert_html
+        
+        html = "<ul><li><p>First</p><p>More <b>text</b></p><ul><li>Nested</li></ul></li><li>Second</li></ul>"
+        page = convert_html(html.encode("utf-8"), "https://example.com", "utf-8", mode="single_pass")
+        
+        assert page["content"] == "* First\n\n  More **text**\n  * Nested\n* Second\n"
+    
+    def test_extract_urls_deduplicates(self, fetcher):
+        """Test repeated links are returned once in document order."""
+        from bs4 import BeautifulSoup
+        
+        html = '<a href="/b">B</a><nav><a href="/a">A</a><a href="/b">B</a></nav><a href="mailto:x@y.z">M</a>'
+        urls = fetcher._extract_urls(BeautifulSoup(html, "lxml"), "https://example.com")
+        
+        assert urls == ["https://example.com/b", "https://example.com/a"]
+    
+    @pytest.mark.asyncio
+    async def test_fetch_with_conversion_pool(self, test_config, sample_html_content):
+        """Test HTML conversion in a process pool."""
+        test_config.crawling.conversion_workers = 1
+        fetcher = WebContentFetcher(test_config)
+        
+        mock_response = make_response([sample_html_content.encode("utf-8")])
+        
+        with patch('aiohttp.ClientSession.get', return_value=mock_response):
+            result = await fetcher.fetch_url("https://example.com")
+        
+        assert result["success"] is True
+        assert result["title"] == "Test Page"
+        assert "Main Title" in result["content"]
+        assert fetcher._executor is not None
+        
+        await fetcher.close()
+        assert fetcher._executor is None
+    
+    @pytest.mark.asyncio
+    async def test_fetch_skips_unsupported_content_type(self, fetcher):
+        """Test binary bodies are rejected before download."""
+        mock_response = make_response([b"%PDF-1.7"], content_type="application/pdf")
+        
+        with patch('aiohttp.ClientSession.get', return_value=mock_response):
+            result = await fetcher.fetch_url("https://example.com/manual.pdf")
+        
+        assert result["success"] is False
+        assert "Unsupported content type" in result["error"]
+    
+    @pytest.mark.asyncio
+    async def test_fetch_truncates_large_text(self, test_config):
+        """Test streamed text stops at the configured limits."""
+        test_config.crawling.max_response_bytes = 1000
+        fetcher = WebContentFetcher(test_config)
+        mock_response = make_response([b"x" * 400] * 10, content_type="text/plain")
+        
+        with patch('aiohttp.ClientSession.get', return_value=mock_response):
+            result = await fetcher.fetch_url("https://example.com/log.txt")
+        
+        assert result["success"] is True
+        assert result["truncated"] is True
+        assert len(result["content"]) == 1000
+    
+    @pytest.mark.asyncio
+    async def test_fetch_aborts_on_content_length(self, test_config):
+        """Test the abort policy rejects oversized bodies up front."""
+        test_config.crawling.max_response_bytes = 1000
+        test_config.crawling.oversized_response_policy = "abort"
+        fetcher = WebContentFetcher(test_config)
+        mock_response = make_response([b"<html></html>"], headers={"Content-Length": "50000000"})
+        
+        with patch('aiohttp.ClientSession.get', return_value=mock_response):
+            result = await fetcher.fetch_url("https://example.com/dump.html")
+        
+        assert result["success"] is False
+        assert "exceeds limit" in result["error"]
+    
+    @pytest.mark.asyncio
+    async def test_fetch_retries_after_throttling(self, test_config):
+        """Test 429 responses slow the host down and are retried."""
+        test_config.crawling.crawl_delay_seconds = 0.001
+        fetcher = WebContentFetcher(test_config)
+        throttled = make_response([b""], headers={"Retry-After": "0"})
+        throttled.status = 429
+        ok = make_response([b"<html><title>Docs</title><body>Hi</body></html>"])
+        
+        with patch('aiohttp.ClientSession.get', side_effect=[throttled, ok]):
+            results = await fetcher.fetch(["https://example.com/docs"])
+        
+        assert results[0]["success"] is True
+        metrics = fetcher.scheduler.metrics()["example.com"]
+        assert metrics["throttled"] == 1
+        assert metrics["responses"] == 1
+        await fetcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_fetch_url_reports_throttling(self, fetcher):
+        """Test a single fetch returns throttled responses as retryable."""
+        throttled = make_response([b""], headers={"Retry-After": "120"})
+        throttled.status = 503
+        
+        with patch('aiohttp.ClientSession.get', return_value=throttled):
+            result = await fetcher.fetch_url("https://example.com/docs")
+        
+        assert result["success"] is False
+        assert result["retryable"] is True
+        assert result["retry_after"] == 120
+        assert fetcher.scheduler.ready_in("example.com") > 100
+    
+    def test_parse_retry_after(self):
+        """Test Retry-After in seconds and as an HTTP date."""
+        assert parse_retry_after("30") == 30
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+    
+    @pytest.mark.asyncio
+    async def test_session_connection_pool(self, fetcher, test_config):
+        """Test the shared session uses a tuned connector."""
+        session = await fetcher._get_session()
+        
+        assert session.connector.limit == test_config.crawling.max_concurrent_requests
+        assert session.connector.limit_per_host == test_config.crawling.adaptive_max_per_host
+        assert session.connector.use_dns_cache is True
+        assert await fetcher._get_session() is session
+        await fetcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_fetch_timeout_is_per_request(self, fetcher, test_config):
+        """Test fetch(timeout=...) no longer mutates the shared config."""
+        mock_response = make_response([b"ok"], content_type="text/plain")
+        
+        with patch('aiohttp.ClientSession.get', return_value=mock_response) as mock_get:
+            results = await fetcher.fetch(["https://example.com"], timeout=7)
+        
+        assert results[0]["success"] is True
+        assert mock_get.call_args.kwargs["timeout"].total == 7
+        assert test_config.crawling.timeout_seconds == 5
+        await fetcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_httpx_backend(self, test_config):
+        """Test the httpx backend adapts responses and errors."""
+        import aiohttp
+        import httpx
+        from yaml_context_engineering.tools.http_client import HttpxSession
+        
+        def handler(request):
+            if request.url.path == "/missing":
+                return httpx.Response(404)
+            return httpx.Response(200, text="hello", headers={"Content-Type": "text/plain; charset=utf-8"})
+        
+        session = HttpxSession(test_config)
+        await session.close()
+        session._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        async with session.get("https://example.com/page") as response:
+            assert response.status == 200
+            assert response.charset == "utf-8"
+            chunks = [chunk async for chunk in response.content.iter_chunked(1024)]
+        assert b"".join(chunks) == b"hello"
+        
+        async with session.get("https://example.com/missing") as response:
+            with pytest.raises(aiohttp.ClientError):
+                response.raise_for_status()
+        
+        await session.close()
+        assert session.closed
+    
     @pytest.mark.asyncio
     async def test_cleanup(self, fetcher):
         """Test session cleanup."""
@@ -137,6 +391,101 @@ class TestLLMStructureExtractor:
         headings = result["structured_headings"]
         assert any(h["text"] == "Main Title" for h in headings)
     
+    def test_scan_markdown_headings(self):
+        """Test the scanner skips fenced code and records section offsets."""
+        content = (
+            "# Title\n"
+            "Intro\n"
+            "```bash\n"
+            "# not a heading\n"
+            "```\n"
+            "## Usage\n"
+            "~~~~\n"
+            "# still code\n"
+            "~~~\n"
+            "~~~~\n"
+            "Run it.\n"
+            "## Last"
+        )
+        spans = list(scan_markdown_headings(content))
+        
+        assert [(s.level, s.text, s.line_number) for s in spans] == [
+            (1, "Title", 1), (2, "Usage", 6), (2, "Last", 12)
+        ]
+        assert content[spans[0].start:spans[0].end] == "Intro\n```bash\n# not a heading\n```\n"
+        assert content[spans[1].start:spans[1].end].endswith("Run it.\n")
+        assert spans[2].start == spans[2].end == len(content)
+    
+    @pytest.mark.asyncio
+    async def test_html_section_content(self, extractor):
+        """Test HTML headings get the text up to the next heading."""
+        content = "<h1>Title</h1>\n<p>Intro</p>\n<h2>Part</h2>\n<p>Body</p>"
+        result = await extractor.extract(content)
+        
+        title = result["structured_headings"][0]
+        assert title["content"] == "<p>Intro</p>"
+        assert title["children"][0]["content"] == "<p>Body</p>"
+    
+    def test_html_heading_line_numbers(self, extractor, sample_html_content):
+        """Test parsed and scanned HTML headings agree on text and lines."""
+        headings = extractor._extract_html_headings(sample_html_content)
+        
+        assert headings == [
+            (1, "Main Title", 9), (2, "Section 1", 12),
+            (3, "Subsection 1.1", 15), (2, "Section 2", 18)
+        ]
+        assert extractor._scan_html_headings(sample_html_content) == headings
+        
+        nested = "<h2 id='a'>Hello <code>world</code></h2>\n\n<h3>Next</h3>"
+        assert extractor._extract_html_headings(nested) == [(2, "Hello world", 1), (3, "Next", 3)]
+    
+    @pytest.mark.asyncio
+    async def test_extract_rst_structure(self, extractor):
+        """Test Sphinx-style reStructuredText sections."""
+        content = (
+            "=======\n"
+            "Project\n"
+            "=======\n\n"
+            "Intro.\n\n"
+            "Install\n"
+            "-------\n\n"
+            "Run pip.\n\n"
+            "Usage\n"
+            "-----\n\n"
+            "Options\n"
+            "~~~~~~~\n\n"
+            "Flags.\n"
+        )
+        result = await extractor.extract(content, extraction_config={"granularity": "full_hierarchy"})
+        
+        assert result["format_detected"] == "rst"
+        assert result["total_headings"] == 4
+        assert result["confidence_score"] > 0
+        project = result["structured_headings"][0]
+        assert (project["level"], project["text"], project["content"]) == (1, "Project", "Intro.")
+        assert [h["text"] for h in project["children"]] == ["Install", "Usage"]
+        assert project["children"][1]["children"][0]["text"] == "Options"
+    
+    @pytest.mark.asyncio
+    async def test_extract_asciidoc_structure(self, extractor):
+        """Test AsciiDoc sections skip delimited blocks."""
+        content = "= Guide\n\n== Install\n\n----\n= not a title\n----\n\n=== Linux\n\nText\n"
+        result = await extractor.extract(content, extraction_config={"granularity": "full_hierarchy"})
+        
+        assert result["format_detected"] == "asciidoc"
+        assert result["total_headings"] == 3
+        install = result["structured_headings"][0]["children"][0]
+        assert install["text"] == "Install"
+        assert install["children"][0]["content"] == "Text"
+    
+    def test_detect_format_samples_start(self):
+        """Test format detection only inspects the leading sample."""
+        assert detect_format("Title\n=====\n") == "rst"
+        assert detect_format("<h2 class='x'>Title</h2>") == "html"
+        assert detect_format("x" * 100 + "\n# Late heading", sample_size=50) == "markdown"
+        assert detect_format("text\n" * 20 + "== Late", sample_size=50) == "markdown"
+        assert detect_format("text\n" * 20 + "== Late") == "asciidoc"
+    
     @pytest.mark.asyncio
     async def test_granularity_filtering(self, extractor, sample_markdown_content):
         """Test granularity filtering."""
@@ -155,6 +504,91 @@ class TestLLMStructureExtractor:
         max_level = max(h["level"] for h in self._flatten_headings(result["structured_headings"]))
         assert max_level <= 2
     
+    @pytest.mark.asyncio
+    async def test_granularity_views_share_one_parse(self, extractor):
+        """Test granularities are views over one cached parse."""
+        content = "# A\n## B\n### C\ntext\n## D\n"
+        
+        full = await extractor.extract(content, extraction_config={"granularity": "full_hierarchy"})
+        top = await extractor.extract(content, extraction_config={"granularity": "L1_only"})
+        
+        assert extractor._parse.cache_info().misses == 1
+        
+        with patch(
+            "yaml_context_engineering.tools.llm_structure_extractor.content_digest",
+            wraps=content_digest
+        ) as digest:
+            await extractor.extract(content + "more\n")
+        assert digest.call_count == 1
+        assert full["structured_headings"][0]["children"][0]["children"][0]["content"] == "text"
+        assert top["structured_headings"][0]["children"] == []
+        
+        structure = extractor._parse(content)
+        views = extractor._filter_by_granularity(structure, "L1_L2")
+        assert views is extractor._filter_by_granularity(structure, "L1_L2")
+        assert views[0].tree is structure.tree
+        assert [child.text for child in views[0].children] == ["B", "D"]
+        assert views[0].children[0].children == []
+        assert views[0].node().children[0].children == []
+    
+    def test_heading_tree_arrays(self):
+        """Test the array-backed tree links parents and subtrees."""
+        content = "### Preface\n# A\nintro\n## B\n### C\n## D\n# E\n"
+        tree = HeadingTree(content, scan_markdown_headings(content))
+        
+        assert list(tree.levels) == [3, 1, 2, 3, 2, 1]
+        assert list(tree.parents) == [-1, -1, 1, 2, 1, -1]
+        assert list(tree.children()) == [0, 1, 5]
+        assert list(tree.children(max_level=2)) == [1, 5]
+        assert list(tree.children(1)) == [2, 4]
+        assert tree.content(1) == "intro"
+        
+        node = tree.node(1)
+        assert [child.text for child in node.children] == ["B", "D"]
+        assert node.to_dict() == tree.to_dict(1)
+    
+    @pytest.mark.asyncio
+    async def test_outline_skips_bodies_and_entities(self, extractor):
+        """Test outline-only extraction computes no bodies or entities."""
+        content = "# Intro\nSee https://example.com\n## Setup\nFirst.\n\nSecond.\n\nThird.\n"
+        
+        with patch("yaml_context_engineering.tools.llm_structure_extractor.extract_entities") as entities:
+            result = await extractor.extract(
+                content,
+                extraction_config={"include_content": False, "include_entities": False}
+            )
+        
+        entities.assert_not_called()
+        assert "extracted_entities" not in result
+        intro = result["structured_headings"][0]
+        assert "content" not in intro
+        assert intro["children"][0]["text"] == "Setup"
+        
+        result = await extractor.extract(
+            content,
+            extraction_config={"summarization": "detailed", "section_summaries": True}
+        )
+        assert result["structured_headings"][0]["children"][0]["summary"] == "First.\n\nSecond."
+        assert result["extracted_entities"]["urls"] == ["https://example.com"]
+    
+    def test_section_results_are_cached(self, extractor):
+        """Test summaries and entities are computed once per section."""
+        content = "# A\nMachine Learning here.\n# B\nother\n"
+        structure = extractor._parse(content)
+        section = structure.project(6)[0]
+        
+        assert structure.digest == hashlib.sha256(content.encode("utf-8")).hexdigest()
+        with patch(
+            "yaml_context_engineering.tools.llm_structure_extractor.extract_entities",
+            wraps=extract_entities
+        ) as entities:
+            assert section.entities()["key_terms"] == ["Machine Learning"]
+            section.entities()["key_terms"].clear()
+            assert section.entities()["key_terms"] == ["Machine Learning"]
+        assert entities.call_count == 1
+        assert section.summary("brief") == "Machine Learning here."
+        assert structure._sections[(0, "brief")] == "Machine Learning here."
+    
     def _flatten_headings(self, headings):
         """Flatten hierarchical headings for testing."""
         flat = []
@@ -206,6 +640,151 @@ class TestLLMStructureExtractor:
         assert "Machine Learning" in entities["key_terms"]
 
 
+    @pytest.mark.asyncio
+    async def test_extract_many_inline(self, extractor, tmp_path):
+        """Test batch extraction of texts and files in this process."""
+        path = tmp_path / "doc.md"
+        path.write_text("# File\n## Part\n", encoding="utf-8")
+        
+        items = [
+            item async for item in extractor.extract_many(
+                documents=["# Text\n"],
+                paths=[path, tmp_path / "missing.md"],
+                workers=1
+            )
+        ]
+        
+        assert [item["index"] for item in items] == [0, 1, 2]
+        assert items[0]["source"] is None
+        assert items[0]["result"]["total_headings"] == 1
+        assert items[1]["source"] == str(path)
+        assert items[1]["result"]["total_headings"] == 2
+        assert items[2]["success"] is False
+        assert "error" in items[2]
+        assert all(item["seconds"] >= 0 for item in items)
+    
+    @pytest.mark.asyncio
+    async def test_extract_many_process_pool(self, extractor, tmp_path):
+        """Test batch extraction fans documents out to worker processes."""
+        paths = []
+        for i in range(4):
+            path = tmp_path / f"doc{i}.md"
+            path.write_text(f"# Doc {i}\n" + "## Part\n" * i, encoding="utf-8")
+            paths.append(path)
+        
+        try:
+            items = [item async for item in extractor.extract_many(paths=paths, workers=2)]
+        finally:
+            await extractor.close()
+        
+        assert sorted(item["index"] for item in items) == [0, 1, 2, 3]
+        for item in items:
+            assert item["success"] is True
+            assert item["result"]["total_headings"] == item["index"] + 1
+        assert extractor._executor is None
+    
+    @pytest.mark.asyncio
+    async def test_extract_many_resizes_pool(self, extractor):
+        """Test a batch asking for another worker count gets a pool of that size."""
+        documents = [f"# Doc {i}\n" for i in range(4)]
+        try:
+            items = [item async for item in extractor.extract_many(documents, workers=2)]
+            first = extractor._executor
+            assert extractor._executor._max_workers == 2
+            
+            items += [item async for item in extractor.extract_many(documents, workers=3)]
+            assert extractor._executor is not first
+            assert extractor._executor._max_workers == 3
+        finally:
+            await extractor.close()
+        
+        assert all(item["success"] for item in items)
+
+
+class TestExtractionCache:
+    """Test the extraction result cache."""
+    
+    @pytest.mark.asyncio
+    async def test_extract_reuses_cached_result(self, test_config):
+        """Test repeated extractions of the same content hit the cache."""
+        extractor = LLMStructureExtractor(test_config)
+        content = "# Title\nBody\n"
+        
+        first = await extractor.extract(content)
+        first["total_headings"] = 99
+        with patch.object(extractor, "_parse", side_effect=AssertionError("parsed again")):
+            second = await extractor.extract(content)
+        
+        assert second["total_headings"] == 1
+        assert extractor.cache.stats == {"hits": 1, "disk_hits": 0, "misses": 1}
+        
+        await extractor.extract(content, extraction_config={"granularity": "full_hierarchy"})
+        assert extractor.cache.stats["misses"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """Test results written to disk are found by a new cache."""
+        cache = ExtractionCache(directory=tmp_path)
+        key = cache.key("digest", {"granularity": "L1_L2"})
+        await cache.put(key, {"total_headings": 3})
+        
+        reopened = ExtractionCache(directory=tmp_path)
+        assert await reopened.get(key) == {"total_headings": 3}
+        assert await reopened.get(key) == {"total_headings": 3}
+        assert reopened.stats == {"hits": 1, "disk_hits": 1, "misses": 0}
+        assert ExtractionCache(directory=tmp_path, version=2).key("digest", {"granularity": "L1_L2"}) != key
+    
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """Test the memory tier stays within its size limit."""
+        cache = ExtractionCache(max_bytes=60)
+        for name in ("a", "b", "c"):
+            await cache.put(name, {"body": name * 10})
+        
+        assert len(cache) == 2
+        assert cache.size <= 60
+        assert await cache.get("a") is None
+        assert await cache.get("c") == {"body": "cccccccccc"}
+        
+        cache = ExtractionCache(max_bytes=60)
+        await cache.put("wide", {"body": "日本語" * 3})
+        assert cache.size == len('{"body": "日本語日本語日本語"}'.encode("utf-8"))
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_puts_of_one_key(self, test_config, tmp_path):
+        """Test concurrent extractions of one document share the disk tier safely."""
+        test_config.extraction.result_cache_directory = tmp_path
+        extractor = LLMStructureExtractor(test_config)
+        
+        results = await asyncio.gather(*(extractor.extract("# Title\nBody\n") for _ in range(8)))
+        
+        assert all(result["total_headings"] == 1 for result in results)
+        assert not list(tmp_path.rglob("*.tmp"))
+        
+        cache = ExtractionCache(directory=tmp_path / "direct")
+        await asyncio.gather(*(cache.put("abc", {"total_headings": 1}) for _ in range(8)))
+        assert await ExtractionCache(directory=tmp_path / "direct").get("abc") == {"total_headings": 1}
+    
+    @pytest.mark.asyncio
+    async def test_disk_tier_is_bounded(self, tmp_path):
+        """Test the least recently used files are removed from a full disk tier."""
+        cache = ExtractionCache(max_bytes=0, directory=tmp_path, max_disk_bytes=300)
+        for i in range(10):
+            await cache.put(f"{i:02d}key", {"body": "x" * 50})
+            os.utime(cache._path(f"{i:02d}key"), (i, i))
+        
+        files = list(tmp_path.glob("*/*.json"))
+        assert 0 < len(files) <= 5
+        assert cache.disk_size <= 300
+        assert await cache.get("09key") == {"body": "x" * 50}
+        assert await cache.get("00key") is None
+        
+        cache = ExtractionCache(max_bytes=0, directory=tmp_path / "overwrite", max_disk_bytes=1000)
+        for _ in range(5):
+            await cache.put("key", {"body": "x" * 50})
+        assert cache.disk_size == cache._path("key").stat().st_size
+
+
 class TestURLDiscoveryEngine:
     """Test URL discovery engine."""
     
@@ -265,6 +844,63 @@ class TestURLDiscoveryEngine:
         assert relations["https://api.example.com/endpoint"] == "subdomain"
         assert relations["https://external.com/resource"] == "external"
     
+    def test_single_pass_tokenizer(self):
+        """Test that each link is matched once, with its offsets."""
+        content = (
+            "See [Docs](https://docs.example.com/api), "
+            '<a href="https://example.com/guide">guide</a> and '
+            "www.example.com/tutorial. Mail admin@example.com, see "
+            "https://en.wikipedia.org/wiki/Foo_(bar)."
+        )
+        
+        matches = list(iter_url_matches(content))
+        
+        assert [m.url for m in matches] == [
+            "https://docs.example.com/api",
+            "https://example.com/guide",
+            "https://www.example.com/tutorial",
+            "https://en.wikipedia.org/wiki/Foo_(bar)"
+        ]
+        assert content[matches[0].start:matches[0].end] == "[Docs](https://docs.example.com/api)"
+    
+    def test_is_valid_url(self):
+        """Test the cached URL validator."""
+        assert is_valid_url("https://example.com/docs?page=2")
+        assert is_valid_url("http://localhost:8080/")
+        assert not is_valid_url("ftp://example.com/file")
+        assert not is_valid_url("https://exa mple.com/")
+        assert not is_valid_url("https://example.com:99999/")
+    
+    @pytest.mark.asyncio
+    async def test_discover_context_uses_first_occurrence(self, discovery):
+        """Test that contexts come from the first occurrence of a URL."""
+        content = "Essential: https://example.com/docs\n" + "x" * 500 + "\nhttps://example.com/docs"
+        
+        results = await discovery.discover(content, "example.com")
+        
+        assert len(results) == 1
+        assert results[0]["context_snippet"].startswith("Essential")
+    
+    def test_score_batch(self, discovery):
+        """Test batch scoring returns scores and values aligned with the input."""
+        urls = [
+            "https://site.org/docs/api",
+            "https://site.org/blog/news",
+            "https://site.org/login",
+            "https://site.org/docs/api"
+        ]
+        contexts = {"https://site.org/login": "You must sign in"}
+        
+        scores, values = discovery.score_batch(urls, contexts)
+        
+        assert scores == [
+            discovery._calculate_priority_score(url, contexts.get(url, ""))
+            for url in urls
+        ]
+        assert values == ["high", "low", "unknown", "high"]
+        assert scores[0] == 1.0
+        assert scores[1] < 0.5
+    
     @pytest.mark.asyncio
     async def test_content_value_estimation(self, discovery):
         """Test content value estimation."""
@@ -365,6 +1001,45 @@ class TestFileSystemManager:
             assert "doc1.md" in index_content
             assert "doc2.md" in index_content
     
+    @pytest.mark.asyncio
+    async def test_generate_index_incrementally(self, file_manager, temp_output_dir):
+        """Test that index generation only reads changed files."""
+        await file_manager.write_context_files(
+            (f"guides/doc{i}.md", {"title": f"Guide {i}", "tags": ["guide"], "body": "Body"}) for i in range(5)
+        )
+        (temp_output_dir / "notes.md").write_text("No frontmatter", encoding="utf-8")
+        
+        result = await file_manager.execute("generate_index")
+        assert result["files_indexed"] == 6
+        assert result["files_read"] == 6
+        
+        result = await file_manager.execute("generate_index")
+        assert result["files_read"] == 0
+        
+        await file_manager.execute("write_file", "guides/doc1.md", {"title": "Renamed guide", "body": "Changed"})
+        (temp_output_dir / "guides" / "doc2.md").unlink()
+        result = await file_manager.execute("generate_index")
+        assert result["files_indexed"] == 5
+        assert result["files_read"] == 1
+        
+        index_content = (temp_output_dir / "index.md").read_text(encoding="utf-8")
+        assert "- [Renamed guide](guides/doc1.md)" in index_content
+        assert "doc2.md" not in index_content
+        assert "- [notes](notes.md)" in index_content
+        
+        index = ContextMetadataIndex(temp_output_dir)
+        assert index.tags("guides/doc0.md") == ["guide"]
+    
+    def test_read_frontmatter_stops_at_delimiter(self, temp_output_dir):
+        """Test reading frontmatter spanning several read chunks."""
+        path = temp_output_dir / "long.md"
+        path.write_text("---\ntitle: Long\nsummary: " + "x" * 10000 + "\n---\n\n# Body\n", encoding="utf-8")
+        
+        assert read_frontmatter(path)["title"] == "Long"
+        
+        path.write_text("# No frontmatter\n", encoding="utf-8")
+        assert read_frontmatter(path) is None
+    
     @pytest.mark.asyncio
     async def test_complex_directory_structure(self, file_manager):
         """Test creating complex directory structure."""
@@ -386,4 +1061,60 @@ class TestFileSystemManager:
         assert Path(result["path"]).exists()
         assert (Path(result["path"]) / "docs" / "api").exists()
         assert (Path(result["path"]) / "docs" / "guides").exists()
-        assert (Path(result["path"]) / "examples").exists()
\ No newline at end of file
+        assert (Path(result["path"]) / "examples").exists()
+    
+    def test_render_frontmatter_round_trips(self):
+        """Test that the templated frontmatter loads back unchanged."""
+        fields = {
+            "title": "API: Getting Started #1",
+            "plain": "Plain title",
+            "reserved": "yes",
+            "number_like": "1.0",
+            "timestamp_like": "2024-01-01",
+            "quoted": 'It\'s "quoted"',
+            "multiline": "line\nbreak\u2028",
+            "padded": " padded ",
+            "unicode": "日本語ドキュメント",
+            "confidence": 0.95,
+            "large": 1e100,
+            "count": 3,
+            "missing": None,
+            "hierarchy_levels": [1, 2],
+            "related_sources": [],
+            "tags": ["docs", "- item", "on"]
+        }
+        
+        rendered = render_frontmatter(fields)
+        
+        assert yaml.safe_load(rendered) == fields
+        assert "plain: Plain title\n" in rendered
+        assert "related_sources: []\n" in rendered
+    
+    @pytest.mark.asyncio
+    async def test_write_context_files_batch(self, file_manager, temp_output_dir):
+        """Test batched, coalesced context file writes."""
+        files = [(f"batch/section_{i % 3}/doc_{i}.md", {"title": f"Doc {i}", "body": f"Body {i}"}) for i in range(30)]
+        files.append(("batch/section_0/doc_0.md", {"title": "Doc 0 updated", "body": "New body"}))
+        
+        result = await file_manager.write_context_files(files, concurrency=4)
+        
+        assert not result["failed"]
+        assert len(result["written"]) == 30
+        assert not list(temp_output_dir.rglob("*.tmp"))
+        
+        text = (temp_output_dir / "batch" / "section_0" / "doc_0.md").read_text(encoding="utf-8")
+        frontmatter = yaml.safe_load(text.split("---\n")[1])
+        assert frontmatter["title"] == "Doc 0 updated"
+        assert text.endswith("---\n\nNew body")
+    
+    @pytest.mark.asyncio
+    async def test_write_files_action(self, file_manager, temp_output_dir):
+        """Test the write_files action."""
+        result = await file_manager.execute(
+            "write_files",
+            content=[{"path": "a.md", "content": {"title": "A"}}, {"path": "b/c.md", "content": {"title": "C"}}]
+        )
+        
+        assert result["success"] is True
+        assert result["written"] == 2
+        assert (temp_output_dir / "b" / "c.md").exists()